@@ -1,34 +1,49 @@
 
+import hashlib
+import itertools
+import json
 import os
 import shutil
 import logging
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status, Depends
-from fastapi.responses import JSONResponse
+import numpy as np
+
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query, Request, status, Depends
+from fastapi.responses import JSONResponse, StreamingResponse
 from app.api.auth import get_current_user
 from app.db.models import User
 
-from app.schemas import ResumeAnalysisResponse, ErrorResponse, UploadResponse, BatchAnalysisRequest, BatchAnalysisResponse, RankedCandidate, BatchEmailRequest
-from app.core.pdf_extractor import extract_text_from_pdf
-from app.core.docx_extractor import extract_text_from_docx
-from app.core.text_processor import TextProcessor
-from app.core.skill_extractor import SkillExtractor
-from app.core.experience_extractor import extract_experience, extract_required_experience_from_jd
+from app.schemas import ResumeAnalysisResponse, ErrorResponse, UploadResponse, BatchAnalysisRequest, BatchAnalysisResponse, RankedCandidate, BatchEmailRequest, ResumeSearchRequest, ResumeSearchResponse, ResumeSearchHit, RerankRequest, RerankResponse
+from app.core.parsed_document import ParsedDocument
 
+from app.config import settings
 from app.core.advanced_matcher import AdvancedMatcher
-from app.core.skill_matcher import SkillMatcher
-from app.core.ranker import Ranker
+from app.core.ranker import IncrementalRanker, Ranker, resolve_weights
+from app.core.resume_search import get_resume_search
+from app.core.screening import (
+    analysis_pool,
+    doubling_chunk_sizes,
+    jd_features,
+    ranked_candidate,
+    ranker,
+    recruiter_corpus,
+    resolve_jd_text,
+    score_resumes,
+    screen_batch,
+)
 from app.db.database import (
     save_job_description,
-    save_resume,
-    save_ranking_result,
+    get_or_create_resume,
+    link_job_resumes,
     get_all_job_descriptions,
     get_job_description,
     get_rankings_for_job,
+    get_ranking_components,
     get_resume,
-    delete_job_description,
-    update_resume_text
+    get_resumes,
+    get_resume_texts_page,
+    delete_job_description
 )
 
 # Configure logging
@@ -37,14 +52,6 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Initialize core components (load models once at startup)
-text_processor = TextProcessor()
-skill_extractor = SkillExtractor()
-# Dictionary databases and heavy models loaded here
-# ResumeMatcher needs to be fitted per request (per JD), or cache extraction?
-# SkillMatcher is stateless.
-ranker = Ranker()
-
 @router.post("/analyze", response_model=ResumeAnalysisResponse, responses={400: {"model": ErrorResponse}})
 async def analyze_resume(
     resume_file: UploadFile = File(...),
@@ -79,16 +86,9 @@ async def analyze_resume(
         with open(temp_path, "wb") as buffer:
             shutil.copyfileobj(resume_file.file, buffer)
             
-        # 3. Extract Text
-        content_text = ""
+        # 3. Extract Text (CPU-bound stages run in the analysis pool, off the event loop)
         try:
-            if extension == "pdf":
-                content_text = extract_text_from_pdf(temp_path)
-            elif extension == "docx":
-                content_text = extract_text_from_docx(temp_path)
-            elif extension == "txt":
-                with open(temp_path, "r", encoding="utf-8") as f:
-                    content_text = f.read()
+            content_text = await analysis_pool.extract_text(temp_path)
         except Exception as e:
             logger.error(f"Extraction failed: {e}")
             raise HTTPException(status_code=400, detail=f"Failed to extract text: {str(e)}")
@@ -96,37 +96,17 @@ async def analyze_resume(
         if not content_text:
              raise HTTPException(status_code=400, detail="Could not extract any text from the file.")
 
-        # 4. NLP Processing (Entities, Cleaning)
-        processed_data = text_processor.preprocess(content_text)
-        
-        # 5. Extract Skills from Resume
-        # We use the raw text or cleaned text? SkillExtractor handles case, so calculated text.
-        # Let's use the 'original_text' passed to TextProcessor (which is content_text)
-        # But text_processor.preprocess returns 'skills' using its simple list.
-        # We want the ADVANCED SkillExtractor here.
-        resume_skills_dict = skill_extractor.extract_skills(content_text)
-        
-        # Flatten skills for matching
-        resume_flat_skills = []
-        for cat_skills in resume_skills_dict.values():
-            resume_flat_skills.extend(cat_skills)
-
-        # 6. Extract Experience
-        years_exp = extract_experience(content_text)
-
-        # 7. Extract Skills from JD (for Gap Analysis)
-        jd_skills_dict = skill_extractor.extract_skills(job_description)
-        jd_flat_skills = []
-        for cat_skills in jd_skills_dict.values():
-            jd_flat_skills.extend(cat_skills)
-            
-        # 8. Skill Matching (Gap Analysis)
-        skill_matcher = SkillMatcher()
-        skill_match_result = skill_matcher.match_skills(resume_flat_skills, jd_flat_skills)
-        
+        # 4-8. Contacts, skills, experience and skill gap (pool), alongside
         # 9. Semantic Matching (BERT)
         matcher = AdvancedMatcher()
-        bert_score = matcher.batch_compare([content_text], job_description)[0]
+        analysis, semantic_scores = await asyncio.gather(
+            analysis_pool.analyze_resume(content_text, job_description),
+            matcher.ascore_batch([content_text], job_description),
+        )
+        semantic = semantic_scores[0]
+        bert_score = semantic.score
+        years_exp = analysis["years_of_experience"]
+        skill_match_result = analysis["skill_match_details"]
         
         # 10. Final Scoring (Using Ranker Logic)
         # Construct a candidate object for the ranker
@@ -138,17 +118,17 @@ async def analyze_resume(
         }
         
         # Ranker expects a list, returns a list
-        jd_req_exp = extract_required_experience_from_jd(job_description)
-        ranked_result = ranker.rank_candidates([candidate_data], required_experience=jd_req_exp)[0]
+        ranked_result = ranker.rank_candidates([candidate_data], required_experience=analysis["required_experience"])[0]
         
         # 11. cleanup and response
         response_data = ResumeAnalysisResponse(
             filename=filename,
-            emails=processed_data.get("emails", []),
-            phones=processed_data.get("phone_numbers", []),
+            emails=analysis["emails"],
+            phones=analysis["phone_numbers"],
             years_of_experience=years_exp,
-            extracted_skills=resume_skills_dict,
+            extracted_skills=analysis["extracted_skills"],
             tfidf_similarity=bert_score, # Keeping field name for schema compatibility
+            semantic_scorer=semantic.scorer,
             skill_match_details=skill_match_result,
             final_score=ranked_result["final_score"],
             scoring_explanation=ranked_result.get("scoring_explanation", "")
@@ -176,7 +156,8 @@ async def upload_resumes_and_jd(
     """
     Uploads multiple resumes and a job description.
     Validates file types (PDF, DOCX) and size (max 5MB).
-    Saves files with UUIDs.
+    Saves the JD with a UUID; resumes are stored once per user and content (SHA-256),
+    so a file uploaded before returns its existing resume ID.
     """
     
     # Validation Constants
@@ -224,7 +205,12 @@ async def upload_resumes_and_jd(
         raise HTTPException(status_code=400, detail="Job description is required (text or file).")
 
     # 2. Handle Resumes
+    # Stored once per recruiter and content (SHA-256 of the bytes): a file uploaded again,
+    # e.g. for another JD, gets its existing id and keeps its extracted text
     resume_ids = []
+    job_resumes = [] # (resume_id, filename) linked to the JD
+    resume_dir = os.path.join(UPLOAD_DIR, current_user.id)
+    os.makedirs(resume_dir, exist_ok=True)
     
     for resume in resumes:
         # Validate Extension
@@ -233,10 +219,6 @@ async def upload_resumes_and_jd(
             # We could skip or raise error. Raising error is safer for now.
             raise HTTPException(status_code=400, detail=f"Invalid resume file type: {resume.filename}. Only PDF/DOCX/TXT allowed.")
         
-        # Validate Size and Save
-        res_id = str(uuid.uuid4())
-        save_path = os.path.join(UPLOAD_DIR, f"{res_id}.{ext}")
-        
         try:
             # Read content to check size
             # Note: For very large files this eats memory, but limit is 5MB so it's fine.
@@ -244,21 +226,26 @@ async def upload_resumes_and_jd(
             if len(content) > MAX_FILE_SIZE:
                  raise HTTPException(status_code=400, detail=f"File {resume.filename} exceeds 5MB limit.")
             
-            with open(save_path, "wb") as f:
-                f.write(content)
-                
-            await save_resume({
-                "id": res_id,
+            content_hash = hashlib.sha256(content).hexdigest()
+            r_record, created = await get_or_create_resume({
+                "id": str(uuid.uuid4()),
                 "filename": resume.filename,
-                "file_path": save_path,
+                "file_path": os.path.join(resume_dir, f"{content_hash}.{ext}"),
+                "content_hash": content_hash,
                 "user_id": current_user.id
             })
+            if created or not os.path.exists(r_record.file_path):
+                with open(r_record.file_path, "wb") as f:
+                    f.write(content)
                 
-            resume_ids.append(res_id)
+            if r_record.id not in resume_ids:
+                resume_ids.append(r_record.id)
+                job_resumes.append((r_record.id, resume.filename))
             
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to save resume {resume.filename}: {str(e)}")
             
+    await link_job_resumes(jd_id, job_resumes)
     return {
         "job_description_id": jd_id,
         "resume_ids": resume_ids,
@@ -268,6 +255,16 @@ async def upload_resumes_and_jd(
 import time
 import asyncio
 
+async def _batch_job_description(request: BatchAnalysisRequest, user_id: str) -> Tuple[Any, str]:
+    """The request's JD record and text (404 / 400 if missing or empty)."""
+    jd_record = await get_job_description(request.job_description_id, user_id)
+    if not jd_record:
+        raise HTTPException(status_code=404, detail="Job Description not found or unauthorized.")
+    jd_text = resolve_jd_text(jd_record)
+    if not jd_text.strip():
+        raise HTTPException(status_code=400, detail="Job Description text is empty.")
+    return jd_record, jd_text
+
 @router.post("/analyze/batch", response_model=BatchAnalysisResponse)
 async def analyze_batch(request: BatchAnalysisRequest, current_user: User = Depends(get_current_user)):
     """
@@ -275,162 +272,24 @@ async def analyze_batch(request: BatchAnalysisRequest, current_user: User = Depe
     Files must have been previously uploaded to get IDs.
     """
     # 1. Fetch JD
-    jd_record = await get_job_description(request.job_description_id, current_user.id)
-    if not jd_record:
-        raise HTTPException(status_code=404, detail="Job Description not found or unauthorized.")
-        
-    start_time = time.time()
-    UPLOAD_DIR = "uploaded_files"
-    
-    # Resolve Job Description File
+    jd_record, jd_text = await _batch_job_description(request, current_user.id)
     jd_id = request.job_description_id
-    jd_text = jd_record.content
-    
-    # If the record is just a reference to a file (simplified implementation)
-    if jd_text.startswith("File: "):
-        filename = jd_text.replace("File: ", "")
-        for ext in ["txt", "pdf", "docx"]:
-            path = os.path.join(UPLOAD_DIR, f"{jd_id}.{ext}")
-            if os.path.exists(path):
-                if ext == "txt":
-                    with open(path, "r", encoding="utf-8") as f:
-                        jd_text = f.read()
-                elif ext == "pdf":
-                    jd_text = extract_text_from_pdf(path)
-                elif ext == "docx":
-                    jd_text = extract_text_from_docx(path)
-                break
-
-    if not jd_text.strip():
-        raise HTTPException(status_code=400, detail="Job Description text is empty.")
-
-    # 2. Process Resumes Loop
-    candidates_data = [] # For Ranking
-    resume_texts = []
-    resume_details = []
-    
-    # Get JD skills once
-    jd_skills_dict = skill_extractor.extract_skills(jd_text)
-    jd_flat_skills = []
-    for cat_skills in jd_skills_dict.values():
-        jd_flat_skills.extend(cat_skills)
-
-    # Extract Required Experience from JD
-    jd_req_exp = extract_required_experience_from_jd(jd_text)
-
-    for resume_id in request.resume_ids:
-        r_record = await get_resume(resume_id, current_user.id)
-        if not r_record:
-            continue
-            
-        res_path = r_record.file_path
-        
-        if not os.path.exists(res_path):
-            logger.warning(f"Resume {resume_id} not found, skipping.")
-            continue
-            
-        try:
-            # Extract Text
-            content_text = ""
-            if res_path.endswith(".pdf"):
-                content_text = extract_text_from_pdf(res_path)
-            elif res_path.endswith(".docx"):
-                content_text = extract_text_from_docx(res_path)
-            elif res_path.endswith(".txt"):
-                with open(res_path, "r", encoding="utf-8") as f:
-                    content_text = f.read()
-                
-            if not content_text:
-                continue
+    start_time = time.time()
 
-            # Save extracted text to DB
-            await update_resume_text(resume_id, content_text)
+    # 2-4. Extract, score and rank the resumes ANALYZE_BATCH_CHUNK_SIZE at a time: only the
+    # current top-K (request.top_k, default all) is kept across chunks
+    jd_skills_dict, jd_req_exp = await jd_features(jd_text)
+    shortlist = IncrementalRanker(request.top_k, required_experience=jd_req_exp, ranker=ranker)
+    chunk_size = max(1, settings.ANALYZE_BATCH_CHUNK_SIZE)
+    resume_ids = request.resume_ids
 
-            resume_texts.append(content_text)
-            resume_details.append({
-                "resume_id": resume_id,
-                "content_text": content_text
-            })
-            
-        except Exception as e:
-            logger.error(f"Error extracting resume {resume_id}: {e}")
-            continue
+    async for processed, _ in screen_batch(jd_id, jd_text, jd_skills_dict, resume_ids, current_user.id,
+                                            shortlist, itertools.repeat(chunk_size)):
+        if processed < len(resume_ids):
+            logger.info(f"Batch {jd_id}: {processed} of {len(resume_ids)} resumes processed, "
+                        f"{len(shortlist)} on the provisional shortlist.")
 
-    # Batch compute BERT scores
-    advanced_matcher = AdvancedMatcher()
-    bert_scores = advanced_matcher.batch_compare(resume_texts, jd_text)
-    
-    for i, details in enumerate(resume_details):
-        content_text = details["content_text"]
-        resume_id = details["resume_id"]
-        
-        try:
-            # NLP Extraction
-            processed_data = text_processor.preprocess(content_text)
-            emails = processed_data.get("emails", [])
-            name = emails[0].split("@")[0] if emails else f"Candidate-{resume_id[:4]}"
-            
-            # Skills
-            resume_skills_dict = skill_extractor.extract_skills(content_text)
-            resume_flat_skills = []
-            for cat_skills in resume_skills_dict.values():
-                resume_flat_skills.extend(cat_skills)
-                
-            # Experience
-            years_exp = extract_experience(content_text)
-            
-            skill_matcher_inst = SkillMatcher()
-            skill_result = skill_matcher_inst.match_skills(resume_flat_skills, jd_flat_skills)
-            
-            # Collect data for Ranker
-            cand_obj = {
-                "resume_id": resume_id,
-                "name": name,
-                "bert_score": bert_scores[i],
-                "skill_match_percentage": skill_result["match_percentage"],
-                "years_of_experience": years_exp,
-                "matched_skills": skill_result["matched_skills"],
-                "missing_skills": skill_result["missing_skills"],
-                "resume_text": content_text
-            }
-            candidates_data.append(cand_obj)
-            
-        except Exception as e:
-            logger.error(f"Error processing resume {resume_id}: {e}")
-            continue
-
-    # 3. Rank
-    ranked_list = ranker.rank_candidates(candidates_data, required_experience=jd_req_exp)
-    
-    # 4. Construct Response
-    final_output = []
-    for ranked in ranked_list:
-        final_output.append(RankedCandidate(
-            resume_id=ranked["resume_id"],
-            name=ranked["name"],
-            final_score=ranked["final_score"],
-            tfidf_score=ranked["normalized_scores"]["bert"], 
-            skill_match_percentage=ranked["skill_match_percentage"],
-            experience_years=ranked["years_of_experience"],
-            matched_skills=ranked["matched_skills"],
-            missing_skills=ranked["missing_skills"],
-            explanation=ranked["scoring_explanation"],
-            resume_text=ranked.get("resume_text", "")
-        ))
-        
-        # Save to DB
-        await save_ranking_result({
-            "job_description_id": jd_id,
-            "resume_id": ranked["resume_id"],
-            "total_score": ranked["final_score"],
-            "details": {
-                "skill_match": ranked["skill_match_percentage"],
-                "experience": ranked["years_of_experience"],
-                "matched_skills": ranked["matched_skills"],
-                "missing_skills": ranked["missing_skills"],
-                "explanation": ranked["scoring_explanation"]
-            }
-        })
+    final_output = [ranked_candidate(ranked) for ranked in shortlist.snapshot()]
         
     processing_time = f"{round(time.time() - start_time, 2)}s"
     
@@ -441,6 +300,144 @@ async def analyze_batch(request: BatchAnalysisRequest, current_user: User = Depe
         job_description_id=jd_id
     )
 
+STREAM_FORMATS = ("ndjson", "sse")
+
+def _stream_event(event: str, data: Dict[str, Any], sse: bool) -> str:
+    if sse:
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"event": event, **data}) + "\n"
+
+@router.post("/analyze/batch/stream")
+async def analyze_batch_stream(
+    request: BatchAnalysisRequest,
+    http_request: Request,
+    stream_format: Optional[str] = Query(None, alias="format"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    /analyze/batch, streamed: one "candidate" event per scored resume as soon as it is
+    done, "progress" events, then a "summary" event with the ranked BatchAnalysisResponse.
+
+    Format: ?format=ndjson (one JSON object per line, "event" field) or ?format=sse
+    (Server-Sent Events); without it, SSE if the client accepts text/event-stream.
+    Resumes are processed in chunks of 1, 2, 4, ... up to ANALYZE_STREAM_CHUNK_SIZE,
+    so the first result arrives after one resume.
+    """
+    if stream_format is not None and stream_format not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown stream format, expected one of {list(STREAM_FORMATS)}.")
+    sse = stream_format == "sse" or (
+        stream_format is None and "text/event-stream" in http_request.headers.get("accept", "")
+    )
+    # Errors before the stream starts are plain HTTP errors
+    jd_record, jd_text = await _batch_job_description(request, current_user.id)
+    jd_id = request.job_description_id
+    resume_ids = request.resume_ids
+
+    async def events():
+        start_time = time.time()
+        total = len(resume_ids)
+        yield _stream_event("started", {"job_description_id": jd_id, "total_resumes": total}, sse)
+        try:
+            jd_skills_dict, jd_req_exp = await jd_features(jd_text)
+            shortlist = IncrementalRanker(request.top_k, required_experience=jd_req_exp, ranker=ranker)
+            chunk_sizes = doubling_chunk_sizes(1, settings.ANALYZE_STREAM_CHUNK_SIZE)
+            async for processed, scored_chunk in screen_batch(jd_id, jd_text, jd_skills_dict, resume_ids,
+                                                               current_user.id, shortlist, chunk_sizes):
+                for scored in scored_chunk:
+                    candidate = ranked_candidate(scored)
+                    # Texts come with the summary only
+                    candidate.resume_text = None
+                    yield _stream_event("candidate", {"candidate": candidate.model_dump(mode="json")}, sse)
+                yield _stream_event("progress", {"processed_resumes": processed, "total_resumes": total}, sse)
+
+            summary = BatchAnalysisResponse(
+                ranked_candidates=[ranked_candidate(ranked) for ranked in shortlist.snapshot()],
+                processing_time=f"{round(time.time() - start_time, 2)}s",
+                job_description_content=jd_record.content,
+                job_description_id=jd_id
+            )
+            yield _stream_event("summary", summary.model_dump(mode="json"), sse)
+        except Exception as e:
+            logger.error(f"Error streaming batch {jd_id}: {e}", exc_info=True)
+            yield _stream_event("error", {"detail": str(e)}, sse)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        # No proxy buffering, so events reach the client as they are produced
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/search/resumes", response_model=ResumeSearchResponse)
+async def search_resumes(request: ResumeSearchRequest, current_user: User = Depends(get_current_user)):
+    """
+    Top-K of the recruiter's screened resumes for a JD, from the nearest-neighbour
+    index of resume embeddings (no rescoring of every resume). With `rescore`, the
+    hits are also scored by the full pipeline and ranked by the Ranker.
+    """
+    search = get_resume_search()
+    if search is None:
+        raise HTTPException(status_code=503, detail="Resume search is not enabled.")
+
+    if request.job_description_id:
+        jd_record = await get_job_description(request.job_description_id, current_user.id)
+        if not jd_record:
+            raise HTTPException(status_code=404, detail="Job Description not found or unauthorized.")
+        jd_text = resolve_jd_text(jd_record)
+    else:
+        jd_text = request.job_description or ""
+    if not jd_text.strip():
+        raise HTTPException(status_code=400, detail="Job Description text is empty.")
+
+    start_time = time.perf_counter()
+    top_k = max(1, min(request.top_k, settings.RESUME_SEARCH_MAX_K))
+    hits = await search.search(current_user.id, jd_text, top_k)
+    search_time_ms = round((time.perf_counter() - start_time) * 1000, 2)
+
+    records = {r.id: r for r in await get_resumes([resume_id for resume_id, _ in hits], current_user.id)}
+    stale = [resume_id for resume_id, _ in hits if resume_id not in records]
+    if stale:
+        # Deleted since they were indexed
+        await search.remove_resumes(current_user.id, stale)
+
+    results = [
+        ResumeSearchHit(resume_id=resume_id, filename=records[resume_id].filename, similarity=round(similarity, 4))
+        for resume_id, similarity in hits if resume_id in records
+    ]
+
+    ranked_candidates = None
+    if request.rescore and results:
+        resumes = [(hit.resume_id, records[hit.resume_id].extracted_text or "") for hit in results]
+        corpus = await recruiter_corpus(current_user.id)
+        feature_records = {hit.resume_id: records[hit.resume_id].parsed_data for hit in results}
+        jd_skills_dict, jd_req_exp = await jd_features(jd_text)
+        candidates_data = await score_resumes(jd_text, jd_skills_dict, resumes, corpus, feature_records)
+        ranked_candidates = [ranked_candidate(ranked)
+                             for ranked in ranker.rank_candidates(candidates_data, required_experience=jd_req_exp)]
+
+    return ResumeSearchResponse(
+        results=results,
+        ranked_candidates=ranked_candidates,
+        search_time_ms=search_time_ms,
+        indexed_resumes=len(search.index(current_user.id))
+    )
+
+@router.post("/search/resumes/reindex")
+async def reindex_resumes(current_user: User = Depends(get_current_user)):
+    """(Re)builds the recruiter's search index from every resume with extracted text."""
+    search = get_resume_search()
+    if search is None:
+        raise HTTPException(status_code=503, detail="Resume search is not enabled.")
+    indexed = 0
+    after_id = None
+    while True:
+        page = await get_resume_texts_page(current_user.id, after_id)
+        if not page:
+            break
+        indexed += await search.add_resumes(current_user.id, page)
+        after_id = page[-1][0]
+    return {"indexed_resumes": indexed, "index_size": len(search.index(current_user.id))}
+
 def get_clean_title(content: str) -> str:
     lines = [line.strip() for line in content.split('\n') if line.strip()]
     if not lines:
@@ -451,6 +448,12 @@ def get_clean_title(content: str) -> str:
     first_line = first_line.strip()
     return first_line[:80] + "..." if len(first_line) > 80 else first_line
 
+def _stored_semantic_score(details: Dict[str, Any]) -> float:
+    """Normalized (0-100) semantic score of a stored ranking result."""
+    if "bert_score" in details:
+        return round(details["bert_score"] * 100.0, 1)
+    return details.get("bert", details.get("tfidf", 0.0))
+
 @router.get("/history/jobs")
 async def get_jobs_history(current_user: User = Depends(get_current_user)):
     """Returns a list of all past job runs."""
@@ -487,7 +490,7 @@ async def get_job_results_history(job_id: str, current_user: User = Depends(get_
             "resume_id": r.resume_id,
             "name": name,
             "final_score": r.total_score,
-            "tfidf_score": details.get("bert", details.get("tfidf", 0.0)),
+            "tfidf_score": _stored_semantic_score(details),
             "skill_match_percentage": details.get("skill_match", 0.0),
             "experience_years": details.get("experience", 0.0),
             "matched_skills": details.get("matched_skills", []),
@@ -503,6 +506,76 @@ async def get_job_results_history(job_id: str, current_user: User = Depends(get_
         "processing_time": "0.0s (Loaded from History)"
     }
 
+@router.post("/history/jobs/{job_id}/rerank", response_model=RerankResponse)
+async def rerank_job_results(job_id: str, request: RerankRequest, current_user: User = Depends(get_current_user)):
+    """
+    Re-ranks a stored screening with new weights, required experience and thresholds.
+    Nothing is re-analyzed: the stored component scores are loaded in one query and
+    ranked in one vectorized pass, fast enough for interactive tuning.
+    """
+    start_time = time.time()
+    job = await get_job_description(job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job description not found.")
+    try:
+        weights = resolve_weights(request.weights)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Latest result per resume; results saved before component scores were kept can't be re-ranked
+    latest: Dict[str, Tuple[Dict[str, Any], str]] = {}
+    for resume_id, details, filename in await get_ranking_components(job_id, current_user.id):
+        latest[resume_id] = (details or {}, filename)
+    rows = [(resume_id, details, filename) for resume_id, (details, filename) in latest.items()
+            if "bert_score" in details]
+    if not latest:
+        raise HTTPException(status_code=404, detail="No results found for this job.")
+
+    required_experience = request.required_experience
+    if required_experience is None:
+        required_experience = rows[0][1].get("required_experience", 0.0) if rows else 0.0
+
+    n = len(rows)
+    bert = np.fromiter((details["bert_score"] for _, details, _ in rows), dtype=np.float64, count=n)
+    skills = np.fromiter((details.get("skill_match", 0.0) for _, details, _ in rows), dtype=np.float64, count=n)
+    years = np.fromiter((details.get("experience", 0.0) for _, details, _ in rows), dtype=np.float64, count=n)
+    if request.min_skill_match is not None:
+        keep = np.flatnonzero(skills >= request.min_skill_match)
+    else:
+        keep = np.arange(n)
+
+    ranked = Ranker(weights).rank_arrays(
+        bert[keep], skills[keep], years[keep],
+        required_experience=required_experience,
+        top_k=request.top_k,
+        min_score=request.min_final_score,
+    )
+
+    final_output = []
+    for i, index in enumerate(keep[ranked.indices].tolist()):
+        resume_id, details, filename = rows[index]
+        final_output.append(RankedCandidate(
+            resume_id=resume_id,
+            name=details.get("name") or filename,
+            final_score=round(float(ranked.final_scores[i]), 2),
+            tfidf_score=round(float(ranked.bert[i]), 1),
+            semantic_scorer=details.get("semantic_scorer"),
+            skill_match_percentage=details.get("skill_match", 0.0),
+            experience_years=details.get("experience", 0.0),
+            matched_skills=details.get("matched_skills", []),
+            missing_skills=details.get("missing_skills", []),
+            explanation=ranked.explanation(i),
+        ))
+
+    return RerankResponse(
+        ranked_candidates=final_output,
+        weights=weights,
+        required_experience=required_experience,
+        total_candidates=n,
+        skipped_candidates=len(latest) - n,
+        processing_time=f"{round(time.time() - start_time, 3)}s",
+    )
+
 @router.delete("/history/jobs/{job_id}")
 async def delete_job_history(job_id: str, current_user: User = Depends(get_current_user)):
     """Deletes a job and its associated results and resumes."""
@@ -552,12 +625,15 @@ async def email_candidates(
     from app.core.email_service import send_candidate_email
     import time
     
+    # Candidates' stored feature records hold their contacts: one query, no re-parsing
+    resumes_by_id = {r.id: r for r in await get_resumes(valid_candidate_ids, current_user.id)}
+    
     # 3. Batch Email Dispatch Loop with try-except
     for resume_id in valid_candidate_ids:
         name = None
         email = None
         try:
-            resume = await get_resume(resume_id, current_user.id)
+            resume = resumes_by_id.get(resume_id)
             if not resume:
                 raise Exception("Resume record not found.")
                 
@@ -566,12 +642,10 @@ async def email_candidates(
             if "emails" in parsed_data and parsed_data["emails"]:
                 email = parsed_data["emails"][0]
             else:
-                # Fallback parser if not pre-stored in parsed_data
-                from app.core.text_processor import TextProcessor
-                tp = TextProcessor()
-                prep = tp.preprocess(resume.extracted_text or "")
-                if prep.get("emails"):
-                    email = prep["emails"][0]
+                # Fallback parser if not pre-stored in parsed_data (contact fields only)
+                emails = ParsedDocument(resume.extracted_text or "").emails
+                if emails:
+                    email = emails[0]
                     
             if not email:
                 raise Exception("No email address could be found in the candidate resume.")
@@ -0,0 +1,309 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.api.auth import get_current_user
+from app.config import settings
+from app.core.corpus_idf import document_frequency_delta
+from app.core.ranker import IncrementalRanker
+from app.core.screening import (
+    add_to_corpus,
+    extract_resume_texts,
+    index_resumes,
+    jd_features,
+    ranked_candidate,
+    ranker,
+    ranking_record,
+    recruiter_corpus,
+    resolve_jd_text,
+    score_resumes,
+)
+from app.db.database import (
+    claim_screening_job,
+    complete_screening_chunk,
+    create_screening_job,
+    finish_screening_job,
+    get_job_description,
+    get_ranking_components,
+    get_resumes,
+    get_screening_job,
+    release_screening_job,
+    renew_screening_job_lease,
+)
+from app.db.models import ScreeningJob, User
+from app.schemas import BatchAnalysisRequest, BatchAnalysisResponse, ScreeningJobResponse
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def _job_response(job: ScreeningJob) -> ScreeningJobResponse:
+    return ScreeningJobResponse(
+        job_id=job.id,
+        job_description_id=job.job_description_id,
+        status=job.status,
+        total_resumes=len(job.resume_ids or []),
+        processed_resumes=job.processed or 0,
+        attempts=job.attempts or 0,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+        finished_at=job.finished_at,
+    )
+
+
+class _LeaseLost(Exception):
+    """Another worker owns the job now (our lease expired)."""
+
+
+class _JobFailed(Exception):
+    """A job that can't succeed on retry (e.g. its JD was deleted)."""
+
+
+class ScreeningWorker:
+    """
+    Runs queued screening jobs in the background of an app process.
+
+    The worker polls the screening_jobs table, leases the oldest runnable job and works
+    through its resumes `chunk_size` at a time, with the same stages as /analyze/batch.
+    Each chunk's ranking results are saved together with the job's progress, and a
+    heartbeat renews the lease while the job runs. If the process dies, the lease
+    expires and any worker picks the job up again from its last saved chunk. A job that
+    raises is put back in the queue, until it has been attempted `max_attempts` times.
+
+    Args:
+        chunk_size (int): Resumes per saved chunk.
+        lease_seconds (float): Lease length; renewed every third of it.
+        poll_interval (float): Seconds between queue polls when idle.
+        max_attempts (int): Claims before a job is failed.
+    """
+
+    def __init__(self, chunk_size: int = 50, lease_seconds: float = 120.0, poll_interval: float = 2.0,
+                 max_attempts: int = 3):
+        self.chunk_size = max(1, chunk_size)
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self):
+        """Stops the worker; a job in progress goes back to the queue right away."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def run_forever(self):
+        while True:
+            try:
+                job = await claim_screening_job(self.worker_id, self.lease_seconds, self.max_attempts)
+            except Exception as e:
+                logger.error(f"Screening worker {self.worker_id}: could not poll the job queue: {e}")
+                job = None
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            try:
+                await self.run_job(job)
+            except Exception as e:
+                # e.g. the database went away while recording the outcome: the lease expires
+                logger.error(f"Screening worker {self.worker_id}: job {job.id} aborted: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _heartbeat(self, job_id: str, work: asyncio.Task) -> bool:
+        """Renews the lease while the job runs; cancels the work and returns True if it was lost."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                renewed = await renew_screening_job_lease(job_id, self.worker_id, self.lease_seconds)
+            except Exception as e:
+                logger.warning(f"Screening job {job_id}: lease renewal failed: {e}")
+                continue
+            if not renewed:
+                work.cancel()
+                return True
+
+    async def run_job(self, job: ScreeningJob):
+        logger.info(f"Screening job {job.id}: attempt {job.attempts}, resuming at "
+                    f"{job.processed}/{len(job.resume_ids)} resumes.")
+        work = asyncio.create_task(self._process(job))
+        heartbeat = asyncio.create_task(self._heartbeat(job.id, work))
+        try:
+            await work
+            await finish_screening_job(job.id, self.worker_id, "completed")
+            logger.info(f"Screening job {job.id} completed.")
+        except _LeaseLost:
+            logger.warning(f"Screening job {job.id}: lease lost, another worker will resume it.")
+        except asyncio.CancelledError:
+            if heartbeat.done() and not heartbeat.cancelled() and heartbeat.result():
+                logger.warning(f"Screening job {job.id}: lease lost, another worker will resume it.")
+                return
+            # Worker stopping (shutdown): hand the job back now rather than at lease expiry
+            await release_screening_job(job.id, self.worker_id, count_attempt=False)
+            raise
+        except _JobFailed as e:
+            await finish_screening_job(job.id, self.worker_id, "failed", error=str(e))
+        except Exception as e:
+            logger.error(f"Screening job {job.id} failed on attempt {job.attempts}: {e}", exc_info=True)
+            if job.attempts >= self.max_attempts:
+                await finish_screening_job(job.id, self.worker_id, "failed", error=str(e))
+            else:
+                await release_screening_job(job.id, self.worker_id, error=str(e))
+        finally:
+            heartbeat.cancel()
+
+    async def _process(self, job: ScreeningJob):
+        jd_record = await get_job_description(job.job_description_id, job.user_id)
+        if not jd_record:
+            raise _JobFailed("Job Description not found.")
+        jd_text = resolve_jd_text(jd_record)
+        if not jd_text.strip():
+            raise _JobFailed("Job Description text is empty.")
+        jd_skills_dict, jd_req_exp = await jd_features(jd_text)
+        corpus = await recruiter_corpus(job.user_id)
+        new_docs, new_document_frequencies = 0, Counter()
+
+        resume_ids = job.resume_ids
+        try:
+            for chunk_start in range(job.processed or 0, len(resume_ids), self.chunk_size):
+                chunk_ids = resume_ids[chunk_start:chunk_start + self.chunk_size]
+                resumes, new_resume_texts, changed_resumes, feature_records = await extract_resume_texts(
+                    chunk_ids, job.user_id)
+                await index_resumes(job.user_id, changed_resumes)
+                doc_count, document_frequencies = document_frequency_delta(new_resume_texts)
+                new_docs += doc_count
+                new_document_frequencies.update(document_frequencies)
+                candidates_data = await score_resumes(jd_text, jd_skills_dict, resumes, corpus, feature_records)
+                # Scored (not kept: top_k=0) in request order, like /analyze/batch saves them
+                scored_chunk = IncrementalRanker(0, required_experience=jd_req_exp,
+                                                 ranker=ranker).extend(candidates_data)
+                records = [ranking_record(job.job_description_id, scored, jd_req_exp, screening_job_id=job.id)
+                           for scored in scored_chunk]
+                if not await complete_screening_chunk(job.id, self.worker_id, records,
+                                                      chunk_start + len(chunk_ids), self.lease_seconds):
+                    raise _LeaseLost()
+        finally:
+            # Once per attempt (also a failed or interrupted one: those texts are saved already)
+            await add_to_corpus(job.user_id, new_docs, new_document_frequencies)
+
+
+_workers: List[ScreeningWorker] = []
+
+
+def start_screening_workers():
+    """Starts SCREENING_WORKERS workers in the running event loop (application startup)."""
+    if not settings.SCREENING_JOBS_ENABLED or _workers:
+        return
+    for _ in range(max(0, settings.SCREENING_WORKERS)):
+        worker = ScreeningWorker(
+            chunk_size=settings.SCREENING_JOB_CHUNK_SIZE,
+            lease_seconds=settings.SCREENING_JOB_LEASE_SECONDS,
+            poll_interval=settings.SCREENING_JOB_POLL_SECONDS,
+            max_attempts=settings.SCREENING_JOB_MAX_ATTEMPTS,
+        )
+        worker.start()
+        _workers.append(worker)
+
+
+async def stop_screening_workers():
+    while _workers:
+        await _workers.pop().stop()
+
+
+@router.post("/jobs/screening", response_model=ScreeningJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_screening_job(request: BatchAnalysisRequest, current_user: User = Depends(get_current_user)):
+    """
+    Queues an /analyze/batch screening to run in the background.
+    Poll GET /jobs/screening/{job_id} and fetch the ranking from .../results when completed.
+    """
+    if not settings.SCREENING_JOBS_ENABLED:
+        raise HTTPException(status_code=503, detail="Background screening jobs are disabled.")
+    jd_record = await get_job_description(request.job_description_id, current_user.id)
+    if not jd_record:
+        raise HTTPException(status_code=404, detail="Job Description not found or unauthorized.")
+    if not request.resume_ids:
+        raise HTTPException(status_code=400, detail="No resumes to screen.")
+
+    job = await create_screening_job({
+        "id": str(uuid.uuid4()),
+        "user_id": current_user.id,
+        "job_description_id": request.job_description_id,
+        "resume_ids": list(request.resume_ids),
+        "top_k": request.top_k,
+        "status": "queued",
+    })
+    return _job_response(job)
+
+
+@router.get("/jobs/screening/{job_id}", response_model=ScreeningJobResponse)
+async def get_screening_job_status(job_id: str, current_user: User = Depends(get_current_user)):
+    job = await get_screening_job(job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Screening job not found.")
+    return _job_response(job)
+
+
+@router.get("/jobs/screening/{job_id}/results", response_model=BatchAnalysisResponse)
+async def get_screening_job_results(job_id: str, current_user: User = Depends(get_current_user)):
+    """The job's ranking, in the /analyze/batch response format (once the job completed)."""
+    job = await get_screening_job(job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Screening job not found.")
+    if job.status != "completed":
+        raise HTTPException(status_code=409, detail=f"Screening job is {job.status}.")
+
+    # Saved chunk by chunk in request order, so ties rank as in /analyze/batch
+    required_experience = 0.0
+    candidates: List[Dict[str, Any]] = []
+    for resume_id, details, _ in await get_ranking_components(job.job_description_id, current_user.id):
+        details = details or {}
+        if details.get("screening_job_id") != job.id:
+            continue
+        required_experience = details.get("required_experience", 0.0)
+        candidates.append({
+            "resume_id": resume_id,
+            "name": details.get("name", f"Candidate-{resume_id[:4]}"),
+            "bert_score": details.get("bert_score", 0.0),
+            "semantic_scorer": details.get("semantic_scorer"),
+            "skill_match_percentage": details.get("skill_match", 0.0),
+            "years_of_experience": details.get("experience", 0.0),
+            "matched_skills": details.get("matched_skills", []),
+            "missing_skills": details.get("missing_skills", []),
+        })
+
+    shortlist = IncrementalRanker(job.top_k, required_experience=required_experience, ranker=ranker)
+    shortlist.extend(candidates)
+    ranked_list = shortlist.snapshot()
+    texts = {r.id: r.extracted_text for r in await get_resumes([c["resume_id"] for c in ranked_list],
+                                                               current_user.id)}
+    for ranked in ranked_list:
+        ranked["resume_text"] = texts.get(ranked["resume_id"]) or ""
+
+    jd_record = await get_job_description(job.job_description_id, current_user.id)
+    processing_time = "n/a"
+    if job.finished_at and job.created_at:
+        processing_time = f"{round((job.finished_at - job.created_at).total_seconds(), 2)}s"
+    return BatchAnalysisResponse(
+        ranked_candidates=[ranked_candidate(ranked) for ranked in ranked_list],
+        processing_time=processing_time,
+        job_description_content=jd_record.content if jd_record else None,
+        job_description_id=job.job_description_id,
+    )
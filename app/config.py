@@ -28,6 +28,74 @@ class Settings(BaseSettings):
     SENDER_EMAIL: str = "alerts@talentlens.ai"
     MOCK_EMAIL: bool = False
 
+    # HuggingFace embedding client
+    HF_EMBED_BATCH_SIZE: int = 16
+    HF_MAX_CONCURRENCY: int = 4
+    HF_TIMEOUT: float = 30.0
+    # Circuit breaker: trip after N consecutive failures or when p95 latency exceeds the threshold
+    HF_BREAKER_FAILURES: int = 5
+    HF_BREAKER_P95_SECONDS: float = 10.0
+    HF_BREAKER_RESET_SECONDS: float = 30.0
+    # Per-batch latency budget; embeddings not back in time use the TF-IDF fallback
+    EMBEDDING_BATCH_BUDGET_SECONDS: float = 20.0
+
+    # TF-IDF fallback for a batch: "shared" (one fit over JD + resumes), "hashing" (stateless)
+    # or "pairwise" (same scores as fitting each resume/JD pair separately)
+    TFIDF_BATCH_MODE: str = "shared"
+    # Per-recruiter corpus IDF: used for the TF-IDF fallback once a recruiter has screened
+    # CORPUS_IDF_MIN_DOCS resumes; only the CORPUS_IDF_MAX_TERMS most common terms are kept
+    CORPUS_IDF_ENABLED: bool = True
+    CORPUS_IDF_MIN_DOCS: int = 20
+    CORPUS_IDF_MAX_TERMS: int = 50000
+
+    # Embedding provider: "huggingface" (Inference API), "local" (in-process hashed n-gram
+    # embeddings, no network) or "tfidf" (no embeddings)
+    EMBEDDING_PROVIDER: str = "huggingface"
+    LOCAL_EMBEDDING_DIM: int = 384
+    # Resumes are embedded as overlapping chunks (capped at the provider's input limit),
+    # streamed EMBEDDING_CHUNK_BATCH at a time and pooled per resume ("max" or "mean")
+    EMBEDDING_CHUNK_CHARS: int = 2000
+    EMBEDDING_CHUNK_OVERLAP: int = 200
+    EMBEDDING_CHUNK_BATCH: int = 64
+    EMBEDDING_CHUNK_POOLING: str = "max"
+
+    # CPU-bound resume analysis (extraction, parsing, skills, experience) runs off the event
+    # loop: in a thread of the app process by default (0), or in a pool of ANALYSIS_WORKERS
+    # processes (-1: one per CPU core). Each process loads its own NLTK, taxonomy, sklearn and
+    # scipy (~100MB+), so only raise it on instances with memory to spare (not the 512MB free tier).
+    ANALYSIS_WORKERS: int = 0
+    ANALYSIS_TASK_SIZE: int = 8
+
+    # /analyze/batch extracts, scores and ranks resumes this many at a time, keeping only
+    # the request's top_k candidates in memory across chunks
+    ANALYZE_BATCH_CHUNK_SIZE: int = 500
+    # /analyze/batch/stream starts with single resumes and doubles up to this chunk size
+    ANALYZE_STREAM_CHUNK_SIZE: int = 32
+
+    # Background screening jobs (POST /jobs/screening): queued in the database, run by
+    # SCREENING_WORKERS workers per app process that lease a job for
+    # SCREENING_JOB_LEASE_SECONDS (renewed while it runs) and save results every
+    # SCREENING_JOB_CHUNK_SIZE resumes, so a restarted job resumes from its last chunk
+    SCREENING_JOBS_ENABLED: bool = True
+    SCREENING_WORKERS: int = 1
+    SCREENING_JOB_CHUNK_SIZE: int = 50
+    SCREENING_JOB_LEASE_SECONDS: float = 120.0
+    SCREENING_JOB_POLL_SECONDS: float = 2.0
+    SCREENING_JOB_MAX_ATTEMPTS: int = 3
+
+    # Per-recruiter nearest-neighbour index of resume embeddings (POST /search/resumes);
+    # "local" embeds in-process, so indexing makes no API calls
+    RESUME_INDEX_ENABLED: bool = True
+    RESUME_INDEX_DIR: str = "data/resume_index"
+    RESUME_INDEX_PROVIDER: str = "local"
+    RESUME_INDEX_NPROBE: int = 16
+    RESUME_SEARCH_MAX_K: int = 500
+
+    # Embedding cache (HuggingFace embeddings persisted across batches and restarts)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_DIR: str = "data/embedding_cache"
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 50000
+
     class Config:
         env_file = ".env"
 
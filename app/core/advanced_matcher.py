@@ -1,68 +1,34 @@
 
 import logging
-import os
-import time
-import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, NamedTuple, Optional
+
+from app.config import settings
+from app.core.chunked_embedding import ChunkedEmbedder
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.corpus_idf import CorpusIdf
+from app.core.embedding_cache import EmbeddingCache
+from app.core.embedding_client import AsyncEmbeddingClient
+from app.core.embedding_providers import (
+    EmbeddingProvider,
+    HuggingFaceProvider,
+    get_embedding_provider,
+)
+from app.core.tfidf_scorer import BatchTfidfScorer, tfidf_similarity
 
 logger = logging.getLogger(__name__)
 
+# Which scorer produced a semantic score (other providers report their own name)
+SCORER_EMBEDDING = HuggingFaceProvider.name
+SCORER_TFIDF = "tfidf"
 
-def _cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
-    """Computes cosine similarity between two vectors."""
-    a = np.array(vec1)
-    b = np.array(vec2)
-    norm_a = np.linalg.norm(a)
-    norm_b = np.linalg.norm(b)
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
-    return float(np.dot(a, b) / (norm_a * norm_b))
-
-
-def _tfidf_similarity(text1: str, text2: str) -> float:
-    """Lightweight TF-IDF cosine similarity fallback (no RAM-heavy models)."""
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity as sk_cosine
-    try:
-        vectorizer = TfidfVectorizer(stop_words="english", max_features=5000)
-        tfidf_matrix = vectorizer.fit_transform([text1, text2])
-        score = sk_cosine(tfidf_matrix[0], tfidf_matrix[1])[0][0]
-        return float(score)
-    except Exception as e:
-        logger.warning(f"TF-IDF fallback failed: {e}")
-        return 0.0
-
-
-def _get_hf_embedding(text: str, api_token: str) -> List[float] | None:
-    """
-    Gets sentence embedding from HuggingFace Inference API.
-    Uses all-MiniLM-L6-v2 model (same as local BERT) — no local memory cost.
-    Returns None on failure so caller can fall back to TF-IDF.
-    """
-    import httpx
-    API_URL = "https://api-inference.huggingface.co/models/sentence-transformers/all-MiniLM-L6-v2"
-    headers = {"Authorization": f"Bearer {api_token}"}
-
-    # Truncate text to stay within API limits (512 tokens ≈ 2000 chars)
-    text = text[:2000]
-
-    try:
-        response = httpx.post(
-            API_URL,
-            headers=headers,
-            json={"inputs": text, "options": {"wait_for_model": True}},
-            timeout=30.0,
-        )
-        if response.status_code == 200:
-            result = response.json()
-            # API returns a list of floats (the embedding vector)
-            if isinstance(result, list) and len(result) > 0:
-                return result
-        logger.warning(f"HuggingFace API returned status {response.status_code}: {response.text[:200]}")
-        return None
-    except Exception as e:
-        logger.warning(f"HuggingFace API call failed: {e}")
-        return None
+
+class SemanticScore(NamedTuple):
+    score: float
+    scorer: str
+
+
+# Pairwise TF-IDF fallback (kept under its old name for callers of this module)
+_tfidf_similarity = tfidf_similarity
 
 
 class AdvancedMatcher:
@@ -70,31 +36,70 @@ class AdvancedMatcher:
     Calculates semantic similarity between resumes and job descriptions.
 
     Strategy (in order of preference):
-    1. HuggingFace Inference API (BERT quality, zero local RAM)
-    2. TF-IDF cosine similarity fallback (if HF API unavailable/rate-limited)
+    1. Embeddings from the configured EmbeddingProvider (EMBEDDING_PROVIDER):
+       - "huggingface": HuggingFace Inference API (BERT quality, zero local RAM),
+         cached on disk, batched and guarded by a circuit breaker and latency budget.
+       - "local": in-process hashed n-gram embeddings (no network, no rate limits).
+       - "tfidf": no embeddings at all.
+       Whole texts are scored: they are embedded as overlapping chunks (ChunkedEmbedder,
+       EMBEDDING_CHUNK_* settings) pooled into one score per resume.
+    2. TF-IDF cosine similarity fallback (provider unavailable, or no vector for a
+       text); every resume that falls back in a batch is scored by one BatchTfidfScorer
+       pass (TFIDF_BATCH_MODE), or against the recruiter's stored corpus IDF when one
+       is given.
+
+    ascore_batch reports which scorer produced each score.
     """
 
-    def __init__(self):
-        self._hf_token: str | None = os.environ.get("HF_API_TOKEN") or os.environ.get("HUGGINGFACE_API_TOKEN")
-        if self._hf_token:
-            logger.info("AdvancedMatcher: HuggingFace Inference API mode enabled.")
-        else:
-            logger.warning(
-                "AdvancedMatcher: HF_API_TOKEN not set. "
-                "Falling back to TF-IDF similarity (still accurate for keyword matching)."
+    def __init__(self, cache: Optional[EmbeddingCache] = None, client: Optional[AsyncEmbeddingClient] = None,
+                 breaker: Optional[CircuitBreaker] = None, corpus: Optional[CorpusIdf] = None,
+                 provider: Optional[EmbeddingProvider] = None):
+        """
+        Args:
+            cache (EmbeddingCache): HuggingFace embedding store. Defaults to the process-wide
+                                    cache configured by EMBEDDING_CACHE_* settings (if enabled).
+            client (AsyncEmbeddingClient): HuggingFace client for async scoring. Defaults to the
+                                           shared client of the running event loop.
+            breaker (CircuitBreaker): Breaker for the HuggingFace API. Defaults to the
+                                      process-wide one (an injected client keeps its own breaker).
+            corpus (CorpusIdf): Recruiter corpus IDF for the TF-IDF fallback. Without it the
+                                fallback weighs terms by the batch alone (TFIDF_BATCH_MODE).
+            provider (EmbeddingProvider): Embedding provider. Defaults to EMBEDDING_PROVIDER
+                                          (cache/client/breaker apply to HuggingFace).
+        """
+        if provider is None:
+            provider = get_embedding_provider(cache=cache, client=client, breaker=breaker)
+        # Both have .score(resumes, job_description)
+        self.tfidf = corpus if corpus is not None else BatchTfidfScorer(settings.TFIDF_BATCH_MODE)
+        if provider is not None and provider.available:
+            logger.info(f"AdvancedMatcher: '{provider.name}' embeddings enabled.")
+            self.provider: Optional[EmbeddingProvider] = provider
+            self.chunker: Optional[ChunkedEmbedder] = ChunkedEmbedder(
+                provider,
+                window=settings.EMBEDDING_CHUNK_CHARS,
+                overlap=settings.EMBEDDING_CHUNK_OVERLAP,
+                batch_size=settings.EMBEDDING_CHUNK_BATCH,
+                pooling=settings.EMBEDDING_CHUNK_POOLING,
             )
+        else:
+            if provider is not None:
+                logger.warning(
+                    f"AdvancedMatcher: '{provider.name}' embeddings unavailable (is HF_API_TOKEN set?). "
+                    "Falling back to TF-IDF similarity (still accurate for keyword matching)."
+                )
+            self.provider = None
+            self.chunker = None
 
     def calculate_similarity(self, text1: str, text2: str) -> float:
         """
         Calculates semantic similarity between two texts.
         Returns float between 0.0 and 1.0.
         """
-        if self._hf_token:
-            emb1 = _get_hf_embedding(text1, self._hf_token)
-            emb2 = _get_hf_embedding(text2, self._hf_token)
-            if emb1 is not None and emb2 is not None:
-                return _cosine_similarity(emb1, emb2)
-            logger.warning("HF API failed for calculate_similarity, falling back to TF-IDF.")
+        if self.chunker is not None:
+            _, (score,) = self.chunker.score([text1], text2)
+            if score is not None:
+                return score
+            logger.warning("Embedding failed for calculate_similarity, falling back to TF-IDF.")
 
         return _tfidf_similarity(text1, text2)
 
@@ -106,23 +111,55 @@ class AdvancedMatcher:
         if not resumes:
             return []
 
-        if self._hf_token:
-            # Get JD embedding once
-            jd_embedding = _get_hf_embedding(job_description, self._hf_token)
-            if jd_embedding is not None:
-                scores = []
-                for resume_text in resumes:
-                    resume_embedding = _get_hf_embedding(resume_text, self._hf_token)
-                    if resume_embedding is not None:
-                        scores.append(_cosine_similarity(jd_embedding, resume_embedding))
-                    else:
-                        # Fall back to TF-IDF for this individual resume
-                        scores.append(_tfidf_similarity(resume_text, job_description))
-                return scores
-            logger.warning("HF API failed for JD embedding in batch_compare, falling back to TF-IDF for all.")
+        if self.chunker is not None:
+            jd_embedded, cosines = self.chunker.score(resumes, job_description)
+            if jd_embedded:
+                return [score for score, _ in self._combine(resumes, job_description, cosines)]
+            logger.warning("JD embedding failed in batch_compare, falling back to TF-IDF for all.")
 
         # Full TF-IDF fallback for all resumes
-        return [_tfidf_similarity(r, job_description) for r in resumes]
+        return self.tfidf.score(resumes, job_description)
+
+    def _combine(self, resumes: List[str], job_description: str,
+                 cosines: List[Optional[float]]) -> List[SemanticScore]:
+        """Embedding scores where a resume has one; one batch TF-IDF pass for the rest."""
+        scores: List[Optional[SemanticScore]] = [
+            SemanticScore(cosine, self.provider.name) if cosine is not None else None for cosine in cosines
+        ]
+        fallback = [i for i, score in enumerate(scores) if score is None]
+        if fallback:
+            tfidf_scores = self.tfidf.score([resumes[i] for i in fallback], job_description)
+            for i, score in zip(fallback, tfidf_scores):
+                scores[i] = SemanticScore(score, SCORER_TFIDF)
+        return scores
+
+    async def ascore_batch(self, resumes: List[str], job_description: str,
+                           budget: Optional[float] = None) -> List[SemanticScore]:
+        """
+        Scores resumes against a JD, reporting the scorer behind each score.
+
+        The chunks of the JD and all resumes are streamed through the provider in
+        batches (for HuggingFace: concurrent batched requests, cache hits need no
+        request). Resumes with a chunk not embedded within `budget` seconds (default
+        EMBEDDING_BATCH_BUDGET_SECONDS), skipped by an open circuit breaker, or failed,
+        fall back to TF-IDF; if the JD embedding is missing, every resume does.
+        """
+        if not resumes:
+            return []
+        if budget is None:
+            budget = settings.EMBEDDING_BATCH_BUDGET_SECONDS
+
+        if self.chunker is not None:
+            jd_embedded, cosines = await self.chunker.ascore(resumes, job_description, budget=budget)
+            if jd_embedded:
+                return self._combine(resumes, job_description, cosines)
+            logger.warning("JD embedding unavailable in ascore_batch, falling back to TF-IDF for all.")
+
+        return [SemanticScore(score, SCORER_TFIDF) for score in self.tfidf.score(resumes, job_description)]
+
+    async def abatch_compare(self, resumes: List[str], job_description: str) -> List[float]:
+        """Async batch_compare (see ascore_batch): just the scores."""
+        return [result.score for result in await self.ascore_batch(resumes, job_description)]
 
     def compare_methods(self, resumes: List[Dict[str, Any]], job_description: str) -> List[Dict[str, Any]]:
         """
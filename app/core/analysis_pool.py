@@ -0,0 +1,298 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.core.docx_extractor import extract_text_from_docx
+from app.core.experience_extractor import extract_experience, extract_required_experience_from_jd
+from app.core.feature_record import build_feature_record, is_current, record_experience
+from app.core.parsed_document import ParsedDocument
+from app.core.pdf_extractor import extract_text_from_pdf
+from app.core.skill_extractor import SkillExtractor, canonical_skill_ids
+from app.core.skill_matcher import SkillMatcher
+from app.core.taxonomy import CompiledTaxonomy
+from app.core.text_processor import TextProcessor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Pipeline components of this process: built once per pool worker by init_worker, or
+# shared with the app process (use_components) when tasks run in a thread
+_text_processor: Optional[TextProcessor] = None
+_skill_extractor: Optional[SkillExtractor] = None
+_components_lock = threading.Lock()
+
+
+def init_worker(db_path: Optional[str] = None):
+    """Pool worker initializer: loads NLTK resources and the skills taxonomy once per process."""
+    global _text_processor, _skill_extractor
+    _text_processor = TextProcessor()
+    _skill_extractor = SkillExtractor(db_path) if db_path else SkillExtractor()
+    logger.info(f"Analysis worker {os.getpid()} ready (taxonomy v{_skill_extractor.version}).")
+
+
+def use_components(text_processor: TextProcessor, skill_extractor: SkillExtractor):
+    """Lets tasks run in this process reuse already loaded components."""
+    global _text_processor, _skill_extractor
+    with _components_lock:
+        _text_processor, _skill_extractor = text_processor, skill_extractor
+
+
+def _components() -> Tuple[TextProcessor, SkillExtractor]:
+    with _components_lock:
+        if _text_processor is None or _skill_extractor is None:
+            init_worker()
+        return _text_processor, _skill_extractor
+
+
+def _taxonomy() -> CompiledTaxonomy:
+    """The current skills taxonomy, for one task: its records, JD ids and matching all use this snapshot."""
+    _, skill_extractor = _components()
+    skill_extractor.reload_if_changed()
+    return skill_extractor.taxonomy
+
+
+def extract_resume_text(path: str) -> str:
+    """Text of a PDF, DOCX or TXT file ("" for other extensions)."""
+    extension = path.rsplit(".", 1)[-1].lower()
+    if extension == "pdf":
+        return extract_text_from_pdf(path)
+    if extension == "docx":
+        return extract_text_from_docx(path)
+    if extension == "txt":
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    return ""
+
+
+def _extract_texts(paths: Sequence[str]) -> List[Optional[str]]:
+    texts: List[Optional[str]] = []
+    for path in paths:
+        try:
+            texts.append(extract_resume_text(path))
+        except Exception as e:
+            logger.error(f"Error extracting {path}: {e}")
+            texts.append(None)
+    return texts
+
+
+def extract_resume_records(paths: Sequence[str]) -> List[Optional[Tuple[str, Optional[Dict[str, Any]]]]]:
+    """
+    (text, feature record) of each file, None where extraction failed: the record is
+    built while the text is at hand (None if that failed).
+    """
+    taxonomy = _taxonomy()
+    results: List[Optional[Tuple[str, Optional[Dict[str, Any]]]]] = []
+    for path, text in zip(paths, _extract_texts(paths)):
+        record = None
+        if text:
+            try:
+                record = build_feature_record(text, taxonomy)
+            except Exception as e:
+                logger.error(f"Error building the features of {path}: {e}")
+        results.append(None if text is None else (text, record))
+    return results
+
+
+def resume_features(resumes: Sequence[Tuple[str, str]], jd_skills: Dict[str, List[str]],
+                    records: Optional[Sequence[Optional[Dict[str, Any]]]] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Per-resume batch stages for (resume_id, text) pairs: inferred name, years of
+    experience and the JD skill match. None for a resume that failed.
+
+    `records` are the resumes' stored feature records (aligned with `resumes`); a
+    current one is used as is, leaving only the JD skill match to compute. A missing or
+    stale record is rebuilt from the text and returned as the result's "feature_record"
+    so the caller can store it.
+    """
+    taxonomy = _taxonomy()
+    if records is None:
+        records = [None] * len(resumes)
+
+    features: List[Optional[Dict[str, Any]]] = []
+    skill_ids = []
+    for (resume_id, content_text), record in zip(resumes, records):
+        try:
+            rebuilt = not is_current(record, taxonomy.version)
+            if rebuilt:
+                record = build_feature_record(content_text, taxonomy)
+            feature = {
+                "name": record["name"] or f"Candidate-{resume_id[:4]}",
+                "years_of_experience": record_experience(record),
+            }
+            if rebuilt:
+                feature["feature_record"] = record
+            skill_ids.append(record["skill_ids"])
+            features.append(feature)
+        except Exception as e:
+            logger.error(f"Error processing resume {resume_id}: {e}")
+            features.append(None)
+
+    # Skill ids are only meaningful in this process's taxonomy: match here, return names
+    skill_matcher = SkillMatcher(vocabulary=taxonomy.vocabulary, similarity=taxonomy.similarity)
+    skill_results = skill_matcher.match_batch(skill_ids, canonical_skill_ids(taxonomy, jd_skills))
+    matched = (i for i, feature in enumerate(features) if feature is not None)
+    for row, i in enumerate(matched):
+        features[i].update({
+            "skill_match_percentage": skill_results.percentages[row],
+            "matched_skills": skill_results.matched_skills(row),
+            "missing_skills": skill_results.missing_skills(row),
+        })
+    return features
+
+
+def analyze_resume_text(content_text: str, job_description: str) -> Dict[str, Any]:
+    """Full single-resume analysis for /analyze: contacts, all skills, experience and the skill gap."""
+    text_processor, skill_extractor = _components()
+    # Parse once; every stage below reads the same normalized text and tokens
+    document = ParsedDocument(content_text)
+    contacts = text_processor.extract_contacts(document)
+    resume_skills = skill_extractor.extract_skills(document)
+    jd_skills = skill_extractor.extract_skills(job_description)
+
+    # Skill names come from the taxonomy, so partial matches are lookups in its similarity matrix
+    taxonomy = skill_extractor.taxonomy
+    skill_matcher = SkillMatcher(vocabulary=taxonomy.vocabulary, similarity=taxonomy.similarity)
+    skill_match = skill_matcher.match_skills(
+        [skill for skills in resume_skills.values() for skill in skills],
+        [skill for skills in jd_skills.values() for skill in skills],
+    )
+    return {
+        "emails": contacts.get("emails", []),
+        "phone_numbers": contacts.get("phone_numbers", []),
+        "extracted_skills": resume_skills,
+        "years_of_experience": extract_experience(document),
+        "skill_match_details": skill_match,
+        "required_experience": extract_required_experience_from_jd(job_description),
+    }
+
+
+def default_workers() -> int:
+    """CPU cores this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class AnalysisPool:
+    """
+    Runs the CPU-bound resume pipeline (text extraction, parsing, skill extraction and
+    matching, experience) off the event loop, so a big batch doesn't stall other requests.
+
+    With workers > 0 tasks go to a process pool; each worker loads NLTK resources and
+    the skills taxonomy once (init_worker). Resumes are sent task_size at a time,
+    with their stored feature records, and the tasks of a batch are gathered
+    concurrently. With workers == 0 tasks run in a thread of this process instead (no
+    extra memory, but one core).
+
+    The pool starts on first use; a worker that dies breaks the pool, which is then
+    rebuilt for the next task.
+
+    Args:
+        workers (int): Worker processes (0: run in a thread).
+        task_size (int): Resumes per pool task.
+        db_path (str): Skills taxonomy for the workers (default: SkillExtractor's).
+    """
+
+    def __init__(self, workers: int = 0, task_size: int = 8, db_path: Optional[str] = None):
+        self.workers = max(0, workers)
+        self.task_size = max(1, task_size)
+        self.db_path = db_path
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.workers == 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # spawn: workers don't inherit the event loop, its threads or open connections
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=init_worker,
+                    initargs=(self.db_path,),
+                )
+                logger.info(f"Analysis pool started with {self.workers} worker processes.")
+            return self._executor
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """fn(*args) in a worker (fn must be a picklable module-level function)."""
+        executor = self._get_executor()
+        if executor is None:
+            return await asyncio.to_thread(fn, *args)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            logger.error("Analysis worker died, restarting the pool.")
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False)
+            raise
+
+    async def _map(self, fn: Callable, items: Sequence, *args, aligned: Optional[Sequence] = None) -> List:
+        """fn(items slice, *args[, aligned slice]) per task_size items, results concatenated in order."""
+        tasks = []
+        for i in range(0, len(items), self.task_size):
+            extra = () if aligned is None else (list(aligned[i:i + self.task_size]),)
+            tasks.append(self.run(fn, items[i:i + self.task_size], *args, *extra))
+        results = []
+        for part in await asyncio.gather(*tasks):
+            results.extend(part)
+        return results
+
+    async def extract_text(self, path: str) -> str:
+        """Text of one file; extraction errors are raised."""
+        return await self.run(extract_resume_text, path)
+
+    async def extract_texts(self, paths: Sequence[str]) -> List[Optional[str]]:
+        """Text of each file, None where extraction failed (errors are logged)."""
+        return await self._map(_extract_texts, list(paths))
+
+    async def extract_records(self, paths: Sequence[str]) -> List[Optional[Tuple[str, Optional[Dict[str, Any]]]]]:
+        """(text, feature record) of each file, None where extraction failed."""
+        return await self._map(extract_resume_records, list(paths))
+
+    async def resume_features(self, resumes: Sequence[Tuple[str, str]], jd_skills: Dict[str, List[str]],
+                              records: Optional[Sequence[Optional[Dict[str, Any]]]] = None) -> List[Optional[Dict[str, Any]]]:
+        """resume_features for every (resume_id, text) pair, in order (with their stored records, if any)."""
+        return await self._map(resume_features, list(resumes), jd_skills, aligned=records)
+
+    async def analyze_resume(self, content_text: str, job_description: str) -> Dict[str, Any]:
+        return await self.run(analyze_resume_text, content_text, job_description)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+_pool: Optional[AnalysisPool] = None
+
+
+def get_analysis_pool() -> AnalysisPool:
+    """Process-wide AnalysisPool sized by ANALYSIS_WORKERS (-1: one process per core)."""
+    global _pool
+    if _pool is None:
+        workers = settings.ANALYSIS_WORKERS
+        _pool = AnalysisPool(
+            workers=default_workers() if workers < 0 else workers,
+            task_size=settings.ANALYSIS_TASK_SIZE,
+        )
+    return _pool
+
+
+def shutdown_analysis_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
@@ -0,0 +1,248 @@
+import logging
+import time
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.embedding_providers import EmbeddingProvider
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+POOLING = ("max", "mean")
+
+
+def _last_space(text: str, lo: int, hi: int) -> int:
+    return max(text.rfind(" ", lo, hi), text.rfind("\n", lo, hi), text.rfind("\t", lo, hi))
+
+
+def iter_chunks(text: str, window: int, overlap: int) -> Iterator[str]:
+    """
+    Overlapping windows of at most `window` characters covering text, cut at whitespace
+    where possible. A text that fits in one window is yielded unchanged; a blank text
+    yields nothing.
+    """
+    if not text or not text.strip():
+        return
+    if len(text) <= window:
+        yield text
+        return
+    start = 0
+    while True:
+        end = start + window
+        if end >= len(text):
+            yield text[start:]
+            return
+        cut = _last_space(text, start + window // 2, end)
+        if cut <= start:
+            cut = end
+        yield text[start:cut]
+        # Step back by the overlap, then forward to the start of a word
+        next_start = cut - overlap
+        space = _last_space(text, next_start - overlap // 2, next_start)
+        start = space + 1 if space > start else next_start
+
+
+class _PooledScores:
+    """Running per-resume pooled scores, folded one batch of chunk vectors at a time."""
+
+    def __init__(self, n_resumes: int, pooling: str):
+        self.pooling = pooling
+        self.jd_sum: Optional[np.ndarray] = None
+        self.jd: Optional[np.ndarray] = None
+        self.jd_failed = False
+        self.chunks = np.zeros(n_resumes, dtype=np.int64)
+        self.failed = np.zeros(n_resumes, dtype=bool)
+        self.best = np.full(n_resumes, -np.inf)
+        self.sums: Optional[np.ndarray] = None
+        # Resumes from this index on were not (fully) streamed, e.g. budget ran out
+        self.cutoff = n_resumes
+
+    def _finish_jd(self) -> bool:
+        if self.jd is None:
+            if self.jd_failed or self.jd_sum is None or not np.any(self.jd_sum):
+                return False
+            self.jd = self.jd_sum / np.linalg.norm(self.jd_sum)
+        return True
+
+    def fold(self, batch: List[Tuple[int, str]], vectors: List[Optional[np.ndarray]]) -> bool:
+        """Adds a batch (doc 0 is the JD, doc i > 0 is resume i - 1). False once the JD failed."""
+        rows, docs = [], []
+        for (doc, _), vector in zip(batch, vectors):
+            if doc == 0:
+                if vector is None:
+                    self.jd_failed = True
+                else:
+                    unit = _unit(vector)
+                    self.jd_sum = unit if self.jd_sum is None else self.jd_sum + unit
+                continue
+            self.chunks[doc - 1] += 1
+            if vector is None:
+                self.failed[doc - 1] = True
+            else:
+                rows.append(vector)
+                docs.append(doc - 1)
+        if not rows:
+            return not self.jd_failed
+        # JD chunks come first in the stream, so the JD is complete once resumes start
+        if not self._finish_jd():
+            return False
+
+        matrix = np.stack([_unit(row) for row in rows]).astype(np.float64)
+        docs = np.asarray(docs)
+        if self.pooling == "max":
+            np.maximum.at(self.best, docs, matrix @ self.jd)
+        else:
+            if self.sums is None:
+                self.sums = np.zeros((len(self.chunks), matrix.shape[1]))
+            np.add.at(self.sums, docs, matrix)
+        return True
+
+    def scores(self) -> Tuple[bool, List[Optional[float]]]:
+        """(JD embedded, pooled cosine per resume or None if any chunk is missing)."""
+        if not self._finish_jd():
+            return False, [None] * len(self.chunks)
+        result: List[Optional[float]] = []
+        for i, (n_chunks, failed) in enumerate(zip(self.chunks, self.failed)):
+            if failed or n_chunks == 0 or i >= self.cutoff:
+                result.append(None)
+            elif self.pooling == "max":
+                result.append(float(self.best[i]))
+            else:
+                mean = self.sums[i] / n_chunks
+                norm = np.linalg.norm(mean)
+                result.append(float(mean @ self.jd / norm) if norm > 0 else 0.0)
+        return True, result
+
+
+class _PooledVectors:
+    """Running per-text sums of unit chunk embeddings."""
+
+    def __init__(self, n_texts: int):
+        self.sums: Optional[np.ndarray] = None
+        self.chunks = np.zeros(n_texts, dtype=np.int64)
+        self.failed = np.zeros(n_texts, dtype=bool)
+
+    def fold(self, batch: List[Tuple[int, str]], vectors: List[Optional[np.ndarray]]):
+        for (doc, _), vector in zip(batch, vectors):
+            self.chunks[doc] += 1
+            if vector is None:
+                self.failed[doc] = True
+                continue
+            if self.sums is None:
+                self.sums = np.zeros((len(self.chunks), len(vector)))
+            self.sums[doc] += _unit(vector)
+
+    def vectors(self) -> List[Optional[np.ndarray]]:
+        result: List[Optional[np.ndarray]] = []
+        for i, (n_chunks, failed) in enumerate(zip(self.chunks, self.failed)):
+            if failed or n_chunks == 0 or self.sums is None or not np.any(self.sums[i]):
+                result.append(None)
+            else:
+                result.append(_unit(self.sums[i]).astype(np.float32))
+        return result
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float64)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+class ChunkedEmbedder:
+    """
+    Whole-resume embedding scores through an EmbeddingProvider.
+
+    Texts are split into overlapping windows (iter_chunks), so nothing past the first
+    window is ignored. Chunks are streamed through the provider batch_size at a time by
+    a generator, and each batch is folded into per-resume running scores right away,
+    so memory holds one batch of chunks (plus one pooled vector per resume for "mean")
+    however long the resumes are. Chunk embeddings are cached by the provider (the
+    HuggingFace provider keys its cache on the chunk text's hash), so a resume that
+    shares a section with one seen before only sends the new chunks.
+
+    A resume's score is pooled over its chunks, against the JD's mean chunk embedding:
+    - "max": best-matching chunk (a strong section counts in full)
+    - "mean": cosine of the mean chunk embedding (the resume as a whole)
+
+    Args:
+        provider (EmbeddingProvider): Embeds the chunks.
+        window (int): Chunk size in characters (capped at the provider's max_input_chars).
+        overlap (int): Characters shared by consecutive chunks.
+        batch_size (int): Chunks per provider call.
+        pooling (str): One of POOLING.
+    """
+
+    def __init__(self, provider: EmbeddingProvider, window: int = 2000, overlap: int = 200,
+                 batch_size: int = 64, pooling: str = "max"):
+        if pooling not in POOLING:
+            raise ValueError(f"Unknown pooling '{pooling}', expected one of {POOLING}")
+        if provider.max_input_chars:
+            window = min(window, provider.max_input_chars)
+        self.provider = provider
+        self.window = max(1, window)
+        # Less than half a window, so every chunk moves forward
+        self.overlap = max(0, min(overlap, (self.window - 1) // 2))
+        self.batch_size = max(1, batch_size)
+        self.pooling = pooling
+
+    def iter_batches(self, texts: Sequence[str]) -> Iterator[List[Tuple[int, str]]]:
+        """(text index, chunk) pairs in text order, batch_size at a time."""
+        batch: List[Tuple[int, str]] = []
+        for i, text in enumerate(texts):
+            for chunk in iter_chunks(text, self.window, self.overlap):
+                batch.append((i, chunk))
+                if len(batch) == self.batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    def embed_documents(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        One unit vector per text: the normalized mean of its unit chunk embeddings
+        (None for a blank text or when any chunk got no embedding).
+        """
+        pooled = _PooledVectors(len(texts))
+        for batch in self.iter_batches(texts):
+            pooled.fold(batch, self.provider.embed_many([chunk for _, chunk in batch]))
+        return pooled.vectors()
+
+    async def aembed_documents(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Async embed_documents."""
+        pooled = _PooledVectors(len(texts))
+        for batch in self.iter_batches(texts):
+            pooled.fold(batch, await self.provider.aembed_many([chunk for _, chunk in batch]))
+        return pooled.vectors()
+
+    def score(self, resumes: Sequence[str], job_description: str) -> Tuple[bool, List[Optional[float]]]:
+        """
+        (JD embedded, pooled cosine per resume). A resume is None when any of its chunks
+        got no embedding; if the JD got none, streaming stops and every resume is None.
+        """
+        state = _PooledScores(len(resumes), self.pooling)
+        for batch in self.iter_batches([job_description, *resumes]):
+            if not state.fold(batch, self.provider.embed_many([chunk for _, chunk in batch])):
+                break
+        return state.scores()
+
+    async def ascore(self, resumes: Sequence[str], job_description: str,
+                     budget: Optional[float] = None) -> Tuple[bool, List[Optional[float]]]:
+        """Async score; resumes not fully embedded within `budget` seconds are None."""
+        state = _PooledScores(len(resumes), self.pooling)
+        deadline = time.monotonic() + budget if budget is not None else None
+        for batch in self.iter_batches([job_description, *resumes]):
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                logger.warning(f"Embedding latency budget of {budget:.1f}s exhausted while streaming chunks.")
+                first = batch[0][0]
+                if first == 0:
+                    state.jd_failed = True
+                else:
+                    state.cutoff = first - 1
+                break
+            vectors = await self.provider.aembed_many([chunk for _, chunk in batch], budget=remaining)
+            if not state.fold(batch, vectors):
+                break
+        return state.scores()
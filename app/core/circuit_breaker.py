@@ -0,0 +1,118 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a remote provider (the HuggingFace embedding API).
+
+    Closed: requests go through. It trips open after failure_threshold consecutive
+    failures, or when the p95 latency of the last `window` calls exceeds
+    latency_threshold seconds (once at least min_samples calls were seen).
+    Open: allow_request() is False, so callers use their fallback right away.
+    After reset_timeout seconds the breaker goes half-open and lets a single probe
+    through; its success closes the breaker, its failure opens it again.
+
+    Args:
+        name (str): Used in log messages.
+        failure_threshold (int): Consecutive failures that trip the breaker.
+        latency_threshold (float): p95 latency (seconds) that trips the breaker.
+        window (int): Number of recent call latencies the p95 is computed over.
+        min_samples (int): Calls needed before the latency rule applies.
+        reset_timeout (float): Seconds to stay open before probing.
+        clock (callable): Monotonic time source (injectable for tests).
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, latency_threshold: float = 10.0,
+                 window: int = 20, min_samples: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.min_samples = min_samples
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=window)
+        self._consecutive_failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def p95_latency(self) -> Optional[float]:
+        with self._lock:
+            return float(np.percentile(self._latencies, 95)) if self._latencies else None
+
+    def allow_request(self) -> bool:
+        """True if a call may go to the provider now (claims the probe when half-open)."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = HALF_OPEN
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+            self._consecutive_failures = 0
+            if self._state == HALF_OPEN:
+                logger.info(f"Circuit '{self.name}' closed after a successful probe ({latency:.2f}s).")
+                self._state = CLOSED
+                self._probe_in_flight = False
+                self._latencies.clear()
+                self._latencies.append(latency)
+            elif self._state == CLOSED and len(self._latencies) >= self.min_samples:
+                p95 = float(np.percentile(self._latencies, 95))
+                if p95 > self.latency_threshold:
+                    self._trip(f"p95 latency {p95:.2f}s > {self.latency_threshold:.2f}s")
+
+    def record_failure(self, latency: Optional[float] = None):
+        with self._lock:
+            if latency is not None:
+                self._latencies.append(latency)
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN:
+                self._trip("probe failed")
+            elif self._state == CLOSED and self._consecutive_failures >= self.failure_threshold:
+                self._trip(f"{self._consecutive_failures} consecutive failures")
+
+    def _trip(self, reason: str):
+        logger.warning(f"Circuit '{self.name}' opened: {reason}. Using the fallback for {self.reset_timeout:.0f}s.")
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, object]:
+        p95 = self.p95_latency()
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "p95_latency": round(p95, 3) if p95 is not None else None,
+        }
@@ -0,0 +1,84 @@
+import logging
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Same tokenization as the TF-IDF fallback (TfidfVectorizer(stop_words="english"))
+_analyzer = CountVectorizer(stop_words="english").build_analyzer()
+
+
+def document_terms(text: str) -> set:
+    """Distinct terms of a document, as the TF-IDF vectorizers tokenize it."""
+    return set(_analyzer(text or ""))
+
+
+def document_frequency_delta(texts: Iterable[str]) -> Tuple[int, Counter]:
+    """(number of documents, per-term document counts) to add to a corpus."""
+    n_docs = 0
+    df: Counter = Counter()
+    for text in texts:
+        n_docs += 1
+        df.update(document_terms(text))
+    return n_docs, df
+
+
+def prune_terms(document_frequencies: Dict[str, int], max_terms: int) -> Dict[str, int]:
+    """Keeps the max_terms most frequent terms (rarer ones then score as unseen)."""
+    if len(document_frequencies) <= max_terms:
+        return document_frequencies
+    kept = sorted(document_frequencies.items(), key=lambda item: (-item[1], item[0]))[:max_terms]
+    return dict(kept)
+
+
+class CorpusIdf:
+    """
+    TF-IDF scoring against a recruiter's whole resume corpus instead of one resume/JD pair.
+
+    Holds the document count and per-term document frequencies of every resume the
+    tenant has screened (persisted in the corpus_stats table and grown incrementally),
+    and scores with idf(t) = ln((1 + N) / (1 + df(t))) + 1, sklearn's smoothed IDF.
+    Nothing is refit at scoring time, so scores are comparable across runs.
+
+    Args:
+        doc_count (int): Documents in the corpus.
+        document_frequencies (Dict[str, int]): Documents containing each term.
+    """
+
+    def __init__(self, doc_count: int = 0, document_frequencies: Optional[Dict[str, int]] = None):
+        self.doc_count = doc_count
+        self.document_frequencies: Dict[str, int] = dict(document_frequencies or {})
+
+    def add_documents(self, texts: Iterable[str]) -> "CorpusIdf":
+        n_docs, df = document_frequency_delta(texts)
+        self.doc_count += n_docs
+        for term, count in df.items():
+            self.document_frequencies[term] = self.document_frequencies.get(term, 0) + count
+        return self
+
+    def idf(self, terms: Sequence[str]) -> np.ndarray:
+        df = np.fromiter((self.document_frequencies.get(t, 0) for t in terms), dtype=np.float64, count=len(terms))
+        return np.log((1.0 + self.doc_count) / (1.0 + df)) + 1.0
+
+    def score(self, resumes: Sequence[str], job_description: str) -> List[float]:
+        """Cosine similarity of each resume to the JD under the corpus IDF."""
+        if not resumes:
+            return []
+        vectorizer = CountVectorizer(stop_words="english")
+        try:
+            counts = vectorizer.fit_transform([job_description, *resumes])
+        except ValueError as e:
+            # Nothing but stop words in the whole batch
+            logger.warning(f"Corpus TF-IDF failed: {e}")
+            return [0.0] * len(resumes)
+
+        weights = counts.astype(np.float64).multiply(self.idf(vectorizer.get_feature_names_out())).tocsr()
+        norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+        dots = (weights[1:] @ weights[0].T).toarray().ravel()
+        denominator = norms[1:] * norms[0]
+        return np.divide(dots, denominator, out=np.zeros_like(dots), where=denominator > 0).tolist()
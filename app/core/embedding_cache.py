@@ -0,0 +1,337 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single process assumed
+    fcntl = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_INITIAL_ROWS = 256
+
+
+class EmbeddingCache:
+    """
+    Persistent, size-bounded embedding store for one embedding model.
+
+    Vectors are float32 rows of a memory-mapped matrix (vectors.f32); index.log maps
+    sha256(model id + text) keys to rows. The log is append-only: "+ key row" when a row
+    is written and "- key" before a row is reused. When max_entries is reached the least
+    recently used entry is evicted and its row reused; the log is compacted when it
+    grows to several times the number of live entries.
+
+    Each row's key digest is also stored next to it (keys.bin, cleared while the row
+    is rewritten), and a read only returns a vector whose row still holds the requested
+    key. So neither a crash mid-write nor a row reused since the index was read can
+    return another text's vector.
+
+    Only one process can write to a cache directory (guarded by a lock file); other
+    processes open it read-only, don't store new vectors, and pick up the writer's
+    log as it grows (or is compacted).
+
+    Args:
+        cache_dir (str): Root directory; each model gets its own subdirectory.
+        model_id (str): Embedding model the vectors come from (part of every key).
+        max_entries (int): Maximum number of cached vectors.
+    """
+
+    def __init__(self, cache_dir: str, model_id: str, max_entries: int = 50000):
+        self.model_id = model_id
+        self.max_entries = max(1, max_entries)
+        self.path = os.path.join(cache_dir, re.sub(r'[^A-Za-z0-9._-]+', '_', model_id))
+        os.makedirs(self.path, exist_ok=True)
+        self._vectors_path = os.path.join(self.path, "vectors.f32")
+        self._keys_path = os.path.join(self.path, "keys.bin")
+        self._log_path = os.path.join(self.path, "index.log")
+        self._meta_path = os.path.join(self.path, "meta.json")
+
+        self._lock = threading.Lock()
+        self._rows: "OrderedDict[str, int]" = OrderedDict()  # key -> row, least recently used first
+        self._owner: Dict[int, str] = {}  # row -> key, while replaying the log
+        self._free_rows: List[int] = []
+        self._next_row = 0
+        self._log_lines = 0
+        self._log_offset = 0  # bytes of index.log replayed
+        self._log_state: Optional[tuple] = None  # (inode, size, mtime) when last replayed
+        self._dim: Optional[int] = None
+        self._matrix: Optional[np.memmap] = None
+        self._keys: Optional[np.memmap] = None  # row -> sha256 digest of its key (zeros: none)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.writable = self._acquire_writer_lock()
+        self._load()
+        self._log = open(self._log_path, "a", encoding="utf-8") if self.writable else None
+
+    def _acquire_writer_lock(self) -> bool:
+        self._lock_file = open(os.path.join(self.path, ".lock"), "a")
+        if fcntl is None:
+            return True
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            logger.info(f"Embedding cache {self.path} is owned by another process, opening read-only.")
+            return False
+
+    def _load(self):
+        """Reads the whole index.log and maps the vectors written so far."""
+        self._rows.clear()
+        self._owner = {}
+        self._log_lines = 0
+        self._log_offset = 0
+        self._log_state = None
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                self._dim = json.load(f)["dim"]
+        if not os.path.exists(self._log_path) or self._dim is None:
+            return
+
+        self._replay_log()
+        n_rows = self._map_rows()
+        # Drop entries whose vector never made it to disk
+        for key in [k for k, row in self._rows.items() if row >= n_rows]:
+            del self._rows[key]
+        if self.writable:
+            used = set(self._rows.values())
+            self._next_row = n_rows
+            self._free_rows = [row for row in range(n_rows) if row not in used]
+            # Caches written before keys.bin existed get their digests here
+            for key, row in self._rows.items():
+                self._keys[row] = np.frombuffer(bytes.fromhex(key), dtype=np.uint8)
+        logger.info(f"Embedding cache {self.path}: {len(self._rows)} vectors of dim {self._dim}")
+
+    def _replay_log(self):
+        """Applies the complete index.log lines written since the last replay."""
+        with open(self._log_path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            f.seek(self._log_offset)
+            data = f.read()
+        # A torn last line (crash, or a write in progress) is left for the next replay
+        end = data.rfind(b"\n") + 1
+        self._log_offset += end
+        self._log_state = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        for line in data[:end].decode("utf-8", errors="replace").splitlines():
+            parts = line.split()
+            self._log_lines += 1
+            if len(parts) == 3 and parts[0] == "+":
+                key, row = parts[1], int(parts[2])
+                previous = self._owner.get(row)
+                if previous is not None and previous != key:
+                    self._rows.pop(previous, None)
+                self._rows.pop(key, None)
+                self._rows[key] = row
+                self._owner[row] = key
+            elif len(parts) == 2 and parts[0] == "-":
+                row = self._rows.pop(parts[1], None)
+                if row is not None:
+                    self._owner.pop(row, None)
+            # Anything else is a garbled line from a crash
+
+    def _map_rows(self) -> int:
+        """(Re)maps vectors.f32 and keys.bin; returns the number of complete rows on disk."""
+        n_rows = os.path.getsize(self._vectors_path) // (4 * self._dim) if os.path.exists(self._vectors_path) else 0
+        if self.writable:
+            with open(self._keys_path, "ab") as f:
+                f.truncate(max(n_rows, 1) * 32)
+            n_keys = n_rows
+        else:
+            n_keys = min(n_rows, os.path.getsize(self._keys_path) // 32 if os.path.exists(self._keys_path) else 0)
+        mode = "r+" if self.writable else "r"
+        if n_rows and (self._matrix is None or self._matrix.shape[0] != n_rows):
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode=mode, shape=(n_rows, self._dim))
+        if n_keys and (self._keys is None or self._keys.shape[0] != n_keys):
+            self._keys = np.memmap(self._keys_path, dtype=np.uint8, mode=mode, shape=(n_keys, 32))
+        return n_rows
+
+    def _refresh(self):
+        """Read-only caches: catches up with the writer's index.log (a compacted log is read again)."""
+        try:
+            stat = os.stat(self._log_path)
+        except FileNotFoundError:
+            return
+        state = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if state == self._log_state:
+            return
+        if self._dim is None or self._log_state is None or stat.st_ino != self._log_state[0] \
+                or stat.st_size < self._log_offset:
+            self._load()
+        else:
+            self._replay_log()
+            self._map_rows()
+
+    def _read_row(self, key: str, row: int) -> Optional[np.ndarray]:
+        """A copy of the row's vector if the row (still) holds key."""
+        if self._matrix is None or self._keys is None or row >= self._keys.shape[0]:
+            return None
+        digest = np.frombuffer(bytes.fromhex(key), dtype=np.uint8)
+        if not np.array_equal(self._keys[row], digest):
+            return None
+        vector = np.array(self._matrix[row])
+        # Checked again: the writer may have reused the row while it was copied
+        return vector if np.array_equal(self._keys[row], digest) else None
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_id}\0{text}".encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._rows), "evictions": self.evictions}
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Returns a copy of the cached vector for text, or None."""
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        results: List[Optional[np.ndarray]] = []
+        with self._lock:
+            if not self.writable:
+                self._refresh()
+            for text in texts:
+                key = self.key(text)
+                row = self._rows.get(key)
+                vector = self._read_row(key, row) if row is not None else None
+                if vector is None:
+                    self.misses += 1
+                    if row is not None and not self.writable:
+                        # Row reused by the writer; its log entry for the new key comes later
+                        del self._rows[key]
+                else:
+                    self.hits += 1
+                    self._rows.move_to_end(key)
+                results.append(vector)
+        return results
+
+    def put(self, text: str, vector: Sequence[float]):
+        self.put_many([text], [vector])
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """Stores vectors (silently skipped on a read-only cache or a dimension mismatch)."""
+        if not self.writable:
+            return
+        with self._lock:
+            added = []
+            for text, vector in zip(texts, vectors):
+                vector = np.asarray(vector, dtype=np.float32).ravel()
+                if self._dim is None:
+                    self._init_dim(len(vector))
+                if len(vector) != self._dim:
+                    logger.warning(f"Embedding cache {self.path}: expected dim {self._dim}, got {len(vector)}; not cached.")
+                    continue
+                key = self.key(text)
+                if key in self._rows:
+                    self._rows.move_to_end(key)
+                    continue
+                row = self._allocate_row()
+                self._keys[row] = 0
+                self._matrix[row] = vector
+                self._keys[row] = np.frombuffer(bytes.fromhex(key), dtype=np.uint8)
+                self._rows[key] = row
+                added.append(f"+ {key} {row}")
+            if added:
+                # Vectors reach the disk before the log points at them
+                self._matrix.flush()
+                self._keys.flush()
+                for line in added:
+                    self._append_log(line)
+                self._log.flush()
+            if self._log_lines > 4 * max(len(self._rows), _INITIAL_ROWS):
+                self._compact()
+
+    def _init_dim(self, dim: int):
+        self._dim = dim
+        with open(self._meta_path, "w", encoding="utf-8") as f:
+            json.dump({"model_id": self.model_id, "dim": dim}, f)
+
+    def _allocate_row(self) -> int:
+        # A smaller max_entries than the cache on disk is trimmed here, as rows are needed
+        while len(self._rows) >= self.max_entries:
+            key, row = self._rows.popitem(last=False)
+            self.evictions += 1
+            # Tombstone first, so the old key never points at the new vector
+            self._append_log(f"- {key}")
+            self._log.flush()
+            self._free_rows.append(row)
+        if self._free_rows:
+            return self._free_rows.pop()
+        if self._matrix is None or self._next_row >= self._matrix.shape[0]:
+            self._grow()
+        row = self._next_row
+        self._next_row += 1
+        return row
+
+    def _grow(self):
+        capacity = self._matrix.shape[0] if self._matrix is not None else 0
+        new_capacity = min(max(_INITIAL_ROWS, capacity * 2), max(self.max_entries, 1))
+        new_capacity = max(new_capacity, self._next_row + 1)
+        self._matrix = None
+        self._keys = None
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(new_capacity * self._dim * 4)
+        with open(self._keys_path, "ab") as f:
+            f.truncate(new_capacity * 32)
+        self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(new_capacity, self._dim))
+        self._keys = np.memmap(self._keys_path, dtype=np.uint8, mode="r+", shape=(new_capacity, 32))
+
+    def _append_log(self, line: str):
+        self._log.write(line + "\n")
+        self._log_lines += 1
+
+    def _compact(self):
+        """Rewrites index.log with one line per live entry, in LRU order."""
+        tmp_path = f"{self._log_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for key, row in self._rows.items():
+                f.write(f"+ {key} {row}\n")
+        self._log.close()
+        os.replace(tmp_path, self._log_path)
+        self._log = open(self._log_path, "a", encoding="utf-8")
+        self._log_lines = len(self._rows)
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                self._compact()
+                self._log.close()
+                self._log = None
+                self.writable = False
+            self._matrix = None
+            self._keys = None
+            self._lock_file.close()
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(cache_dir: str, model_id: str, max_entries: int = 50000) -> EmbeddingCache:
+    """Process-wide EmbeddingCache per (directory, model), shared by every AdvancedMatcher."""
+    key = f"{os.path.abspath(cache_dir)}|{model_id}"
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = EmbeddingCache(cache_dir, model_id, max_entries=max_entries)
+            _caches[key] = cache
+        return cache
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Hit/miss/eviction counters of every embedding cache open in this process."""
+    with _caches_lock:
+        return {cache.model_id: cache.stats for cache in _caches.values()}
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import httpx
+import numpy as np
+
+from app.config import settings
+from app.core.circuit_breaker import CircuitBreaker
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HF_API_BASE = "https://api-inference.huggingface.co/models"
+
+
+class AsyncEmbeddingClient:
+    """
+    Async client for the HuggingFace feature-extraction API.
+
+    One pooled httpx.AsyncClient (keep-alive connections) is reused for every request.
+    Texts are sent batch_size at a time as a list `inputs` payload, and at most
+    max_concurrency requests are in flight at once. Failed batches come back as None
+    entries so callers can fall back per text.
+
+    With a CircuitBreaker, every request outcome and latency is recorded, and batches
+    are skipped (None) while the breaker is open.
+
+    Args:
+        api_token (str): HuggingFace API token.
+        model_id (str): Model to embed with.
+        batch_size (int): Texts per request.
+        max_concurrency (int): Requests in flight at once (also the connection pool size).
+        timeout (float): Per-request timeout in seconds.
+        base_url (str): API root; point it at a stand-in server in tests.
+        transport (httpx.AsyncBaseTransport): Optional transport (e.g. httpx.ASGITransport).
+        breaker (CircuitBreaker): Optional breaker guarding the provider.
+    """
+
+    def __init__(self, api_token: str, model_id: str, batch_size: int = 16, max_concurrency: int = 4,
+                 timeout: float = 30.0, base_url: str = HF_API_BASE,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.model_id = model_id
+        self.breaker = breaker
+        self.url = f"{base_url.rstrip('/')}/{model_id}"
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._client = httpx.AsyncClient(
+            headers={"Authorization": f"Bearer {api_token}"},
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=self.max_concurrency,
+                                max_keepalive_connections=self.max_concurrency),
+            transport=transport,
+        )
+
+    async def __aenter__(self) -> "AsyncEmbeddingClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def embed_many(self, texts: Sequence[str], budget: Optional[float] = None) -> List[Optional[np.ndarray]]:
+        """
+        Embeds texts (identical texts are sent once). Returns float32 vectors in input
+        order, with None for texts whose request failed, was skipped by the circuit
+        breaker, or hadn't finished when the latency budget (seconds) ran out.
+        """
+        unique_texts = list(dict.fromkeys(texts))
+        vectors: Dict[str, Optional[np.ndarray]] = {}
+
+        async def run(batch: List[str]):
+            async with self._semaphore:
+                if self.breaker is not None and not self.breaker.allow_request():
+                    return
+                start = time.perf_counter()
+                try:
+                    result = await self._post(batch)
+                except asyncio.CancelledError:
+                    # Cut off by the latency budget: count it against the provider
+                    if self.breaker is not None:
+                        self.breaker.record_failure(time.perf_counter() - start)
+                    raise
+                except Exception as e:
+                    # Every allowed request must be recorded, or a half-open probe is never released
+                    logger.warning(f"Embedding request failed: {e!r}")
+                    result = None
+            if self.breaker is not None:
+                latency = time.perf_counter() - start
+                if result is None:
+                    self.breaker.record_failure(latency)
+                else:
+                    self.breaker.record_success(latency)
+            for text, vector in zip(batch, result or [None] * len(batch)):
+                vectors[text] = vector
+
+        batches = [unique_texts[i:i + self.batch_size] for i in range(0, len(unique_texts), self.batch_size)]
+        tasks = [asyncio.ensure_future(run(batch)) for batch in batches]
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=budget)
+            if pending:
+                logger.warning(f"Embedding latency budget of {budget:.1f}s exhausted, "
+                               f"{len(pending)}/{len(tasks)} requests cancelled.")
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+            for task in done:
+                if task.exception() is not None:
+                    logger.warning(f"Embedding request failed: {task.exception()!r}")
+        return [vectors.get(text) for text in texts]
+
+    async def _post(self, batch: List[str]) -> Optional[List[np.ndarray]]:
+        try:
+            response = await self._client.post(
+                self.url, json={"inputs": batch, "options": {"wait_for_model": True}}
+            )
+        except httpx.HTTPError as e:
+            logger.warning(f"HuggingFace API call failed for {len(batch)} texts: {e!r}")
+            return None
+
+        if response.status_code != 200:
+            logger.warning(f"HuggingFace API returned status {response.status_code}: {response.text[:200]}")
+            return None
+        try:
+            result = response.json()
+        except ValueError:
+            logger.warning(f"HuggingFace API returned a non-JSON body for {len(batch)} texts: {response.text[:200]}")
+            return None
+        # One embedding (list of floats) per input
+        if (isinstance(result, list) and len(result) == len(batch)
+                and all(isinstance(v, list) and v and isinstance(v[0], (int, float)) for v in result)):
+            return [np.asarray(v, dtype=np.float32) for v in result]
+        logger.warning(f"HuggingFace API returned an unexpected payload for {len(batch)} texts.")
+        return None
+
+
+# Clients are bound to the event loop they were created on
+_clients: Dict[int, Tuple[asyncio.AbstractEventLoop, AsyncEmbeddingClient]] = {}
+
+
+def get_embedding_client(api_token: str, model_id: str,
+                         breaker: Optional[CircuitBreaker] = None) -> AsyncEmbeddingClient:
+    """Shared client for the running event loop, configured by the HF_* settings."""
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(id(loop))
+    if (entry is None or entry[0] is not loop or entry[1].model_id != model_id
+            or entry[1].breaker is not breaker):
+        client = AsyncEmbeddingClient(
+            api_token, model_id,
+            batch_size=settings.HF_EMBED_BATCH_SIZE,
+            max_concurrency=settings.HF_MAX_CONCURRENCY,
+            timeout=settings.HF_TIMEOUT,
+            breaker=breaker,
+        )
+        _clients[id(loop)] = (loop, client)
+        return client
+    return entry[1]
+
+
+async def close_embedding_clients():
+    """Closes the shared client of the running event loop (application shutdown)."""
+    entry = _clients.pop(id(asyncio.get_running_loop()), None)
+    if entry is not None:
+        await entry[1].aclose()
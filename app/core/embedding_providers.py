@@ -0,0 +1,279 @@
+import asyncio
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+from sklearn.random_projection import SparseRandomProjection
+
+from app.config import settings
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.embedding_cache import EmbeddingCache, get_embedding_cache
+from app.core.embedding_client import AsyncEmbeddingClient, get_embedding_client
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HF_MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
+# Truncate text to stay within API limits (512 tokens ≈ 2000 chars)
+MAX_INPUT_CHARS = 2000
+
+# EMBEDDING_PROVIDER values
+PROVIDER_HUGGINGFACE = "huggingface"
+PROVIDER_LOCAL = "local"
+PROVIDER_TFIDF = "tfidf"
+PROVIDERS = (PROVIDER_HUGGINGFACE, PROVIDER_LOCAL, PROVIDER_TFIDF)
+
+# Shared by every HuggingFaceProvider in the process, so an outage is detected once
+hf_circuit_breaker = CircuitBreaker(
+    "huggingface",
+    failure_threshold=settings.HF_BREAKER_FAILURES,
+    latency_threshold=settings.HF_BREAKER_P95_SECONDS,
+    reset_timeout=settings.HF_BREAKER_RESET_SECONDS,
+)
+
+
+class EmbeddingProvider(ABC):
+    """
+    Turns texts into fixed-size vectors for AdvancedMatcher.
+
+    Subclasses must implement embed_many (and override aembed_many when embedding does I/O).
+    A None vector means "no embedding for this text"; the matcher scores it with
+    TF-IDF instead.
+
+    Attributes:
+        name (str): Scorer label reported with every score from this provider.
+        model_id (str): Identifies the vector space (cache keys, persisted indexes).
+        max_input_chars (int): Longest text the provider embeds in full (None: no limit).
+    """
+
+    name = ""
+    model_id = ""
+    max_input_chars: Optional[int] = None
+
+    @property
+    def available(self) -> bool:
+        """False when the provider can't embed anything (e.g. missing credentials)."""
+        return True
+
+    @abstractmethod
+    def embed_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """One vector (or None) per text."""
+
+    async def aembed_many(self, texts: Sequence[str], budget: Optional[float] = None) -> List[Optional[np.ndarray]]:
+        """Async embed_many; CPU-bound providers run in a worker thread to keep the loop free."""
+        return await asyncio.to_thread(self.embed_many, list(texts))
+
+
+def _get_hf_embedding(text: str, api_token: str) -> List[float] | None:
+    """
+    Gets sentence embedding from HuggingFace Inference API.
+    Uses all-MiniLM-L6-v2 model (same as local BERT) — no local memory cost.
+    Returns None on failure so caller can fall back to TF-IDF.
+    """
+    import httpx
+    API_URL = f"https://api-inference.huggingface.co/models/{HF_MODEL_ID}"
+    headers = {"Authorization": f"Bearer {api_token}"}
+
+    text = text[:MAX_INPUT_CHARS]
+
+    try:
+        response = httpx.post(
+            API_URL,
+            headers=headers,
+            json={"inputs": text, "options": {"wait_for_model": True}},
+            timeout=30.0,
+        )
+        if response.status_code == 200:
+            result = response.json()
+            # API returns a list of floats (the embedding vector)
+            if isinstance(result, list) and len(result) > 0:
+                return result
+        logger.warning(f"HuggingFace API returned status {response.status_code}: {response.text[:200]}")
+        return None
+    except Exception as e:
+        logger.warning(f"HuggingFace API call failed: {e}")
+        return None
+
+
+def _default_cache() -> Optional[EmbeddingCache]:
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return None
+    try:
+        return get_embedding_cache(settings.EMBEDDING_CACHE_DIR, HF_MODEL_ID,
+                                   max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES)
+    except OSError as e:
+        logger.warning(f"Embedding cache unavailable ({e}), embeddings will not be cached.")
+        return None
+
+
+class HuggingFaceProvider(EmbeddingProvider):
+    """
+    all-MiniLM-L6-v2 embeddings from the HuggingFace Inference API.
+
+    Embeddings are kept in a persistent EmbeddingCache keyed by model id and the
+    truncated text, so re-screening the same resumes or JD makes no API calls.
+    aembed_many sends cache misses through a pooled AsyncEmbeddingClient (batched
+    inputs, bounded concurrency, latency budget). Every call goes through a circuit
+    breaker, so while the API is failing or slow texts come back as None right away.
+
+    Args:
+        api_token (str): HuggingFace token. Defaults to HF_API_TOKEN / HUGGINGFACE_API_TOKEN.
+        cache (EmbeddingCache): Embedding store. Defaults to the process-wide cache
+                                configured by EMBEDDING_CACHE_* settings (if enabled).
+        client (AsyncEmbeddingClient): Client for aembed_many. Defaults to the shared
+                                       client of the running event loop.
+        breaker (CircuitBreaker): Breaker for the API. Defaults to the process-wide one
+                                  (an injected client keeps its own breaker).
+    """
+
+    name = "hf_embedding"
+    model_id = HF_MODEL_ID
+    max_input_chars = MAX_INPUT_CHARS
+
+    def __init__(self, api_token: Optional[str] = None, cache: Optional[EmbeddingCache] = None,
+                 client: Optional[AsyncEmbeddingClient] = None, breaker: Optional[CircuitBreaker] = None):
+        self._hf_token: str | None = (api_token or os.environ.get("HF_API_TOKEN")
+                                      or os.environ.get("HUGGINGFACE_API_TOKEN"))
+        self.cache = cache
+        self._client = client
+        self.breaker = breaker if breaker is not None else hf_circuit_breaker
+        if self._hf_token and self.cache is None:
+            self.cache = _default_cache()
+
+    @property
+    def available(self) -> bool:
+        return bool(self._hf_token)
+
+    def embed(self, text: str) -> Optional[np.ndarray]:
+        """HuggingFace embedding for text, served from the cache when possible."""
+        text = text[:MAX_INPUT_CHARS]
+        if self.cache is not None:
+            cached = self.cache.get(text)
+            if cached is not None:
+                return cached
+        if not self.breaker.allow_request():
+            return None
+        start = time.perf_counter()
+        embedding = _get_hf_embedding(text, self._hf_token)
+        if embedding is None:
+            self.breaker.record_failure(time.perf_counter() - start)
+            return None
+        self.breaker.record_success(time.perf_counter() - start)
+        # float32, like the cached copy, so repeat screenings score identically
+        embedding = np.asarray(embedding, dtype=np.float32)
+        if self.cache is not None:
+            self.cache.put(text, embedding)
+        return embedding
+
+    def embed_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        return [self.embed(text) for text in texts]
+
+    async def aembed_many(self, texts: Sequence[str], budget: Optional[float] = None) -> List[Optional[np.ndarray]]:
+        """Embeddings for texts: cache hits first, then one concurrent pass for the misses."""
+        texts = [text[:MAX_INPUT_CHARS] for text in texts]
+        embeddings = self.cache.get_many(texts) if self.cache is not None else [None] * len(texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            client = self._client or get_embedding_client(self._hf_token, HF_MODEL_ID, self.breaker)
+            fetched = await client.embed_many([texts[i] for i in missing], budget=budget)
+            for i, embedding in zip(missing, fetched):
+                embeddings[i] = embedding
+            if self.cache is not None:
+                stored = [(texts[i], e) for i, e in zip(missing, fetched) if e is not None]
+                if stored:
+                    self.cache.put_many(*zip(*stored))
+        return embeddings
+
+
+def _whole_term(term: str):
+    return (term,)
+
+
+class HashedNgramProvider(EmbeddingProvider):
+    """
+    In-process embeddings: hashed n-gram term vectors under a fixed random projection.
+
+    Every distinct word of a batch (English stop words removed) gets a vector from its
+    hashed identity plus its character 3-5-grams, so "developer" and "development" land
+    close together. A seeded sparse random projection maps term vectors to `dim` dense
+    dimensions; it approximately preserves cosine similarity, with each hashed feature
+    spread over about 8 output dimensions. A document is the sum of its term vectors
+    weighted by sublinear term frequency.
+
+    Nothing is fit on data, so a text gets the same vector in any batch or process. A
+    batch costs one tokenization pass, n-gram hashing of its distinct words only, and
+    two sparse products (no network, no GPU). Word bigrams are left out: they would
+    multiply the distinct terms of a batch several times over.
+
+    Args:
+        dim (int): Embedding dimension.
+        n_features (int): Hash space of each feature family (term identity, char n-grams).
+        char_weight (float): Weight of the char n-gram part of a term vector (identity is 1).
+        seed (int): Projection seed (part of model_id).
+    """
+
+    name = "hashed_ngram"
+
+    def __init__(self, dim: int = 384, n_features: int = 2 ** 14, char_weight: float = 0.5, seed: int = 0):
+        self.dim = dim
+        self.char_weight = char_weight
+        self.model_id = f"hashed-ngram-d{dim}-f{n_features}-c{char_weight}-s{seed}"
+        self._identity = HashingVectorizer(analyzer=_whole_term, n_features=n_features,
+                                           alternate_sign=False, norm=None, dtype=np.float32)
+        self._char = HashingVectorizer(analyzer="char_wb", ngram_range=(3, 5), n_features=n_features,
+                                       alternate_sign=False, norm="l2", dtype=np.float32)
+        # Data-independent: fit only reads the input width
+        self._projection = SparseRandomProjection(n_components=dim, density=min(1.0, 8 / dim),
+                                                  dense_output=True, random_state=seed)
+        self._projection.fit(sp.csr_matrix((1, 2 * n_features), dtype=np.float32))
+
+    def embed_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        if not texts:
+            return []
+        # Per call (fit collects the batch's distinct terms), so threads can share the provider
+        vectorizer = CountVectorizer(stop_words="english", dtype=np.float32)
+        try:
+            counts = vectorizer.fit_transform(texts)
+        except ValueError:
+            # Nothing but stop words in the whole batch
+            return [None] * len(texts)
+        terms = vectorizer.get_feature_names_out()
+        features = sp.hstack([self._identity.transform(terms),
+                              self._char.transform(terms) * self.char_weight], format="csr")
+        term_vectors = np.asarray(self._projection.transform(features), dtype=np.float32)
+
+        np.log1p(counts.data, out=counts.data)
+        vectors = np.asarray(counts @ term_vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1)
+        # A text without any term has no direction: no embedding, TF-IDF scores it
+        return [vector / norm if norm > 0 else None for vector, norm in zip(vectors, norms)]
+
+
+_local_providers = {}
+
+
+def get_embedding_provider(name: Optional[str] = None, cache: Optional[EmbeddingCache] = None,
+                           client: Optional[AsyncEmbeddingClient] = None,
+                           breaker: Optional[CircuitBreaker] = None) -> Optional[EmbeddingProvider]:
+    """
+    Provider for EMBEDDING_PROVIDER (or `name`). "tfidf" returns None: no embeddings,
+    every score comes from TF-IDF. cache/client/breaker configure the HuggingFace provider.
+    """
+    name = name or settings.EMBEDDING_PROVIDER
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown embedding provider '{name}', expected one of {PROVIDERS}")
+    if name == PROVIDER_TFIDF:
+        return None
+    if name == PROVIDER_LOCAL:
+        # The projection matrix is built once per process
+        dim = settings.LOCAL_EMBEDDING_DIM
+        if dim not in _local_providers:
+            _local_providers[dim] = HashedNgramProvider(dim=dim)
+        return _local_providers[dim]
+    return HuggingFaceProvider(cache=cache, client=client, breaker=breaker)
@@ -2,32 +2,41 @@
 import re
 import logging
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple, Union
 
 from dateutil import parser
-from dateutil.relativedelta import relativedelta
+
+from app.core.parsed_document import ParsedDocument
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def extract_experience(text: str) -> float:
+def extract_experience(text: Union[str, ParsedDocument]) -> float:
     """
     Extracts the total years of experience from the resume text.
     It combines regex pattern matching for explicit mentions and 
     date duration calculation.
     
     Args:
-        text (str): Resume text.
+        text (str | ParsedDocument): Resume text. The result is memoized on a ParsedDocument.
         
     Returns:
         float: Total years of experience (rounded to 1 decimal). Returns 0.0 if fresher.
     """
+    return ParsedDocument.of(text).derived("years_of_experience", _compute_experience)
+
+def _compute_experience(doc: ParsedDocument) -> float:
+    text = doc.text
     regex_exp = extract_experience_from_regex(text)
-    date_exp = extract_experience_from_dates(text)
+    date_ranges = extract_date_ranges(text)
+    date_exp = experience_from_date_ranges(date_ranges)
     
     logger.info(f"Experience Extraction - Regex: {regex_exp}, Date-Calculated: {date_exp}")
-    
+    return combine_experience(regex_exp, date_exp)
+
+def combine_experience(regex_exp: float, date_exp: float) -> float:
+    """Total years from the explicit mention and the summed date ranges."""
     # Return the maximum reasonable value found
     # If explicit mention is "5+" but dates show "8", usually dates are more reliable if parsed correctly.
     # However, dates often have overlaps or gaps.
@@ -70,12 +79,22 @@ def extract_experience_from_dates(text: str) -> float:
     Finds date ranges and sums up the duration.
     Text often contains: "Jan 2020 - Present", "01/2019 to 12/2021"
     """
+    return experience_from_date_ranges(extract_date_ranges(text))
+
+# Stands in for "Present" while parsing, so ongoing ranges can be told apart from ones
+# that end in the current month
+_ONGOING = "Dec 9999"
+_ONGOING_YEAR = 9999
+
+def extract_date_ranges(text: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    The date ranges of a resume as ("YYYY-MM" start, "YYYY-MM" end) pairs, end None for
+    an ongoing range ("Jan 2020 - Present"). Independent of today's date, so they can
+    be stored and summed later by experience_from_date_ranges.
+    """
     # Normalize text slightly for dates
-    # Replace "Present", "Current", "Till Date" with current date text for parsing
-    now = datetime.now()
-    current_date_str = now.strftime("%b %Y") # e.g. "Jan 2026"
-    
-    normalized_text = re.sub(r'\b(present|current|till date|now)\b', current_date_str, text, flags=re.IGNORECASE)
+    # Replace "Present", "Current", "Till Date" with a placeholder date text for parsing
+    normalized_text = re.sub(r'\b(present|current|till date|now)\b', _ONGOING, text, flags=re.IGNORECASE)
     
     # Regex for finding date ranges
     # Supporting formats: 
@@ -100,28 +119,43 @@ def extract_experience_from_dates(text: str) -> float:
     matches.extend(re.findall(pattern2, normalized_text))
     # pattern3 often matches phone numbers (1234-5678), skip unless strictly surrounded?
     
-    total_months = 0
-    
+    # Only month and year matter; parse them on the 1st so no day can be out of range
+    default = datetime(2000, 1, 1)
+    ranges = []
     for start_str, end_str in matches:
         try:
-            start_date = parser.parse(start_str)
-            end_date = parser.parse(end_str)
-            
-            # Simple validity check
-            if start_date > end_date:
-                continue # Skip invalid ranges
-                
-            # Calculate difference in months
-            diff = relativedelta(end_date, start_date)
-            months = diff.years * 12 + diff.months
-            
-            # Minimum 1 month if stated
-            if months == 0: months = 1
+            start_date = parser.parse(start_str, default=default)
+            end_date = parser.parse(end_str, default=default)
+        except (ValueError, TypeError, OverflowError):
+            continue
+        if start_date.year == _ONGOING_YEAR:
+            continue
+        end = None if end_date.year == _ONGOING_YEAR else f"{end_date.year:04d}-{end_date.month:02d}"
+        ranges.append((f"{start_date.year:04d}-{start_date.month:02d}", end))
+    return ranges
+
+def experience_from_date_ranges(date_ranges: Sequence[Sequence[Optional[str]]],
+                                now: Optional[datetime] = None) -> float:
+    """Years covered by extract_date_ranges output, with ongoing ranges ending at `now` (default: today)."""
+    now = now or datetime.now()
+    current = now.year * 12 + now.month - 1
+
+    total_months = 0
+    for start, end in date_ranges:
+        start_year, start_month = map(int, start.split("-"))
+        start_index = start_year * 12 + start_month - 1
+        if end is None:
+            end_index = current
+        else:
+            end_year, end_month = map(int, end.split("-"))
+            end_index = end_year * 12 + end_month - 1
             
-            total_months += months
+        # Simple validity check
+        if start_index > end_index:
+            continue # Skip invalid ranges
             
-        except (ValueError, TypeError):
-            continue
+        # Minimum 1 month if stated
+        total_months += max(1, end_index - start_index)
 
     return total_months / 12.0
 
@@ -0,0 +1,67 @@
+import logging
+from typing import Any, Dict, Optional, Union
+
+from app.core.experience_extractor import (
+    combine_experience,
+    experience_from_date_ranges,
+    extract_date_ranges,
+    extract_experience_from_regex,
+)
+from app.core.parsed_document import ParsedDocument
+from app.core.skill_extractor import taxonomy_skill_ids
+from app.core.taxonomy import CompiledTaxonomy
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bump when an extractor below changes its output: stored records of an older version
+# are recomputed on their next screening
+FEATURES_VERSION = 1
+
+
+def build_feature_record(text: Union[str, ParsedDocument], taxonomy: CompiledTaxonomy) -> Dict[str, Any]:
+    """
+    The JD-independent features of one resume, stored as Resume.parsed_data.
+
+    Everything a screening needs besides the JD itself: contacts, the inferred name,
+    every skill of `taxonomy` (canonical ids, valid for taxonomy_version only), the
+    experience evidence and some text statistics. Experience is kept as the explicit
+    mention and the date ranges rather than a total, so ongoing ranges ("Jan 2020 -
+    Present") keep counting after the record is stored (see record_experience).
+    The record is plain JSON.
+    """
+    document = ParsedDocument.of(text)
+    emails = document.emails
+    regex_years = extract_experience_from_regex(document.text)
+    date_ranges = extract_date_ranges(document.text)
+    return {
+        "version": FEATURES_VERSION,
+        "taxonomy_version": taxonomy.version,
+        "emails": emails,
+        "phone_numbers": document.phone_numbers,
+        "name": emails[0].split("@")[0] if emails else None,
+        "skill_ids": taxonomy_skill_ids(taxonomy, document),
+        "experience": {
+            "regex_years": regex_years,
+            "date_ranges": [list(date_range) for date_range in date_ranges],
+        },
+        "stats": {
+            "characters": len(document.text),
+            "words": len(document.tokens),
+            "lines": len(document.lines),
+            "sections": sorted({name for name, _, _ in document.sections}),
+        },
+    }
+
+
+def is_current(record: Optional[Dict[str, Any]], taxonomy_version: str) -> bool:
+    """Whether a stored record was built by these extractors and this skills taxonomy."""
+    return (isinstance(record, dict) and record.get("version") == FEATURES_VERSION
+            and record.get("taxonomy_version") == taxonomy_version)
+
+
+def record_experience(record: Dict[str, Any]) -> float:
+    """Years of experience of a record, as extract_experience would find them today."""
+    experience = record["experience"]
+    return combine_experience(experience["regex_years"], experience_from_date_ranges(experience["date_ranges"]))
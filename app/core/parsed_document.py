@@ -0,0 +1,139 @@
+import re
+import logging
+from functools import cached_property
+from typing import Any, Callable, Dict, FrozenSet, List, Tuple, Union
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+PHONE_PATTERN = re.compile(r'(\+?\d{1,3}[-.\\s]?)?(\(?\d{3}\)?[-.\\s]?)?\d{3}[-.\\s]?\d{4}')
+
+# Resume section headers, keyed by the canonical section name
+SECTION_HEADERS = {
+    "summary": ["summary", "profile", "professional summary", "objective", "about me"],
+    "experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history"],
+    "education": ["education", "academic background", "qualifications"],
+    "skills": ["skills", "technical skills", "core competencies", "technologies"],
+    "projects": ["projects", "personal projects", "key projects"],
+    "certifications": ["certifications", "certificates", "licenses"],
+}
+_HEADER_TO_SECTION = {header: name for name, headers in SECTION_HEADERS.items() for header in headers}
+_HEADER_STRIP = " \t:-|#*_"
+
+
+class ParsedDocument:
+    """
+    One resume (or JD) parsed once and shared by every pipeline stage.
+
+    TextProcessor, SkillExtractor and extract_experience all accept either a string or a
+    ParsedDocument. Passing the same ParsedDocument to each of them means the text is
+    lowercased, cleaned, tokenized and regex-scanned once; every field is computed on
+    first access and memoized, so stages only pay for what they read.
+
+    Stage-specific results (e.g. years of experience) are memoized with derived().
+    """
+
+    def __init__(self, text: str):
+        self.text = text or ""
+        self._derived: Dict[str, Any] = {}
+
+    @classmethod
+    def of(cls, document: Union[str, "ParsedDocument"]) -> "ParsedDocument":
+        """Wraps raw text in a ParsedDocument; returns ParsedDocuments unchanged."""
+        return document if isinstance(document, ParsedDocument) else cls(document)
+
+    def derived(self, key: str, compute: Callable[["ParsedDocument"], Any]) -> Any:
+        """Returns compute(self), computing it only the first time `key` is requested."""
+        if key not in self._derived:
+            self._derived[key] = compute(self)
+        return self._derived[key]
+
+    @cached_property
+    def normalized_text(self) -> str:
+        """Lowercased original text (offsets match self.text for ASCII input)."""
+        return self.text.lower()
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        """Whitespace tokens of the normalized text."""
+        return self.normalized_text.split()
+
+    @cached_property
+    def unique_tokens(self) -> FrozenSet[str]:
+        return frozenset(self.tokens)
+
+    @cached_property
+    def cleaned_text(self) -> str:
+        """Single-spaced ASCII text (newlines and non-ASCII runs become spaces)."""
+        text = self.text.replace('\n', ' ')
+        text = re.sub(r'[^\x00-\x7F]+', ' ', text)
+        return re.sub(r'\s+', ' ', text).strip()
+
+    @cached_property
+    def normalized_cleaned_text(self) -> str:
+        return self.cleaned_text.lower()
+
+    @cached_property
+    def emails(self) -> List[str]:
+        return list(set(EMAIL_PATTERN.findall(self.text)))
+
+    @cached_property
+    def phone_numbers(self) -> List[str]:
+        matches = [match.group() for match in PHONE_PATTERN.finditer(self.text)]
+        return [m.strip() for m in matches if len(re.sub(r'\D', '', m)) >= 10]
+
+    @cached_property
+    def lines(self) -> List[Tuple[int, int]]:
+        """(start, end) offsets of each line in self.text, without the newline."""
+        offsets = []
+        start = 0
+        for line in self.text.split('\n'):
+            offsets.append((start, start + len(line)))
+            start += len(line) + 1
+        return offsets
+
+    @cached_property
+    def sections(self) -> List[Tuple[str, int, int]]:
+        """
+        (section, start, end) offsets of recognised resume sections, in document order.
+
+        A section starts at a short line that is just a known header ("Work Experience",
+        "SKILLS:", ...) and runs until the next header. Text before the first header is
+        not part of any section.
+        """
+        headers = []
+        for start, end in self.lines:
+            line = self.normalized_text[start:end].strip(_HEADER_STRIP)
+            section = _HEADER_TO_SECTION.get(line)
+            if section is not None:
+                headers.append((section, start))
+
+        sections = []
+        for i, (section, start) in enumerate(headers):
+            end = headers[i + 1][1] if i + 1 < len(headers) else len(self.text)
+            sections.append((section, start, end))
+        return sections
+
+    def section_text(self, name: str) -> str:
+        """Text of every section with this canonical name, joined by newlines ('' if absent)."""
+        return "\n".join(self.text[start:end] for section, start, end in self.sections if section == name)
+
+
+if __name__ == "__main__":
+    doc = ParsedDocument("""Jane Doe
+jane.doe@example.com | (555) 123-4567
+
+Skills:
+Python, FastAPI, Docker
+
+Work Experience
+Jan 2020 - Present: Senior Dev
+""")
+    print(f"Emails: {doc.emails}")
+    print(f"Phones: {doc.phone_numbers}")
+    print(f"Tokens: {doc.tokens[:8]}")
+    for name, start, end in doc.sections:
+        print(f"[{name}] {doc.text[start:end]!r}")
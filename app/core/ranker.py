@@ -1,11 +1,128 @@
 
+import heapq
+import itertools
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_WEIGHTS = {
+    "bert": 0.4,
+    "skills": 0.4,
+    "experience": 0.2
+}
+
+def resolve_weights(overrides: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """
+    DEFAULT_WEIGHTS with `overrides` applied, scaled to sum to 1 (final scores stay 0-100).
+    Raises ValueError for unknown components, negative weights or an all-zero total.
+    """
+    weights = dict(DEFAULT_WEIGHTS)
+    for component, weight in (overrides or {}).items():
+        if component not in DEFAULT_WEIGHTS:
+            raise ValueError(f"Unknown score component '{component}', expected one of {list(DEFAULT_WEIGHTS)}")
+        if weight < 0:
+            raise ValueError(f"Weight of '{component}' must not be negative")
+        weights[component] = float(weight)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("At least one weight must be positive")
+    return {component: weight / total for component, weight in weights.items()}
+
+def _weighted_scores(bert_scores, skill_percentages, experience_years, required_experience: float,
+                     weights: Dict[str, float]):
+    """
+    (norm_bert, norm_skills, norm_exp, final_score): the normalized components (0-100)
+    and weighted final score, per candidate for columns or as 0-d arrays for one candidate.
+    """
+    # 1. Normalize Scores to 0-100 scale
+    norm_bert = np.asarray(bert_scores, dtype=np.float64) * 100.0
+    norm_skills = np.asarray(skill_percentages, dtype=np.float64)
+    exp_years = np.asarray(experience_years, dtype=np.float64)
+    if required_experience <= 0.0:
+        # If no experience required, everyone gets 100 points for this chunk
+        norm_exp = np.full(exp_years.shape, 100.0)
+    else:
+        # Cap at required_experience, scale to 100
+        norm_exp = np.minimum(exp_years, required_experience) / required_experience * 100.0
+
+    # 2. Calculate Weighted Final Score
+    final_scores = (
+        (norm_bert * weights["bert"]) +
+        (norm_skills * weights["skills"]) +
+        (norm_exp * weights["experience"])
+    )
+    return norm_bert, norm_skills, norm_exp, final_scores
+
+def _explanation(norm_skills: float, norm_bert: float, norm_exp: float) -> str:
+    return (
+        f"Matches {int(norm_skills)}% of required skills and {int(norm_bert)}% of the semantic context, "
+        f"with an experience score of {int(norm_exp)}%."
+    )
+
+def _scored(candidate: Dict[str, Any], norm_bert: float, norm_skills: float, norm_exp: float,
+            final_score: float) -> Dict[str, Any]:
+    # Copy original to avoid mutating input list
+    scored = candidate.copy()
+    scored.update({
+        "normalized_scores": {
+            "bert": round(norm_bert, 1),
+            "skills": round(norm_skills, 1),
+            "experience": round(norm_exp, 1)
+        },
+        "final_score": round(final_score, 2),
+        "scoring_explanation": _explanation(norm_skills, norm_bert, norm_exp)
+    })
+    return scored
+
+def _top_indices(keys: np.ndarray, top_k: Optional[int]) -> np.ndarray:
+    """
+    Indices of the top_k largest keys, best first; equal keys keep input order
+    (what a stable descending sort of the whole list returns, truncated).
+    """
+    n = len(keys)
+    if top_k is None or top_k >= n:
+        candidates = np.arange(n)
+    elif top_k <= 0:
+        return np.empty(0, dtype=np.intp)
+    else:
+        # k-th largest key: everything above it is in, ties at it are taken in input order
+        kth = -np.partition(-keys, top_k - 1)[top_k - 1]
+        above = np.flatnonzero(keys > kth)
+        ties = np.flatnonzero(keys == kth)[:top_k - len(above)]
+        candidates = np.sort(np.concatenate([above, ties]))
+    return candidates[np.argsort(-keys[candidates], kind="stable")]
+
+class RankedArrays:
+    """
+    Columnar ranking result: the selected rows, best first.
+
+    Attributes:
+        indices (np.ndarray): Input positions of the ranked candidates.
+        final_scores (np.ndarray): Weighted final score (0-100) per ranked row.
+        bert, skills, experience (np.ndarray): Normalized component scores (0-100) per ranked row.
+
+    Explanations are only built when asked for (explanation(i)).
+    """
+
+    def __init__(self, indices: np.ndarray, final_scores: np.ndarray, bert: np.ndarray,
+                 skills: np.ndarray, experience: np.ndarray):
+        self.indices = indices
+        self.final_scores = final_scores
+        self.bert = bert
+        self.skills = skills
+        self.experience = experience
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def explanation(self, i: int) -> str:
+        return _explanation(self.skills[i], self.bert[i], self.experience[i])
+
 class Ranker:
     def __init__(self, weights: Dict[str, float] = None):
         """
@@ -16,83 +133,132 @@ class Ranker:
         - Experience: 20%
         """
         if weights is None:
-            self.weights = {
-                "bert": 0.4,
-                "skills": 0.4,
-                "experience": 0.2
-            }
+            self.weights = dict(DEFAULT_WEIGHTS)
         else:
             self.weights = weights
 
-    def rank_candidates(self, candidates: List[Dict[str, Any]], required_experience: float = 0.0) -> List[Dict[str, Any]]:
+    def rank_arrays(self, bert_scores: Sequence[float], skill_percentages: Sequence[float],
+                    experience_years: Sequence[float], required_experience: float = 0.0,
+                    top_k: Optional[int] = None, min_score: Optional[float] = None) -> RankedArrays:
+        """
+        Ranks candidates given as columns, in one vectorized pass.
+
+        Args:
+            bert_scores: Semantic similarity per candidate, 0.0 to 1.0.
+            skill_percentages: Skill match per candidate, 0.0 to 100.0.
+            experience_years: Years of experience per candidate.
+            required_experience (float): Years the JD asks for (0: everyone gets full points).
+            top_k (int): Only rank the best top_k candidates (argpartition, no full sort).
+            min_score (float): Drop candidates whose (rounded) final score is below this.
+
+        Returns:
+            RankedArrays: Same scores and order as rank_candidates (ties on the rounded
+            final score keep input order).
+        """
+        norm_bert, norm_skills, norm_exp, final_scores = _weighted_scores(
+            bert_scores, skill_percentages, experience_years, required_experience, self.weights)
+
+        # 3. Select & Sort by the reported (rounded) final score, descending
+        keys = np.round(final_scores, 2)
+        if min_score is None:
+            order = _top_indices(keys, top_k)
+        else:
+            eligible = np.flatnonzero(keys >= min_score)
+            order = eligible[_top_indices(keys[eligible], top_k)]
+        return RankedArrays(order, final_scores[order], norm_bert[order], norm_skills[order], norm_exp[order])
+
+    def rank_candidates(self, candidates: List[Dict[str, Any]], required_experience: float = 0.0,
+                        top_k: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Ranks a list of candidates based on their aggregated scores.
         
         Args:
             candidates (List[Dict]): List of candidate dictionaries containing:
                 - name (str)
-                - tfidf_score (float): 0.0 to 1.0
+                - bert_score (float): 0.0 to 1.0
                 - skill_match_percentage (float): 0.0 to 100.0
                 - years_of_experience (float): e.g., 5.5
+            required_experience (float): Years the JD asks for.
+            top_k (int): Only return the best top_k candidates.
                 
         Returns:
             List[Dict]: Sorted list of candidates with 'final_score', 'rank', and 'explanation'.
         """
+        n = len(candidates)
+        ranked = self.rank_arrays(
+            np.fromiter((c.get("bert_score", 0.0) for c in candidates), dtype=np.float64, count=n),
+            np.fromiter((c.get("skill_match_percentage", 0.0) for c in candidates), dtype=np.float64, count=n),
+            np.fromiter((c.get("years_of_experience", 0.0) for c in candidates), dtype=np.float64, count=n),
+            required_experience=required_experience,
+            top_k=top_k,
+        )
+
+        # Only the returned candidates are copied and explained
         ranked_list = []
-        
-        for candidate in candidates:
-            # 1. Normalize Scores to 0-100 scale
-            
-            # BERT: 0.65 -> 65.0
-            norm_bert = candidate.get("bert_score", 0.0) * 100.0
-            
-            # Skills: Already 0-100
-            norm_skills = candidate.get("skill_match_percentage", 0.0)
-            
-            # Experience: Scale relative to requirement
-            exp_years = candidate.get("years_of_experience", 0.0)
-            if required_experience <= 0.0:
-                # If no experience required, everyone gets 100 points for this chunk
-                norm_exp = 100.0
-            else:
-                # Cap at required_experience, scale to 100
-                norm_exp = min(exp_years, required_experience) / required_experience * 100.0
-            
-            # 2. Calculate Weighted Final Score
-            final_score = (
-                (norm_bert * self.weights["bert"]) +
-                (norm_skills * self.weights["skills"]) +
-                (norm_exp * self.weights["experience"])
-            )
-            
-            # 3. Create Explanation (Human Readable)
-            explanation = (
-                f"Matches {int(norm_skills)}% of required skills and {int(norm_bert)}% of the semantic context, "
-                f"with an experience score of {int(norm_exp)}%."
-            )
-            
-            # Create enriched candidate object
-            # Copy original to avoid mutating input list
-            ranked_candidate = candidate.copy()
-            ranked_candidate.update({
-                "normalized_scores": {
-                    "bert": round(norm_bert, 1),
-                    "skills": round(norm_skills, 1),
-                    "experience": round(norm_exp, 1)
-                },
-                "final_score": round(final_score, 2),
-                "scoring_explanation": explanation
-            })
-            
+        for i, index in enumerate(ranked.indices.tolist()):
+            ranked_candidate = _scored(candidates[index], float(ranked.bert[i]), float(ranked.skills[i]),
+                                       float(ranked.experience[i]), float(ranked.final_scores[i]))
+            ranked_candidate["rank"] = i + 1
             ranked_list.append(ranked_candidate)
             
-        # 4. Sort by Final Score Descending
-        ranked_list.sort(key=lambda x: x["final_score"], reverse=True)
-        
-        # 5. Add Rank
-        for i, cand in enumerate(ranked_list):
-            cand["rank"] = i + 1
-            
+        return ranked_list
+
+class IncrementalRanker:
+    """
+    Ranks candidates as they arrive, keeping only the current top_k.
+
+    Each candidate is scored on arrival (by the same _weighted_scores as
+    Ranker.rank_arrays) and pushed onto a min-heap of at most top_k entries
+    whose root is the weakest kept candidate, so memory stays O(top_k) however many
+    candidates are added. snapshot() returns the current shortlist at any point; once
+    every candidate is added it equals rank_candidates(all, top_k=top_k), ties included
+    (an earlier candidate beats a later one with the same rounded score).
+
+    Args:
+        top_k (int): Candidates kept (None: all of them).
+        required_experience (float): Years the JD asks for.
+        ranker (Ranker): Provides the weights. Defaults to Ranker().
+    """
+
+    def __init__(self, top_k: Optional[int] = None, required_experience: float = 0.0,
+                 ranker: Optional[Ranker] = None):
+        self.top_k = top_k
+        self.required_experience = required_experience
+        self.weights = (ranker or Ranker()).weights
+        # (rounded final score, -arrival, scored candidate): the root is the weakest
+        self._heap: List[tuple] = []
+        self._arrivals = itertools.count()
+        self.seen = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def add(self, candidate: Dict[str, Any]) -> Dict[str, Any]:
+        """Scores a candidate and keeps it if it makes the top_k. Returns the scored copy."""
+        norm_bert, norm_skills, norm_exp, final_score = (float(x) for x in _weighted_scores(
+            candidate.get("bert_score", 0.0), candidate.get("skill_match_percentage", 0.0),
+            candidate.get("years_of_experience", 0.0), self.required_experience, self.weights))
+        scored = _scored(candidate, norm_bert, norm_skills, norm_exp, final_score)
+        self.seen += 1
+
+        # Same tie key as Ranker.rank_arrays (np.round and round() can differ on halves)
+        entry = (float(np.round(final_score, 2)), -next(self._arrivals), scored)
+        if self.top_k is None or len(self._heap) < self.top_k:
+            heapq.heappush(self._heap, entry)
+        elif self.top_k > 0 and entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+        return scored
+
+    def extend(self, candidates: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self.add(candidate) for candidate in candidates]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """The current shortlist, best first, with 'rank' (copies: later adds don't change it)."""
+        ranked_list = []
+        for rank, (_, _, scored) in enumerate(sorted(self._heap, key=lambda entry: entry[:2], reverse=True), 1):
+            ranked_candidate = scored.copy()
+            ranked_candidate["rank"] = rank
+            ranked_list.append(ranked_candidate)
         return ranked_list
 
 if __name__ == "__main__":
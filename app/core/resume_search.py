@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.core.chunked_embedding import ChunkedEmbedder
+from app.core.embedding_providers import EmbeddingProvider, get_embedding_provider
+from app.core.vector_index import VectorIndex, get_vector_index
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ResumeSearch:
+    """
+    "Which of my candidates best fit this JD?" without rescoring every resume.
+
+    Each recruiter has a VectorIndex of their resumes' document embeddings (mean of
+    chunk embeddings, see ChunkedEmbedder.embed_documents), kept up to date as resume
+    text is extracted. A search embeds the JD once and reads the top-K resume ids from
+    the index. Index reads and writes run in a worker thread.
+
+    Args:
+        provider (EmbeddingProvider): Embeds resumes and JDs; one index per provider model.
+    """
+
+    def __init__(self, provider: EmbeddingProvider):
+        self.provider = provider
+        self.chunker = ChunkedEmbedder(
+            provider,
+            window=settings.EMBEDDING_CHUNK_CHARS,
+            overlap=settings.EMBEDDING_CHUNK_OVERLAP,
+            batch_size=settings.EMBEDDING_CHUNK_BATCH,
+        )
+
+    def index(self, user_id: str) -> VectorIndex:
+        return get_vector_index(settings.RESUME_INDEX_DIR, self.provider.model_id, user_id,
+                                nprobe=settings.RESUME_INDEX_NPROBE)
+
+    async def add_resumes(self, user_id: str, resumes: Sequence[Tuple[str, str]]) -> int:
+        """Indexes (resume_id, text) pairs, replacing older vectors of the same ids. Returns the number added."""
+        if not resumes:
+            return 0
+        vectors = await self.chunker.aembed_documents([text for _, text in resumes])
+        embedded = [(resume_id, vector) for (resume_id, _), vector in zip(resumes, vectors) if vector is not None]
+        if embedded:
+            ids, matrix = zip(*embedded)
+            await asyncio.to_thread(self.index(user_id).add, list(ids), list(matrix))
+        return len(embedded)
+
+    async def remove_resumes(self, user_id: str, resume_ids: Sequence[str]):
+        if resume_ids:
+            await asyncio.to_thread(self.index(user_id).remove, list(resume_ids))
+
+    async def search(self, user_id: str, job_description: str, top_k: int) -> List[Tuple[str, float]]:
+        """Top-k (resume_id, similarity) of the recruiter's indexed resumes, best first."""
+        query = (await self.chunker.aembed_documents([job_description]))[0]
+        if query is None:
+            return []
+        return await asyncio.to_thread(self.index(user_id).search, query, top_k)
+
+
+_search: Optional[ResumeSearch] = None
+
+
+def get_resume_search() -> Optional[ResumeSearch]:
+    """Process-wide ResumeSearch for RESUME_INDEX_PROVIDER (None if disabled or unavailable)."""
+    global _search
+    if not settings.RESUME_INDEX_ENABLED:
+        return None
+    if _search is None:
+        provider = get_embedding_provider(settings.RESUME_INDEX_PROVIDER)
+        if provider is None or not provider.available:
+            logger.warning(f"Resume index disabled: provider '{settings.RESUME_INDEX_PROVIDER}' unavailable.")
+            return None
+        _search = ResumeSearch(provider)
+    return _search
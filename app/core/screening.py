@@ -0,0 +1,292 @@
+import asyncio
+import logging
+import os
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.config import settings
+from app.core.advanced_matcher import AdvancedMatcher
+from app.core.analysis_pool import get_analysis_pool, use_components
+from app.core.corpus_idf import CorpusIdf, document_frequency_delta
+from app.core.docx_extractor import extract_text_from_docx
+from app.core.experience_extractor import extract_required_experience_from_jd
+from app.core.pdf_extractor import extract_text_from_pdf
+from app.core.ranker import IncrementalRanker, Ranker
+from app.core.resume_search import get_resume_search
+from app.core.skill_extractor import SkillExtractor
+from app.core.text_processor import TextProcessor
+from app.db.database import (
+    add_corpus_documents,
+    get_corpus_stats,
+    get_resumes,
+    save_ranking_result,
+    update_resume_features,
+    update_resume_text,
+)
+from app.schemas import RankedCandidate
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# The screening pipeline shared by the API routers (/analyze/batch, the stream, resume
+# search) and the background screening workers: extract, score, rank and save.
+
+# Initialize core components (load models once at startup)
+text_processor = TextProcessor()
+skill_extractor = SkillExtractor()
+# Dictionary databases and heavy models loaded here
+# ResumeMatcher needs to be fitted per request (per JD), or cache extraction?
+# SkillMatcher is stateless.
+ranker = Ranker()
+# Per-resume CPU work runs in a thread sharing the components above (or, with
+# ANALYSIS_WORKERS set, in worker processes)
+use_components(text_processor, skill_extractor)
+analysis_pool = get_analysis_pool()
+
+async def recruiter_corpus(user_id: str) -> Optional[CorpusIdf]:
+    """
+    The recruiter's corpus for TF-IDF scoring (None until it holds CORPUS_IDF_MIN_DOCS
+    resumes). Read once per screening: resumes the screening adds count from the next one.
+    """
+    if not settings.CORPUS_IDF_ENABLED:
+        return None
+    try:
+        stats = await get_corpus_stats(user_id)
+    except Exception as e:
+        # Scoring falls back to batch IDF
+        logger.error(f"Error reading corpus statistics for user {user_id}: {e}")
+        return None
+    if stats is None or stats.doc_count < settings.CORPUS_IDF_MIN_DOCS:
+        return None
+    return CorpusIdf(stats.doc_count, stats.document_frequencies)
+
+async def add_to_corpus(user_id: str, doc_count: int, document_frequencies: Counter):
+    """Adds a screening's newly extracted resumes (document_frequency_delta) to the corpus statistics."""
+    if not settings.CORPUS_IDF_ENABLED or not doc_count:
+        return
+    try:
+        await add_corpus_documents(user_id, doc_count, document_frequencies, settings.CORPUS_IDF_MAX_TERMS)
+    except Exception as e:
+        # These resumes are missing from the corpus IDF (it stays an approximation)
+        logger.error(f"Error updating corpus statistics for user {user_id}: {e}")
+
+async def jd_features(jd_text: str) -> Tuple[Dict[str, Any], float]:
+    """The JD's skills and required years of experience, computed once per screening."""
+    jd_skills_dict = await asyncio.to_thread(skill_extractor.extract_skills, jd_text)
+    return jd_skills_dict, extract_required_experience_from_jd(jd_text)
+
+def resolve_jd_text(jd_record) -> str:
+    """Text of a stored Job Description (read from its uploaded file if the record points to one)."""
+    UPLOAD_DIR = "uploaded_files"
+    jd_id = jd_record.id
+    jd_text = jd_record.content
+
+    # If the record is just a reference to a file (simplified implementation)
+    if jd_text.startswith("File: "):
+        for ext in ["txt", "pdf", "docx"]:
+            path = os.path.join(UPLOAD_DIR, f"{jd_id}.{ext}")
+            if os.path.exists(path):
+                if ext == "txt":
+                    with open(path, "r", encoding="utf-8") as f:
+                        jd_text = f.read()
+                elif ext == "pdf":
+                    jd_text = extract_text_from_pdf(path)
+                elif ext == "docx":
+                    jd_text = extract_text_from_docx(path)
+                break
+    return jd_text
+
+async def score_resumes(jd_text: str, jd_skills_dict: Dict[str, Any], resumes: List[Tuple[str, str]],
+                         corpus: Optional[CorpusIdf] = None,
+                         feature_records: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Scores (resume_id, text) pairs against a JD (its text and skills, see jd_features):
+    semantic similarity, JD skill match and experience. Returns the unranked candidates
+    for the Ranker.
+
+    feature_records are the resumes' stored parsed_data (resume_id -> record): with a
+    current record only the JD skill match is computed. Records rebuilt on the way
+    (missing, or from older extractors) are stored.
+    """
+    candidates_data = [] # For Ranking
+
+    # Batch compute BERT scores (the TF-IDF fallback weighs terms by the recruiter's whole corpus)
+    # while the analysis pool parses the resumes and matches their skills
+    advanced_matcher = AdvancedMatcher(corpus=corpus)
+    semantic_scores, features = await asyncio.gather(
+        advanced_matcher.ascore_batch([text for _, text in resumes], jd_text),
+        analysis_pool.resume_features(resumes, jd_skills_dict,
+                                      [(feature_records or {}).get(resume_id) for resume_id, _ in resumes]),
+    )
+
+    rebuilt_records = {}
+    for i, (resume_id, content_text) in enumerate(resumes):
+        if features[i] is None:
+            continue
+        record = features[i].pop("feature_record", None)
+        if record is not None:
+            rebuilt_records[resume_id] = record
+        # Collect data for Ranker
+        cand_obj = {
+            "resume_id": resume_id,
+            "bert_score": semantic_scores[i].score,
+            "semantic_scorer": semantic_scores[i].scorer,
+            "resume_text": content_text,
+            **features[i],
+        }
+        candidates_data.append(cand_obj)
+
+    try:
+        await update_resume_features(rebuilt_records)
+    except Exception as e:
+        # Rebuilt again on the next screening
+        logger.error(f"Error saving resume features: {e}")
+
+    return candidates_data
+
+def ranked_candidate(ranked: Dict[str, Any]) -> RankedCandidate:
+    return RankedCandidate(
+        resume_id=ranked["resume_id"],
+        name=ranked["name"],
+        final_score=ranked["final_score"],
+        tfidf_score=ranked["normalized_scores"]["bert"], 
+        semantic_scorer=ranked.get("semantic_scorer"),
+        skill_match_percentage=ranked["skill_match_percentage"],
+        experience_years=ranked["years_of_experience"],
+        matched_skills=ranked["matched_skills"],
+        missing_skills=ranked["missing_skills"],
+        explanation=ranked["scoring_explanation"],
+        resume_text=ranked.get("resume_text", "")
+    )
+
+async def index_resumes(user_id: str, resumes: List[Tuple[str, str]]):
+    """Adds newly extracted resume text to the recruiter's search index."""
+    search = get_resume_search()
+    if search is None or not resumes:
+        return
+    try:
+        await search.add_resumes(user_id, resumes)
+    except Exception as e:
+        # Search misses these resumes until they are indexed again (e.g. /search/resumes/reindex)
+        logger.error(f"Error indexing resumes for user {user_id}: {e}")
+
+async def extract_resume_texts(resume_ids: List[str], user_id: str):
+    """
+    Extracts the text of a user's uploaded resumes (in request order, unknown or
+    unreadable ones skipped) and saves it. Returns the (resume_id, text) pairs, the
+    texts extracted for the first time (for the corpus IDF) and the (resume_id, text)
+    pairs whose text is new or changed (for the search index), and the feature records
+    (resume_id -> parsed_data) for score_resumes.
+
+    A content-addressed resume (content_hash set) can't change, so its saved text and
+    features are reused rather than extracted again. Extracted resumes get their
+    feature record built and saved with the text.
+    """
+    texts_by_id = {} # resume_id -> text
+    feature_records = {} # resume_id -> parsed_data
+    new_resume_texts = []
+    changed_resumes = []
+
+    records_by_id = {r.id: r for r in await get_resumes(resume_ids, user_id)}
+    records = []
+    for resume_id in resume_ids:
+        r_record = records_by_id.get(resume_id)
+        if not r_record:
+            continue
+        if r_record.content_hash and r_record.extracted_text:
+            texts_by_id[resume_id] = r_record.extracted_text
+            feature_records[resume_id] = r_record.parsed_data
+            continue
+        if not os.path.exists(r_record.file_path):
+            logger.warning(f"Resume {resume_id} not found, skipping.")
+            continue
+        records.append(r_record)
+
+    # Extract Text and features (in the analysis pool; failed files come back as None)
+    extracted = await analysis_pool.extract_records([r_record.file_path for r_record in records])
+
+    for r_record, result in zip(records, extracted):
+        content_text, parsed_data = result or ("", None)
+        if not content_text:
+            continue
+        try:
+            # Save extracted text to DB
+            if not r_record.extracted_text:
+                new_resume_texts.append(content_text)
+            if content_text != r_record.extracted_text:
+                changed_resumes.append((r_record.id, content_text))
+            await update_resume_text(r_record.id, content_text, parsed_data)
+
+            texts_by_id[r_record.id] = content_text
+            feature_records[r_record.id] = parsed_data
+            
+        except Exception as e:
+            logger.error(f"Error saving text of resume {r_record.id}: {e}")
+            continue
+
+    resumes = [(resume_id, texts_by_id[resume_id]) for resume_id in resume_ids if resume_id in texts_by_id]
+    return resumes, new_resume_texts, changed_resumes, feature_records
+
+def ranking_record(jd_id: str, scored: Dict[str, Any], required_experience: float,
+                    screening_job_id: Optional[str] = None) -> Dict[str, Any]:
+    record = {
+        "job_description_id": jd_id,
+        "resume_id": scored["resume_id"],
+        "total_score": scored["final_score"],
+        "details": {
+            # Component scores: enough to re-rank without re-analysis (/history/jobs/{id}/rerank)
+            "name": scored["name"],
+            "bert_score": scored["bert_score"],
+            "required_experience": required_experience,
+            "skill_match": scored["skill_match_percentage"],
+            "experience": scored["years_of_experience"],
+            "matched_skills": scored["matched_skills"],
+            "missing_skills": scored["missing_skills"],
+            "semantic_scorer": scored.get("semantic_scorer"),
+            "explanation": scored["scoring_explanation"]
+        }
+    }
+    if screening_job_id is not None:
+        record["details"]["screening_job_id"] = screening_job_id
+    return record
+
+def doubling_chunk_sizes(first: int, limit: int) -> Iterator[int]:
+    """first, 2 * first, ... capped at limit: small chunks early (fast first results), then throughput."""
+    size = max(1, min(first, limit))
+    while True:
+        yield size
+        size = min(size * 2, max(1, limit))
+
+async def screen_batch(jd_id: str, jd_text: str, jd_skills_dict: Dict[str, Any], resume_ids: List[str],
+                        user_id: str, shortlist: IncrementalRanker, chunk_sizes: Iterator[int]):
+    """
+    Extracts, scores and saves the batch's resumes chunk by chunk (sizes from
+    chunk_sizes), adding every candidate to the shortlist. Yields (resumes processed,
+    the chunk's scored candidates) after each chunk. The corpus statistics are read
+    before the first chunk and updated once, when the batch ends.
+    """
+    corpus = await recruiter_corpus(user_id)
+    new_docs, new_document_frequencies = 0, Counter()
+    chunk_start = 0
+    try:
+        while chunk_start < len(resume_ids):
+            chunk_ids = resume_ids[chunk_start:chunk_start + next(chunk_sizes)]
+            chunk_start += len(chunk_ids)
+            resumes, new_resume_texts, changed_resumes, feature_records = await extract_resume_texts(
+                chunk_ids, user_id)
+            await index_resumes(user_id, changed_resumes)
+            doc_count, document_frequencies = document_frequency_delta(new_resume_texts)
+            new_docs += doc_count
+            new_document_frequencies.update(document_frequencies)
+
+            # Score & Rank
+            candidates_data = await score_resumes(jd_text, jd_skills_dict, resumes, corpus, feature_records)
+            scored_chunk = shortlist.extend(candidates_data)
+            for scored in scored_chunk:
+                # Save to DB (every candidate, so /rerank sees the whole screening)
+                await save_ranking_result(ranking_record(jd_id, scored, shortlist.required_experience))
+            yield chunk_start, scored_chunk
+    finally:
+        # Also when the batch stops early: the extracted texts are saved and won't be new again
+        await add_to_corpus(user_id, new_docs, new_document_frequencies)
@@ -1,45 +1,109 @@
-
-import json
 import logging
 import os
-from typing import Dict, List, Set, Any
+import threading
+import time
+from typing import Dict, List, Set, Any, Optional, Tuple, Union
 
-from fuzzywuzzy import fuzz, process
+from app.core.parsed_document import ParsedDocument
+from app.core.skill_index import SkillTrie, FuzzySkillIndex
+from app.core.taxonomy import (
+    CompiledTaxonomy,
+    default_artifact_path,
+    default_relations_path,
+    load_taxonomy,
+    read_sources,
+    resolve_path,
+    source_version,
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class SkillExtractor:
-    def __init__(self, db_path: str = "data/skills_database.json"):
+    def __init__(self, db_path: str = "data/skills_database.json", artifact_path: Optional[str] = None,
+                 reload_interval: float = 5.0, relations_path: Optional[str] = None):
         """
         Initialize the SkillExtractor with a JSON database of skills.
+
+        Args:
+            db_path (str): JSON taxonomy source.
+            artifact_path (str): Compiled taxonomy built by scripts/build_taxonomy.py.
+                                 Defaults to the JSON path with a .bin extension.
+            reload_interval (float): Seconds between checks for a changed taxonomy.
+                                     0 checks on every call, a negative value disables hot reload.
+            relations_path (str): Curated skill relations (partial-match scores between skills).
+                                  Defaults to skill_relations.json next to the JSON taxonomy.
         """
-        # Resolve absolute path relative to project root if needed
-        # Assuming run from project root, but let's be safe
-        if not os.path.exists(db_path):
-             # Try to find it relative to this file
-            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-            potential_path = os.path.join(base_dir, db_path)
-            if os.path.exists(potential_path):
-                db_path = potential_path
-            else:
-                logger.error(f"Skills database not found at {db_path} or {potential_path}")
-                raise FileNotFoundError(f"Skills database not found at {db_path}")
+        self.db_path = resolve_path(db_path)
+        self.artifact_path = resolve_path(artifact_path or default_artifact_path(self.db_path))
+        self.relations_path = resolve_path(relations_path or default_relations_path(self.db_path))
+        self.reload_interval = reload_interval
 
-        logger.info(f"Loading skills database from {db_path}...")
-        with open(db_path, 'r') as f:
-            self.skills_db = json.load(f)
-        
-        # Flatten database for easier lookup if needed, but keeping structure is good for categorization
-        self.categories = self.skills_db.keys()
+        self._reload_lock = threading.Lock()
+        self._last_check = time.monotonic()
+        self._mtimes = self._stat_sources()
+        self._set_taxonomy(load_taxonomy(self.db_path, self.artifact_path, self.relations_path))
+
+    def _set_taxonomy(self, taxonomy: CompiledTaxonomy):
+        self.taxonomy = taxonomy
+        self.skills_db = taxonomy.skills_db
+        self.categories = taxonomy.categories
+
+    @property
+    def version(self) -> str:
+        return self.taxonomy.version
+
+    def _stat_sources(self) -> Tuple[Optional[float], ...]:
+        def mtime(path):
+            try:
+                return os.stat(path).st_mtime
+            except OSError:
+                return None
+        return mtime(self.db_path), mtime(self.artifact_path), mtime(self.relations_path)
+
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """
+        Picks up a changed taxonomy without a restart.
+
+        The cheap mtime check runs at most once per reload_interval; the content hash is
+        only computed when an mtime moved, and the taxonomy is only reloaded when the hash
+        differs from the loaded version. Returns True if a new taxonomy was loaded.
+        """
+        if self.reload_interval < 0 and not force:
+            return False
+        now = time.monotonic()
+        if not force and now - self._last_check < self.reload_interval:
+            return False
+
+        with self._reload_lock:
+            self._last_check = now
+            mtimes = self._stat_sources()
+            if mtimes == self._mtimes and not force:
+                return False
+            self._mtimes = mtimes
+
+            if mtimes[0] is not None:
+                version = source_version(*read_sources(self.db_path, self.relations_path))
+                if version == self.taxonomy.version:
+                    return False
+            try:
+                taxonomy = load_taxonomy(self.db_path, self.artifact_path, self.relations_path)
+            except Exception as e:
+                logger.error(f"Taxonomy reload failed, keeping v{self.taxonomy.version}: {e}")
+                return False
+            if taxonomy.version == self.taxonomy.version:
+                return False
+            logger.info(f"Skills taxonomy changed: v{self.taxonomy.version} -> v{taxonomy.version}")
+            self._set_taxonomy(taxonomy)
+            return True
 
-    def extract_skills(self, text: str, threshold: int = 90) -> Dict[str, List[str]]:
+    def extract_skills(self, text: Union[str, ParsedDocument], threshold: int = 90) -> Dict[str, List[str]]:
         """
         Extracts skills from text using fuzzy matching against the database.
         
         Args:
-            text (str): The input text (resume or job description).
+            text (str | ParsedDocument): The input text (resume or job description).
             threshold (int): The fuzzy matching score threshold (0-100). 
                              Higher is stricter. 90 is recommended to avoid false positives.
 
@@ -47,52 +111,75 @@ class SkillExtractor:
             Dict[str, List[str]]: A dictionary where keys are categories (e.g., 'programming_languages')
                                   and values are lists of found unique skills.
         """
-        found_skills: Dict[str, Set[str]] = {cat: set() for cat in self.categories}
-        
-        # Pre-process text simply (lowercasing done by fuzzywuzzy usually, but good practice)
-        # However, fuzzywuzzy handles case.
-        # We need to be careful. Direct fuzzy matching against the whole text is expensive and inaccurate.
-        # Better approach: 
-        # 1. Tokenize text or n-grams? 
-        # 2. Or iterate through ALL skills and search them in text?
-        # Iterating through skills is reasonably fast for ~100-500 skills.
-        
-        # To make it efficient and accurate:
-        # We search if the skill name (or alias) is "in" the text.
-        # Partial ratio is good for finding "Python" in "I know Python programming".
-        
-        normalized_text = text.lower()
-        unique_tokens = set(normalized_text.split())
-
-        for category, skills_list in self.skills_db.items():
-            for skill_entry in skills_list:
-                skill_name = skill_entry["name"]
-                variations = [skill_name] + skill_entry.get("aliases", [])
-                
-                for variation in variations:
-                    v_lower = variation.lower()
-                    
-                    # 1. Exact match (case-insensitive word boundary)
-                    import re
-                    escaped = re.escape(v_lower)
-                    pattern = r'(?:^|[\s,.;\(\)\[\]])' + escaped + r'(?:$|[\s,.;\(\)\[\]])'
-                    
-                    if re.search(pattern, normalized_text):
-                        found_skills[category].add(skill_name)
-                        break
-                        
-                    # 2. Fuzzy match for typo tolerance (only for longer words)
-                    if len(v_lower) >= 4:
-                        match = process.extractOne(variation, unique_tokens, scorer=fuzz.ratio)
-                        if match:
-                            best_token, score = match
-                            if score >= threshold:
-                                logger.info(f"Fuzzy match found: '{best_token}' -> '{skill_name}' (Score: {score})")
-                                found_skills[category].add(skill_name)
-                                break
-
-        # Convert sets to sorted lists
-        return {k: sorted(list(v)) for k, v in found_skills.items()}
+        self.reload_if_changed()
+        taxonomy = self.taxonomy
+        found_ids = _find_skill_ids(text, taxonomy, taxonomy.trie, taxonomy.fuzzy_index(threshold))
+        return _group_by_category(taxonomy, found_ids)
+
+    def extract_skill_ids(self, text: Union[str, ParsedDocument], threshold: int = 90) -> List[int]:
+        """
+        Same as extract_skills, flattened to canonical skill ids (taxonomy.vocabulary) in
+        the same order as the flattened category lists.
+        """
+        self.reload_if_changed()
+        return taxonomy_skill_ids(self.taxonomy, text, threshold)
+
+
+def taxonomy_skill_ids(taxonomy: CompiledTaxonomy, text: Union[str, ParsedDocument], threshold: int = 90) -> List[int]:
+    """SkillExtractor.extract_skill_ids against a given taxonomy (no reload check)."""
+    found_ids = _find_skill_ids(text, taxonomy, taxonomy.trie, taxonomy.fuzzy_index(threshold))
+    return canonical_skill_ids(taxonomy, _group_by_category(taxonomy, found_ids))
+
+
+def _find_skill_ids(text: Union[str, ParsedDocument], taxonomy: CompiledTaxonomy, trie: SkillTrie,
+                    fuzzy_index: FuzzySkillIndex) -> Set[int]:
+    doc = ParsedDocument.of(text)
+    normalized_text = doc.normalized_text
+    unique_tokens = doc.unique_tokens
+
+    # 1. Exact match (case-insensitive word boundary) for every variation at once
+    found_ids = trie.find(normalized_text)
+
+    # 2. Fuzzy match for typo tolerance (only for longer words)
+    fuzzy_matches = fuzzy_index.match(unique_tokens, skip=found_ids)
+    for skill_id, (best_token, score) in fuzzy_matches.items():
+        logger.info(f"Fuzzy match found: '{best_token}' -> '{taxonomy.skills[skill_id][1]}' (Score: {score})")
+        found_ids.add(skill_id)
+    return found_ids
+
+
+def _group_by_category(taxonomy: CompiledTaxonomy, skill_ids: Set[int]) -> Dict[str, List[str]]:
+    found_skills: Dict[str, Set[str]] = {cat: set() for cat in taxonomy.categories}
+    for skill_id in skill_ids:
+        category, skill_name = taxonomy.skills[skill_id]
+        found_skills[category].add(skill_name)
+
+    # Convert sets to sorted lists
+    return {k: sorted(list(v)) for k, v in found_skills.items()}
+
+
+def canonical_skill_ids(taxonomy: CompiledTaxonomy, skills_dict: Dict[str, List[str]]) -> List[int]:
+    """
+    Flattens a category -> skills dict into canonical ids, keeping the flattened order.
+
+    The taxonomy's vocabulary is shared and only read here: a name from another taxonomy
+    version (e.g. JD skills extracted before a hot reload) is looked up by name, and
+    dropped if this version doesn't know it at all.
+    """
+    vocabulary = taxonomy.vocabulary
+    ids = []
+    for category, names in skills_dict.items():
+        for name in names:
+            skill_id = taxonomy.skill_ids.get((category, name))
+            if skill_id is not None:
+                ids.append(taxonomy.canonical_ids[skill_id])
+                continue
+            canonical_id = vocabulary.get(name)
+            if canonical_id is None:
+                logger.warning(f"Skill '{name}' is not in taxonomy v{taxonomy.version}, ignoring it.")
+            else:
+                ids.append(canonical_id)
+    return ids
 
 if __name__ == "__main__":
     # Self-test
@@ -0,0 +1,400 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from fuzzywuzzy import fuzz, process, utils
+from rapidfuzz import process as rf_process
+from rapidfuzz.distance import Indel
+from scipy import sparse
+
+# Characters that delimit a skill mention. Mirrors the boundary class used by the
+# original per-skill regex: (?:^|[\s,.;\(\)\[\]]) ... (?:$|[\s,.;\(\)\[\]])
+BOUNDARY_PATTERN = re.compile(r'[\s,.;\(\)\[\]]')
+
+
+# Key under which a trie node stores the skill ids of variations ending there.
+# Children are keyed by single characters, so the empty string never collides.
+_TERMINAL = ""
+
+
+class SkillTrie:
+    """
+    Character trie over every (lowercased) skill name and alias.
+
+    A mention can only start at the beginning of the text or right after a boundary
+    character, and must end at the end of the text or right before one. So instead of
+    running one regex per variation, we find the boundary positions once and walk the
+    trie from each valid start, reporting every terminal node whose next character is
+    a boundary. This is a single left-to-right pass over the text regardless of the
+    taxonomy size.
+
+    Nodes are plain dicts so the compiled trie pickles (and unpickles) quickly.
+    """
+
+    def __init__(self, variations: Iterable[Tuple[str, int]] = ()):
+        self._root: Dict[str, Any] = {}
+        self.size = 0
+        for variation, skill_id in variations:
+            self.add(variation, skill_id)
+
+    def add(self, variation: str, skill_id: int):
+        """Adds a variation (matched case-insensitively) that maps to skill_id."""
+        v_lower = variation.lower()
+        if not v_lower:
+            return
+        node = self._root
+        for ch in v_lower:
+            node = node.setdefault(ch, {})
+        skill_ids = node.setdefault(_TERMINAL, [])
+        if skill_id not in skill_ids:
+            skill_ids.append(skill_id)
+            self.size += 1
+
+    def find(self, normalized_text: str) -> Set[int]:
+        """
+        Returns the ids of all skills with at least one variation present in the text.
+
+        Args:
+            normalized_text (str): Already lowercased text.
+        """
+        n = len(normalized_text)
+        boundaries = {m.start() for m in BOUNDARY_PATTERN.finditer(normalized_text)}
+        starts = [0]
+        starts.extend(b + 1 for b in boundaries if b + 1 < n)
+
+        found: Set[int] = set()
+        root = self._root
+        for start in starts:
+            node = root.get(normalized_text[start]) if start < n else None
+            pos = start + 1
+            while node is not None:
+                skill_ids = node.get(_TERMINAL)
+                if skill_ids is not None and (pos == n or pos in boundaries):
+                    found.update(skill_ids)
+                if pos == n:
+                    break
+                node = node.get(normalized_text[pos])
+                pos += 1
+        return found
+
+
+def naive_exact_match(variations: Iterable[Tuple[str, int]], normalized_text: str) -> Set[int]:
+    """
+    Reference implementation: one word-boundary regex search per variation.
+    Kept for parity tests and benchmarks against SkillTrie.
+    """
+    found: Set[int] = set()
+    for variation, skill_id in variations:
+        if skill_id in found:
+            continue
+        escaped = re.escape(variation.lower())
+        pattern = r'(?:^|[\s,.;\(\)\[\]])' + escaped + r'(?:$|[\s,.;\(\)\[\]])'
+        if re.search(pattern, normalized_text):
+            found.add(skill_id)
+    return found
+
+
+def _max_indel_distance(len_a: int, len_b: int, threshold: int) -> int:
+    """
+    Largest InDel distance between strings of these lengths that still gives
+    fuzz.ratio >= threshold, or -1 if no distance does.
+
+    fuzz.ratio is intr(100 * (len_a + len_b - dist) / (len_a + len_b)) where dist is the
+    insert/delete edit distance, and dist always has the parity of len_a + len_b.
+    """
+    lensum = len_a + len_b
+    best = -1
+    for dist in range(abs(len_a - len_b), lensum + 1, 2):
+        if utils.intr(100 * ((lensum - dist) / lensum)) >= threshold:
+            best = dist
+        else:
+            break
+    return best
+
+
+class FuzzySkillIndex:
+    """
+    Typo-tolerant lookup of resume tokens against every skill variation.
+
+    Reproduces the old `process.extractOne(variation, unique_tokens, scorer=fuzz.ratio)`
+    check (score >= threshold, variations of 4+ characters) without scoring every
+    variation against every token.
+
+    Each variation (after fuzzywuzzy's full_process) is split into D + 1 pieces, where D
+    is the largest edit distance any token could have while still reaching the
+    threshold. A single insert or delete can break at most one piece, so any token that
+    matches contains at least one piece verbatim (pigeonhole). Tokens are looked up by
+    their substrings, and the few candidates that share a piece are verified with the
+    same fuzz.ratio scorer, so results are identical to the exhaustive scan.
+    """
+
+    def __init__(self, variations: Iterable[Tuple[str, int]], threshold: int = 90, min_length: int = 4):
+        self.threshold = threshold
+        self._queries: List[str] = []
+        self._skill_ids: List[List[int]] = []
+        self._pieces: Dict[str, List[int]] = {}
+        self._piece_lengths: Set[int] = set()
+        # Variations that cannot be partitioned (very low thresholds) are scanned exhaustively
+        self._exhaustive: List[int] = []
+
+        positions: Dict[str, int] = {}
+        for variation, skill_id in variations:
+            if len(variation.lower()) < min_length:
+                continue
+            query = utils.full_process(variation)
+            pos = positions.get(query)
+            if pos is None:
+                pos = len(self._queries)
+                positions[query] = pos
+                self._queries.append(query)
+                self._skill_ids.append([])
+            if skill_id not in self._skill_ids[pos]:
+                self._skill_ids[pos].append(skill_id)
+
+        self._max_token_length = 0
+        if threshold <= 0:
+            # Every token scores >= 0, nothing to prune
+            self._exhaustive = list(range(len(self._queries)))
+            self._max_token_length = float("inf")
+            return
+        for pos, query in enumerate(self._queries):
+            max_dist, max_len = self._distance_bounds(len(query))
+            if max_dist < 0:
+                continue
+            self._max_token_length = max(self._max_token_length, max_len)
+            n_pieces = max_dist + 1
+            if n_pieces > len(query):
+                self._exhaustive.append(pos)
+                continue
+            size, extra = divmod(len(query), n_pieces)
+            start = 0
+            for i in range(n_pieces):
+                end = start + size + (1 if i < extra else 0)
+                piece = query[start:end]
+                self._pieces.setdefault(piece, []).append(pos)
+                self._piece_lengths.add(len(piece))
+                start = end
+
+    def _distance_bounds(self, query_length: int) -> Tuple[int, int]:
+        """Returns (max edit distance over all token lengths, longest token that can match)."""
+        max_dist, max_len = -1, 0
+        # Even a token containing the whole query scores at most 2 * q / (q + t), so longer
+        # tokens cannot round up to the threshold
+        limit = int(query_length * 200 / max(self.threshold - 0.5, 0.5)) + 2
+        for token_length in range(0, limit + 1):
+            if query_length + token_length == 0:
+                continue
+            dist = _max_indel_distance(query_length, token_length, self.threshold)
+            if dist >= 0:
+                max_dist = max(max_dist, dist)
+                max_len = token_length
+        return max_dist, max_len
+
+    def match(self, tokens: Iterable[str], skip: Set[int] = frozenset()) -> Dict[int, Tuple[str, int]]:
+        """
+        Finds skills with a variation scoring >= threshold against any token.
+
+        Args:
+            tokens: Raw resume tokens (e.g. the unique whitespace-split words).
+            skip: Skill ids that are already known to be present.
+
+        Returns:
+            Dict mapping skill id to (best matching token, score).
+        """
+        processed_tokens: Dict[str, str] = {}
+        for token in tokens:
+            processed_tokens.setdefault(utils.full_process(token), token)
+
+        best: Dict[int, Tuple[str, int]] = {}
+
+        def verify(pos: int, processed: str):
+            ids = self._skill_ids[pos]
+            if all(skill_id in skip for skill_id in ids):
+                return
+            score = fuzz.ratio(self._queries[pos], processed)
+            if score >= self.threshold:
+                token = processed_tokens[processed]
+                for skill_id in ids:
+                    if skill_id not in skip and score > best.get(skill_id, ("", -1))[1]:
+                        best[skill_id] = (token, score)
+
+        for processed in processed_tokens:
+            if len(processed) > self._max_token_length:
+                continue
+            checked: Set[int] = set()
+            for length in self._piece_lengths:
+                for i in range(len(processed) - length + 1):
+                    for pos in self._pieces.get(processed[i:i + length], ()):
+                        if pos not in checked:
+                            checked.add(pos)
+                            verify(pos, processed)
+            for pos in self._exhaustive:
+                verify(pos, processed)
+        return best
+
+
+def naive_fuzzy_match(variations: Iterable[Tuple[str, int]], tokens: Set[str], threshold: int = 90,
+                      skip: Set[int] = frozenset()) -> Set[int]:
+    """
+    Reference implementation: one process.extractOne per variation of 4+ characters.
+    Kept for parity tests and benchmarks against FuzzySkillIndex.
+    """
+    found: Set[int] = set()
+    for variation, skill_id in variations:
+        if skill_id in skip or skill_id in found or len(variation.lower()) < 4:
+            continue
+        match = process.extractOne(variation, tokens, scorer=fuzz.ratio)
+        if match and match[1] >= threshold:
+            found.add(skill_id)
+    return found
+
+
+class SkillVocabulary:
+    """
+    Interns skill names to canonical integer ids.
+
+    Names are matched case-insensitively (the same way SkillMatcher compares skills), so
+    'AWS' and 'aws' share an id. Unknown names are interned on demand and get the next id.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.lower_names: List[str] = []
+        for name in names:
+            self.intern(name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def intern(self, name: str) -> int:
+        """Returns the id for a skill name, assigning a new one if needed."""
+        name_lower = name.lower()
+        skill_id = self._ids.get(name_lower)
+        if skill_id is None:
+            skill_id = len(self.names)
+            self._ids[name_lower] = skill_id
+            self.names.append(name)
+            self.lower_names.append(name_lower)
+        return skill_id
+
+    def get(self, name: str) -> Optional[int]:
+        """Returns the id for a skill name, or None if it was never interned."""
+        return self._ids.get(name.lower())
+
+    def lower_name(self, skill_id: int) -> str:
+        return self.lower_names[skill_id]
+
+    def overlay(self) -> "VocabularyOverlay":
+        """A scratch extension for names that may be unknown, leaving this vocabulary untouched."""
+        return VocabularyOverlay(self)
+
+
+class VocabularyOverlay:
+    """
+    Interns names on top of a shared SkillVocabulary without mutating it.
+
+    Names the base knows keep their ids; unknown names get ids from len(base) on, held
+    only here, so the overlay lives for one call (e.g. SkillMatcher.match_skills with
+    free-form names) and the shared vocabulary doesn't grow.
+    """
+
+    def __init__(self, base: SkillVocabulary):
+        self.base = base
+        self._base_size = len(base)
+        self._ids: Dict[str, int] = {}
+        self._lower_names: List[str] = []
+
+    def intern(self, name: str) -> int:
+        skill_id = self.base.get(name)
+        if skill_id is not None:
+            return skill_id
+        name_lower = name.lower()
+        skill_id = self._ids.get(name_lower)
+        if skill_id is None:
+            skill_id = self._base_size + len(self._lower_names)
+            self._ids[name_lower] = skill_id
+            self._lower_names.append(name_lower)
+        return skill_id
+
+    def lower_name(self, skill_id: int) -> str:
+        if skill_id < self._base_size:
+            return self.base.lower_names[skill_id]
+        return self._lower_names[skill_id - self._base_size]
+
+
+class SkillSimilarity:
+    """
+    Precomputed skill-to-skill similarity for SkillMatcher partial matches.
+
+    Holds fuzz.ratio between every pair of vocabulary names (lowercased), as a sparse
+    uint8 matrix that only keeps pairs scoring >= floor. Curated relations (e.g. related
+    tools that don't look alike) are merged in with max(), so a partial match becomes a
+    table lookup instead of a string comparison at request time.
+
+    Scores are computed with RapidFuzz's Indel similarity, the same function
+    Levenshtein.ratio (and therefore fuzz.ratio) uses, and rounded the same way.
+    """
+
+    def __init__(self, lower_names: List[str], floor: int = 50,
+                 relations: Iterable[Tuple[int, int, int]] = (), chunk_size: int = 1000):
+        self.floor = floor
+        self.size = len(lower_names)
+
+        rows, cols, values = [], [], []
+        for start in range(0, self.size, chunk_size):
+            block = rf_process.cdist(
+                lower_names[start:start + chunk_size], lower_names,
+                scorer=Indel.normalized_similarity, score_cutoff=max(floor - 0.5, 0) / 100.0,
+                dtype=np.float64, workers=-1,
+            )
+            scores = np.rint(100.0 * block)
+            r, c = np.nonzero(scores >= floor)
+            rows.append(r + start)
+            cols.append(c)
+            values.append(scores[r, c])
+
+        matrix = sparse.csr_matrix(
+            (np.concatenate(values or [np.empty(0)]).astype(np.uint8),
+             (np.concatenate(rows or [np.empty(0, dtype=np.int64)]),
+              np.concatenate(cols or [np.empty(0, dtype=np.int64)]))),
+            shape=(self.size, self.size), dtype=np.uint8,
+        )
+
+        # One entry per unordered pair (duplicate CSR entries would be summed)
+        curated_scores: Dict[Tuple[int, int], int] = {}
+        for a, b, score in relations:
+            if a != b:
+                key = (min(a, b), max(a, b))
+                curated_scores[key] = max(curated_scores.get(key, 0), min(int(score), 100))
+        if curated_scores:
+            a, b = (np.array(x) for x in zip(*curated_scores))
+            score = np.array(list(curated_scores.values()))
+            curated = sparse.csr_matrix(
+                (np.concatenate([score, score]).astype(np.uint8),
+                 (np.concatenate([a, b]), np.concatenate([b, a]))),
+                shape=(self.size, self.size), dtype=np.uint8,
+            )
+            matrix = matrix.maximum(curated).astype(np.uint8)
+
+        matrix.sort_indices()
+        self.matrix = matrix
+
+    def covers(self, skill_id: int) -> bool:
+        return 0 <= skill_id < self.size
+
+    def scores(self, skill_id: int, others: Sequence[int]) -> np.ndarray:
+        """Scores (0 below floor) of skill_id against each id in others (all must be covered)."""
+        start, end = self.matrix.indptr[skill_id], self.matrix.indptr[skill_id + 1]
+        row_ids = self.matrix.indices[start:end]
+        others = np.asarray(others, dtype=row_ids.dtype)
+        if len(row_ids) == 0:
+            return np.zeros(len(others), dtype=np.int64)
+        pos = np.minimum(np.searchsorted(row_ids, others), len(row_ids) - 1)
+        hit = row_ids[pos] == others
+        return np.where(hit, self.matrix.data[start:end][pos], 0).astype(np.int64)
+
+    def neighbours(self, skill_id: int, min_score: int) -> np.ndarray:
+        """Ids scoring >= min_score against skill_id (requires min_score >= floor)."""
+        start, end = self.matrix.indptr[skill_id], self.matrix.indptr[skill_id + 1]
+        return self.matrix.indices[start:end][self.matrix.data[start:end] >= min_score]
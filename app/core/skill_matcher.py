@@ -1,22 +1,39 @@
 
+import itertools
 import logging
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Optional, Sequence
 
+import numpy as np
 from fuzzywuzzy import fuzz
+from scipy import sparse
+
+from app.core.skill_index import SkillSimilarity, SkillVocabulary, VocabularyOverlay
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+EXACT_WEIGHT = 1.0
+PARTIAL_WEIGHT = 0.7
+
 class SkillMatcher:
-    def __init__(self, similarity_threshold: int = 70):
+    def __init__(self, similarity_threshold: int = 70, vocabulary: Optional[SkillVocabulary] = None,
+                 similarity: Optional[SkillSimilarity] = None):
         """
         Initializes the SkillMatcher.
         
         Args:
             similarity_threshold (int): Minimum score (0-100) to consider a soft/fuzzy match.
+            vocabulary (SkillVocabulary): Skill name <-> id table. Pass the taxonomy's vocabulary
+                                          to match the ids produced by SkillExtractor.extract_skill_ids.
+            similarity (SkillSimilarity): Precomputed scores over the same vocabulary (the taxonomy's
+                                          similarity matrix). Partial matches become table lookups and
+                                          pick up curated relations; skills outside the matrix, or a
+                                          threshold below its floor, fall back to fuzz.ratio.
         """
         self.threshold = similarity_threshold
+        self.vocabulary = vocabulary if vocabulary is not None else SkillVocabulary()
+        self.similarity = similarity
 
     def match_skills(self, resume_skills: List[str], jd_skills: List[str]) -> Dict[str, Any]:
         """
@@ -43,69 +60,80 @@ class SkillMatcher:
                 "extra_skills": resume_skills
             }
 
-        # Normalize inputs for easier comparison
-        # Use set for faster lookups, but keep case variations for display if needed?
-        # Let's simple-normalize to lowercase for checking
-        resume_skills_lower = [s.lower() for s in resume_skills]
-        jd_skills_lower = [s.lower() for s in jd_skills]
-        
+        # Names the vocabulary doesn't know get ids for this call only
+        vocabulary = self.vocabulary.overlay()
+        resume_ids = [vocabulary.intern(s) for s in resume_skills]
+        jd_ids = [vocabulary.intern(s) for s in jd_skills]
+        # Decode with the caller's own spelling of each skill
+        return self._match(resume_ids, jd_ids, resume_skills, jd_skills, vocabulary)
+
+    def match_skill_ids(self, resume_ids: Sequence[int], jd_ids: Sequence[int]) -> Dict[str, Any]:
+        """
+        Same as match_skills, for skills already interned in self.vocabulary
+        (e.g. from SkillExtractor.extract_skill_ids). Names are decoded only for the output.
+        """
+        names = self.vocabulary.names
+        if not jd_ids:
+            return {
+                "match_percentage": 0.0,
+                "matched_skills": [],
+                "partial_matches": [],
+                "missing_skills": [],
+                "extra_skills": [names[i] for i in resume_ids]
+            }
+        return self._match(resume_ids, jd_ids, [names[i] for i in resume_ids], [names[i] for i in jd_ids])
+
+    def _match(self, resume_ids: Sequence[int], jd_ids: Sequence[int], resume_names: List[str],
+               jd_names: List[str], vocabulary: Optional[VocabularyOverlay] = None) -> Dict[str, Any]:
+        # Where each skill first appears in the resume (also the resume's skill set), so
+        # 'extra' skills keep the resume order
+        first_position: Dict[int, int] = {}
+        for pos, skill_id in enumerate(resume_ids):
+            first_position.setdefault(skill_id, pos)
+
         # Track used resume skills to identify 'extra' ones later
-        used_resume_indices = set()
+        used_positions = set()
         
         matched_skills = []
         partial_matches = []
         missing_skills = []
         
-        total_score = 0.0
-        
-        for jd_skill in jd_skills:
-            jd_skill_norm = jd_skill.lower()
-            
+        for jd_pos, jd_id in enumerate(jd_ids):
             # 1. Exact Match
-            if jd_skill_norm in resume_skills_lower:
-                matched_skills.append(jd_skill)
-                # Find index to mark as used
-                idx = resume_skills_lower.index(jd_skill_norm)
-                used_resume_indices.add(idx)
-                total_score += 1.0
+            if jd_id in first_position:
+                matched_skills.append(jd_names[jd_pos])
+                used_positions.add(first_position[jd_id])
                 continue
             
             # 2. Fuzzy Match (Partial)
-            # Check against all unused resume skills? Or all resume skills?
-            # Usually better to check all, but prioritize exact.
-            # We iterate to find the best match
+            # Best-scoring resume skill (first one wins ties)
             best_match_score = 0
-            best_match_idx = -1
-            best_match_name = ""
-            
-            for idx, res_skill in enumerate(resume_skills):
-                # Calculate ratio
-                score = fuzz.ratio(jd_skill_norm, res_skill.lower())
-                if score > best_match_score:
-                    best_match_score = score
-                    best_match_idx = idx
-                    best_match_name = res_skill
+            best_match_pos = -1
+            if len(resume_ids):
+                scores = self._scores(jd_id, resume_ids, vocabulary)
+                best_match_pos = int(np.argmax(scores))
+                best_match_score = int(scores[best_match_pos])
 
             if best_match_score >= self.threshold:
                 partial_matches.append({
-                    "jd_skill": jd_skill,
-                    "resume_skill": best_match_name,
+                    "jd_skill": jd_names[jd_pos],
+                    "resume_skill": resume_names[best_match_pos],
                     "score": best_match_score
                 })
-                used_resume_indices.add(best_match_idx)
-                total_score += 0.7  # Partial weight
+                used_positions.add(best_match_pos)
             else:
-                missing_skills.append(jd_skill)
+                missing_skills.append(jd_names[jd_pos])
 
         # Calculate Percentage
         # Max score possible is len(jd_skills) * 1.0
         # Percentage = (total_score / len(jd_skills)) * 100
-        match_percentage = (total_score / len(jd_skills)) * 100.0
+        total_score = len(matched_skills) * EXACT_WEIGHT + len(partial_matches) * PARTIAL_WEIGHT
+        match_percentage = (total_score / len(jd_ids)) * 100.0
         
         # Identify Extra Skills
         extra_skills = [
-            resume_skills[i] for i in range(len(resume_skills)) 
-            if i not in used_resume_indices
+            resume_names[i] for i in range(len(resume_ids))
+            if i not in used_positions
         ]
 
         return {
@@ -116,6 +144,121 @@ class SkillMatcher:
             "extra_skills": extra_skills
         }
 
+    def _scores(self, jd_id: int, skill_ids: Sequence[int],
+                vocabulary: Optional[VocabularyOverlay] = None) -> np.ndarray:
+        """
+        Similarity (0-100) of a JD skill against each of skill_ids (names from vocabulary,
+        default self.vocabulary).
+
+        Pairs covered by the similarity matrix are looked up (scores below its floor read
+        as 0, which never reaches the threshold); everything else goes through fuzz.ratio.
+        """
+        skill_ids = np.asarray(skill_ids, dtype=np.int64)
+        similarity = self.similarity
+        if similarity is not None and self.threshold >= similarity.floor and similarity.covers(jd_id):
+            covered = skill_ids < similarity.size
+            if covered.all():
+                return similarity.scores(jd_id, skill_ids)
+        else:
+            covered = np.zeros(len(skill_ids), dtype=bool)
+
+        lower_name = (vocabulary or self.vocabulary).lower_name
+        jd_skill_norm = lower_name(jd_id)
+        scores = np.zeros(len(skill_ids), dtype=np.int64)
+        if covered.any():
+            scores[covered] = similarity.scores(jd_id, skill_ids[covered])
+        scores[~covered] = [fuzz.ratio(jd_skill_norm, lower_name(i)) for i in skill_ids[~covered]]
+        return scores
+
+    def match_batch(self, candidate_skill_ids: Sequence[Sequence[int]], jd_ids: Sequence[int]) -> "BatchSkillMatch":
+        """
+        Matches many candidates against one JD in a single vectorized pass.
+
+        Candidates become rows of a sparse candidate x skill matrix over the skills seen in
+        the batch. Multiplying it by skill x JD-skill 'exact' and 'partial' relation matrices
+        says, per candidate, which JD skills are matched exactly and which have a resume
+        skill within the similarity threshold; weighting those by how often each skill
+        appears in the JD gives every match percentage at once. A resume skill doesn't get
+        used up by a match, so this is the same result as match_skill_ids per candidate.
+
+        Args:
+            candidate_skill_ids: Each candidate's skill ids (e.g. from SkillExtractor.extract_skill_ids).
+            jd_ids: The JD skill ids, in JD order.
+
+        Returns:
+            BatchSkillMatch with all percentages; breakdowns are decoded on demand.
+        """
+        n_candidates = len(candidate_skill_ids)
+        jd_ids = list(jd_ids)
+        if not jd_ids:
+            return BatchSkillMatch(self, candidate_skill_ids, jd_ids, np.zeros(n_candidates),
+                                   np.zeros((n_candidates, 0), dtype=bool), np.zeros((n_candidates, 0), dtype=bool))
+
+        # JD skills as unique columns, weighted by how often they appear in the JD
+        jd_unique, jd_columns = np.unique(np.asarray(jd_ids, dtype=np.int64), return_inverse=True)
+        jd_weights = np.bincount(jd_columns, minlength=len(jd_unique)).astype(np.float64)
+
+        # Candidate x skill matrix over the skills present in the batch
+        lengths = np.fromiter((len(ids) for ids in candidate_skill_ids), dtype=np.int64, count=n_candidates)
+        flat_ids = np.fromiter(itertools.chain.from_iterable(candidate_skill_ids), dtype=np.int64,
+                               count=int(lengths.sum()))
+        batch_skills, flat_columns = np.unique(flat_ids, return_inverse=True)
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        candidates = sparse.csr_matrix(
+            (np.ones(len(flat_ids), dtype=np.float32), flat_columns, indptr),
+            shape=(n_candidates, len(batch_skills)),
+        )
+
+        # Skill x JD-skill relations
+        exact = sparse.csr_matrix((batch_skills[:, None] == jd_unique[None, :]).astype(np.float32))
+        partial = np.zeros((len(batch_skills), len(jd_unique)), dtype=np.float32)
+        if len(batch_skills):
+            for col, jd_id in enumerate(jd_unique):
+                partial[:, col] = self._scores(int(jd_id), batch_skills) >= self.threshold
+        partial = sparse.csr_matrix(partial)
+
+        exact_hits = (candidates @ exact).toarray() > 0
+        partial_hits = ((candidates @ partial).toarray() > 0) & ~exact_hits
+
+        total_score = (exact_hits @ jd_weights) * EXACT_WEIGHT + (partial_hits @ jd_weights) * PARTIAL_WEIGHT
+        percentages = (total_score / len(jd_ids)) * 100.0
+        return BatchSkillMatch(self, candidate_skill_ids, jd_ids, percentages,
+                               exact_hits[:, jd_columns], partial_hits[:, jd_columns])
+
+
+class BatchSkillMatch:
+    """
+    Result of SkillMatcher.match_batch.
+
+    percentages[i] is candidate i's match_percentage. matched_skills(i) and missing_skills(i)
+    decode from the hit matrices; batch[i] gives the full match_skill_ids breakdown
+    (including which resume skill each partial match came from), computed on demand.
+    """
+
+    def __init__(self, matcher: SkillMatcher, candidate_skill_ids: Sequence[Sequence[int]], jd_ids: List[int],
+                 percentages: np.ndarray, exact_hits: np.ndarray, partial_hits: np.ndarray):
+        self._matcher = matcher
+        self._candidate_skill_ids = candidate_skill_ids
+        self._jd_ids = jd_ids
+        self._jd_names = [matcher.vocabulary.names[i] for i in jd_ids]
+        self.percentages: List[float] = [round(p, 2) for p in percentages.tolist()]
+        # Candidate x JD position
+        self.exact_hits = exact_hits
+        self.partial_hits = partial_hits
+
+    def __len__(self) -> int:
+        return len(self.percentages)
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        return self._matcher.match_skill_ids(self._candidate_skill_ids[i], self._jd_ids)
+
+    def matched_skills(self, i: int) -> List[str]:
+        return [self._jd_names[pos] for pos in np.flatnonzero(self.exact_hits[i])]
+
+    def missing_skills(self, i: int) -> List[str]:
+        missing = ~(self.exact_hits[i] | self.partial_hits[i])
+        return [self._jd_names[pos] for pos in np.flatnonzero(missing)]
+
 if __name__ == "__main__":
     matcher = SkillMatcher()
     
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.skill_index import SkillTrie, FuzzySkillIndex, SkillSimilarity, SkillVocabulary
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bump whenever the pickled structures change shape, so stale artifacts get rebuilt
+ARTIFACT_FORMAT = 4
+DEFAULT_FUZZY_THRESHOLD = 90
+# Skill pairs scoring below this are not stored in the similarity matrix
+SIMILARITY_FLOOR = 50
+
+
+def resolve_path(path: str) -> str:
+    """Resolves a data path relative to the project root if it doesn't exist as given."""
+    if os.path.exists(path) or os.path.isabs(path):
+        return path
+    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(base_dir, path)
+
+
+def default_artifact_path(db_path: str) -> str:
+    """data/skills_database.json -> data/skills_database.bin"""
+    return os.path.splitext(db_path)[0] + ".bin"
+
+
+def default_relations_path(db_path: str) -> str:
+    """Curated skill relations live next to the taxonomy: data/skill_relations.json"""
+    return os.path.join(os.path.dirname(db_path), "skill_relations.json")
+
+
+def content_version(raw: bytes) -> str:
+    """Content hash used to tag a taxonomy and the artifacts compiled from it."""
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+def read_sources(db_path: str, relations_path: Optional[str]) -> Tuple[bytes, Optional[bytes]]:
+    """Reads the taxonomy JSON and, if present, the curated relations JSON."""
+    with open(db_path, "rb") as f:
+        raw = f.read()
+    relations_raw = None
+    if relations_path and os.path.exists(relations_path):
+        with open(relations_path, "rb") as f:
+            relations_raw = f.read()
+    return raw, relations_raw
+
+
+def source_version(raw: bytes, relations_raw: Optional[bytes]) -> str:
+    """Version of a taxonomy source: its content hash, covering the relations file if any."""
+    if relations_raw is None:
+        return content_version(raw)
+    return content_version(raw + b"\0" + relations_raw)
+
+
+class CompiledTaxonomy:
+    """
+    The skills taxonomy plus every matcher structure derived from it.
+
+    Each (category, skill) pair gets an integer id in taxonomy order, and every name and
+    alias is a variation pointing at that id. Names are also interned into a
+    SkillVocabulary, whose canonical ids (shared by same-named skills) are what
+    SkillMatcher works on; canonical_ids maps a skill id to its canonical id. The
+    similarity matrix over canonical ids (fuzz.ratio plus curated relations) gives
+    SkillMatcher its partial-match scores.
+
+    The exact-match trie and the fuzzy index for the default threshold are built eagerly
+    so they can be stored in the artifact; other fuzzy thresholds are built on first use.
+    """
+
+    def __init__(self, skills_db: Dict[str, List[Dict[str, Any]]], version: str,
+                 relations: Optional[List[Dict[str, Any]]] = None):
+        self.version = version
+        self.skills_db = skills_db
+        self.categories: List[str] = list(skills_db.keys())
+
+        self.skills: List[Tuple[str, str]] = []
+        self.skill_ids: Dict[Tuple[str, str], int] = {}
+        self.variations: List[Tuple[str, int]] = []
+        for category, skills_list in skills_db.items():
+            for skill_entry in skills_list:
+                skill_id = len(self.skills)
+                self.skills.append((category, skill_entry["name"]))
+                self.skill_ids.setdefault((category, skill_entry["name"]), skill_id)
+                for variation in [skill_entry["name"]] + skill_entry.get("aliases", []):
+                    self.variations.append((variation, skill_id))
+
+        self.vocabulary = SkillVocabulary()
+        self.canonical_ids: List[int] = [self.vocabulary.intern(name) for _, name in self.skills]
+        self.similarity = SkillSimilarity(
+            self.vocabulary.lower_names, floor=SIMILARITY_FLOOR,
+            relations=self._resolve_relations(relations or []),
+        )
+
+        self.trie = SkillTrie(self.variations)
+        self.fuzzy_indexes: Dict[int, FuzzySkillIndex] = {}
+        self.fuzzy_index(DEFAULT_FUZZY_THRESHOLD)
+
+    def fuzzy_index(self, threshold: int) -> FuzzySkillIndex:
+        """Returns the typo-tolerant index for a threshold, building it on first use."""
+        index = self.fuzzy_indexes.get(threshold)
+        if index is None:
+            index = FuzzySkillIndex(self.variations, threshold=threshold)
+            self.fuzzy_indexes[threshold] = index
+        return index
+
+    def _resolve_relations(self, relations: List[Dict[str, Any]]) -> List[Tuple[int, int, int]]:
+        """Maps curated {"a", "b", "score"} entries onto canonical ids, skipping unknown skills."""
+        resolved = []
+        for relation in relations:
+            a, b = self.vocabulary.get(relation["a"]), self.vocabulary.get(relation["b"])
+            if a is None or b is None:
+                logger.warning(f"Skill relation {relation['a']!r} <-> {relation['b']!r} refers to an unknown skill, skipping.")
+                continue
+            resolved.append((a, b, int(relation.get("score", 100))))
+        return resolved
+
+    @classmethod
+    def from_json(cls, db_path: str, relations_path: Optional[str] = None) -> "CompiledTaxonomy":
+        """Parses the JSON taxonomy (and curated relations) and compiles all matcher structures."""
+        raw, relations_raw = read_sources(db_path, relations_path)
+        relations = json.loads(relations_raw) if relations_raw is not None else None
+        return cls(json.loads(raw), source_version(raw, relations_raw), relations)
+
+    def save(self, artifact_path: str):
+        """Writes the compiled taxonomy atomically, so running workers never read a partial file."""
+        tmp_path = f"{artifact_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"format": ARTIFACT_FORMAT, "version": self.version, "taxonomy": self}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, artifact_path)
+
+    @staticmethod
+    def load(artifact_path: str, expected_version: Optional[str] = None) -> Optional["CompiledTaxonomy"]:
+        """
+        Loads a compiled artifact. Returns None if it is missing, unreadable, from another
+        artifact format, or compiled from a different taxonomy version.
+
+        The artifact is a pickle produced by scripts/build_taxonomy.py; only load files you built.
+        """
+        try:
+            with open(artifact_path, "rb") as f:
+                payload = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read taxonomy artifact {artifact_path}: {e}")
+            return None
+
+        if payload.get("format") != ARTIFACT_FORMAT:
+            logger.info(f"Taxonomy artifact {artifact_path} has an old format, ignoring it.")
+            return None
+        if expected_version is not None and payload.get("version") != expected_version:
+            logger.info(f"Taxonomy artifact {artifact_path} is stale (version {payload.get('version')}), ignoring it.")
+            return None
+        return payload["taxonomy"]
+
+
+def load_taxonomy(db_path: str, artifact_path: Optional[str] = None,
+                  relations_path: Optional[str] = None) -> CompiledTaxonomy:
+    """
+    Loads the taxonomy, preferring a compiled artifact whose version matches the JSON source.
+
+    If the JSON source is missing but the artifact exists, the artifact is used as is
+    (deployments may ship only the compiled file).
+    """
+    db_path = resolve_path(db_path)
+    artifact_path = resolve_path(artifact_path or default_artifact_path(db_path))
+    relations_path = resolve_path(relations_path or default_relations_path(db_path))
+    start = time.perf_counter()
+
+    if os.path.exists(db_path):
+        version = source_version(*read_sources(db_path, relations_path))
+        taxonomy = CompiledTaxonomy.load(artifact_path, expected_version=version)
+        source = artifact_path
+        if taxonomy is None:
+            taxonomy = CompiledTaxonomy.from_json(db_path, relations_path)
+            source = db_path
+    else:
+        taxonomy = CompiledTaxonomy.load(artifact_path)
+        source = artifact_path
+        if taxonomy is None:
+            logger.error(f"Skills database not found at {db_path} (no artifact at {artifact_path} either)")
+            raise FileNotFoundError(f"Skills database not found at {db_path}")
+
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    logger.info(
+        f"Loaded skills taxonomy v{taxonomy.version} ({len(taxonomy.skills)} skills, "
+        f"{len(taxonomy.variations)} variations) from {source} in {elapsed_ms:.0f} ms"
+    )
+    return taxonomy
+
+
+def build_artifact(db_path: str, artifact_path: Optional[str] = None,
+                   relations_path: Optional[str] = None) -> CompiledTaxonomy:
+    """Compiles the JSON taxonomy and writes the artifact next to it (or to artifact_path)."""
+    db_path = resolve_path(db_path)
+    artifact_path = artifact_path or default_artifact_path(db_path)
+    relations_path = resolve_path(relations_path or default_relations_path(db_path))
+    taxonomy = CompiledTaxonomy.from_json(db_path, relations_path)
+    taxonomy.save(artifact_path)
+    logger.info(f"Wrote taxonomy artifact v{taxonomy.version} to {artifact_path}")
+    return taxonomy
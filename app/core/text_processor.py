@@ -2,12 +2,15 @@
 import re
 import string
 import logging
-from typing import List, Set, Dict
+from collections.abc import Mapping
+from typing import Any, Callable, Iterator, List, Set, Dict, Union
 
 import nltk
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 
+from app.core.parsed_document import EMAIL_PATTERN, PHONE_PATTERN, ParsedDocument
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -47,10 +50,7 @@ class TextProcessor:
         """
         Removes special characters and extra whitespace.
         """
-        text = text.replace('\n', ' ')
-        text = re.sub(r'[^\x00-\x7F]+', ' ', text)
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
+        return ParsedDocument(text).cleaned_text
 
     def normalize_text(self, text: str) -> str:
         """
@@ -78,16 +78,14 @@ class TextProcessor:
         """
         Extracts email addresses using regex.
         """
-        email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        return list(set(re.findall(email_pattern, text)))
+        return list(set(EMAIL_PATTERN.findall(text)))
 
     def extract_phone_numbers(self, text: str) -> List[str]:
         """
         Extracts phone numbers using regex.
         """
-        phone_pattern = r'(\+?\d{1,3}[-.\\s]?)?(\(?\d{3}\)?[-.\\s]?)?\d{3}[-.\\s]?\d{4}'
         matches = []
-        for match in re.finditer(phone_pattern, text):
+        for match in PHONE_PATTERN.finditer(text):
             matches.append(match.group())
         return [m.strip() for m in matches if len(re.sub(r'\D', '', m)) >= 10]
 
@@ -95,7 +93,9 @@ class TextProcessor:
         """
         Extracts skills present in the text based on the predefined skills database.
         """
-        normalized_text = self.normalize_text(text)
+        return self._scan_skills(self.normalize_text(text))
+
+    def _scan_skills(self, normalized_text: str) -> List[str]:
         found_skills = set()
         for skill in self.skills_db:
             escaped_skill = re.escape(skill)
@@ -104,27 +104,74 @@ class TextProcessor:
                 found_skills.add(skill)
         return list(found_skills)
 
-    def preprocess(self, text: str) -> Dict[str, any]:
+    def preprocess(self, text: Union[str, ParsedDocument], contacts_only: bool = False) -> "PreprocessResult":
         """
         Runs the full pipeline to clean text and extract metadata.
-        Returns a dictionary with cleaned text and extracted entities.
-        """
-        emails = self.extract_emails(text)
-        phones = self.extract_phone_numbers(text)
-        cleaned = self.clean_text(text)
-        normalized = self.normalize_text(cleaned)
-        no_stopwords = self.remove_stopwords(normalized)
-        lemmatized = self.lemmatize_text(no_stopwords)
-        skills = self.extract_skills(cleaned)
-
-        return {
-            "original_text": text,
-            "cleaned_text": cleaned,
-            "lemmatized_text": lemmatized,
-            "emails": emails,
-            "phone_numbers": phones,
-            "skills": skills
+        Returns a dict-like PreprocessResult with cleaned text and extracted entities.
+
+        Fields are computed on first access and memoized, so callers that only read
+        'emails' never pay for lemmatization or the skills scan. With contacts_only=True
+        the result only has original_text, emails and phone_numbers.
+
+        Accepts a ParsedDocument so the cleaning, lowercasing and contact scans are shared
+        with the other stages that parse the same resume.
+        """
+        doc = ParsedDocument.of(text)
+        fields: Dict[str, Callable[[], Any]] = {
+            "original_text": lambda: doc.text,
+            "emails": lambda: doc.emails,
+            "phone_numbers": lambda: doc.phone_numbers,
         }
+        if not contacts_only:
+            fields.update({
+                "cleaned_text": lambda: doc.cleaned_text,
+                "lemmatized_text": lambda: self._lemmatize_tokens(doc.normalized_cleaned_text),
+                "skills": lambda: self._scan_skills(doc.normalized_cleaned_text),
+            })
+        return PreprocessResult(fields)
+
+    def extract_contacts(self, text: Union[str, ParsedDocument]) -> "PreprocessResult":
+        """Shorthand for preprocess(text, contacts_only=True)."""
+        return self.preprocess(text, contacts_only=True)
+
+    def _lemmatize_tokens(self, normalized_text: str) -> str:
+        # Stopword removal and lemmatization in one pass over the tokens
+        return " ".join(
+            self._lemmatizer.lemmatize(token) for token in normalized_text.split() if token not in self.stop_words
+        )
+
+
+class PreprocessResult(Mapping):
+    """
+    Read-only mapping returned by TextProcessor.preprocess.
+
+    Behaves like the dict preprocess used to return (result["emails"], .get(),
+    "skills" in result, dict(result)), but each field is computed on first access.
+    """
+
+    def __init__(self, fields: Dict[str, Callable[[], Any]]):
+        self._fields = fields
+        self._values: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._values:
+            compute = self._fields[key]
+            self._values[key] = compute()
+        return self._values[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._fields
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __repr__(self) -> str:
+        shown = ", ".join(f"{k!r}: {self._values[k]!r}" if k in self._values else f"{k!r}: <lazy>"
+                          for k in self._fields)
+        return f"PreprocessResult({{{shown}}})"
 
 if __name__ == "__main__":
     processor = TextProcessor()
@@ -0,0 +1,112 @@
+import logging
+import math
+from typing import List, Sequence
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity as sk_cosine
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_FEATURES = 5000
+# smooth_idf over a two-document corpus: terms in both documents get idf 1, terms in one get this
+_PAIR_IDF_ONE_DOC = math.log(3.0 / 2.0) + 1.0
+
+MODES = ("shared", "hashing", "pairwise")
+
+
+def tfidf_similarity(text1: str, text2: str, max_features: int = MAX_FEATURES) -> float:
+    """Lightweight TF-IDF cosine similarity fallback (no RAM-heavy models)."""
+    try:
+        vectorizer = TfidfVectorizer(stop_words="english", max_features=max_features)
+        tfidf_matrix = vectorizer.fit_transform([text1, text2])
+        score = sk_cosine(tfidf_matrix[0], tfidf_matrix[1])[0][0]
+        return float(score)
+    except Exception as e:
+        logger.warning(f"TF-IDF fallback failed: {e}")
+        return 0.0
+
+
+class BatchTfidfScorer:
+    """
+    TF-IDF cosine scores of many resumes against one JD in a single pass.
+
+    Modes:
+    - "shared": one TfidfVectorizer fit over the JD and all resumes (IDF from the whole
+      batch), then every score from one sparse matrix-vector product.
+    - "hashing": stateless HashingVectorizer term frequencies (no fit, no vocabulary),
+      cosine via the same product. Cheapest; no IDF weighting.
+    - "pairwise": identical scores to tfidf_similarity(resume, jd) for each resume, but
+      vectorized: one CountVectorizer pass, with the two-document IDF of every pair
+      applied in closed form. Pairs whose joint vocabulary exceeds max_features (where
+      sklearn would drop terms) are scored with tfidf_similarity itself.
+
+    Args:
+        mode (str): One of MODES.
+        max_features (int): Vocabulary cap, as in the pairwise fallback.
+        n_features (int): Hash space for the "hashing" mode.
+    """
+
+    def __init__(self, mode: str = "shared", max_features: int = MAX_FEATURES, n_features: int = 2 ** 18):
+        if mode not in MODES:
+            raise ValueError(f"Unknown TF-IDF mode '{mode}', expected one of {MODES}")
+        self.mode = mode
+        self.max_features = max_features
+        self.n_features = n_features
+
+    def score(self, resumes: Sequence[str], job_description: str) -> List[float]:
+        if not resumes:
+            return []
+        try:
+            if self.mode == "shared":
+                return self._score_shared(resumes, job_description)
+            if self.mode == "hashing":
+                return self._score_hashing(resumes, job_description)
+            return self._score_pairwise(resumes, job_description)
+        except ValueError as e:
+            # e.g. empty vocabulary: nothing but stop words in the whole batch
+            logger.warning(f"Batch TF-IDF ({self.mode}) failed: {e}")
+            return [0.0] * len(resumes)
+
+    def _score_shared(self, resumes: Sequence[str], job_description: str) -> List[float]:
+        vectorizer = TfidfVectorizer(stop_words="english", max_features=self.max_features)
+        matrix = vectorizer.fit_transform([job_description, *resumes])
+        # Rows are L2-normalized, so the dot product is the cosine
+        return (matrix[1:] @ matrix[0].T).toarray().ravel().tolist()
+
+    def _score_hashing(self, resumes: Sequence[str], job_description: str) -> List[float]:
+        vectorizer = HashingVectorizer(stop_words="english", n_features=self.n_features,
+                                       alternate_sign=False, norm="l2")
+        matrix = vectorizer.transform([job_description, *resumes])
+        return (matrix[1:] @ matrix[0].T).toarray().ravel().tolist()
+
+    def _score_pairwise(self, resumes: Sequence[str], job_description: str) -> List[float]:
+        counts = CountVectorizer(stop_words="english").fit_transform([job_description, *resumes]).tocsr()
+        counts = counts.astype(np.float64)
+        jd = counts[0].toarray().ravel()
+        docs = counts[1:]
+        in_jd = (jd > 0).astype(np.float64)
+        present = docs.copy()
+        present.data[:] = 1.0
+
+        # Per pair: terms in both documents have idf 1, terms in only one have idf c
+        c2 = _PAIR_IDF_ONE_DOC ** 2
+        dot = docs @ jd
+        doc_sq = np.asarray(docs.multiply(docs).sum(axis=1)).ravel()
+        doc_shared_sq = docs.multiply(docs) @ in_jd
+        jd_sq = float(jd @ jd)
+        jd_shared_sq = present @ (jd * jd)
+        doc_norm = c2 * doc_sq - (c2 - 1.0) * doc_shared_sq
+        jd_norm = c2 * jd_sq - (c2 - 1.0) * jd_shared_sq
+        denominator = np.sqrt(doc_norm * jd_norm)
+        scores = np.divide(dot, denominator, out=np.zeros_like(dot), where=denominator > 0)
+
+        # sklearn keeps only the max_features most frequent terms of larger pairs
+        shared_terms = present @ in_jd
+        union = np.diff(docs.indptr) + np.count_nonzero(jd) - shared_terms
+        result = scores.tolist()
+        for i in np.flatnonzero(union > self.max_features):
+            result[i] = tfidf_similarity(resumes[i], job_description, self.max_features)
+        return result
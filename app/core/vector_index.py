@@ -0,0 +1,336 @@
+import contextlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single process assumed
+    fcntl = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+
+
+def quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-row symmetric int8 quantization: (codes, scales) with vector ≈ codes * scale."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    peak = np.abs(vectors).max(axis=1)
+    scales = np.where(peak > 0, peak / 127.0, 1.0).astype(np.float32)
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+def spherical_kmeans(vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Unit-norm centroids of k clusters of unit vectors (cosine k-means)."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        norms = np.linalg.norm(sums, axis=1)
+        # Empty clusters keep their previous centroid
+        filled = norms > 0
+        centroids[filled] = sums[filled] / norms[filled, None]
+    return centroids
+
+
+class VectorIndex:
+    """
+    Inverted-file (IVF) nearest-neighbour index over unit vectors, keyed by string ids.
+
+    Vectors are stored int8-quantized (one float32 scale per row), a quarter of the
+    float32 size. Once the index holds min_train vectors it is partitioned into about
+    sqrt(n) cells by spherical k-means; a search scores only the rows of the nprobe
+    cells closest to the query. Below min_train every row is scanned (exact). Cells are
+    retrained whenever the index has doubled since the last training; vectors added in
+    between go to their nearest existing cell.
+
+    Storage is append-only, so adding a chunk of vectors writes just those rows. A
+    generation directory (gen-N, named by CURRENT) holds the row-aligned codes.i8,
+    scales.f32 and assign.i32 files, ivf.npz (dim, centroids) and ids.log, whose lines
+    point an id at a row or remove it. Replacing a vector appends a new row and leaves
+    the old one dead. Training, and compaction once dead rows outnumber live ones,
+    write a new generation and switch CURRENT to it (atomic rename). Writers in several
+    processes are serialized by a lock file; searches and writes first catch up with
+    rows appended by other processes (or a new generation).
+
+    Args:
+        path (str): Directory of this index.
+        nprobe (int): Cells scanned per search.
+        min_train (int): Vectors needed before the index is partitioned.
+        min_compact (int): Dead rows tolerated before compaction regardless of the live count.
+    """
+
+    def __init__(self, path: str, nprobe: int = 16, min_train: int = 1024, min_compact: int = 1024):
+        self.path = path
+        self.nprobe = nprobe
+        self.min_train = min_train
+        self.min_compact = min_compact
+        os.makedirs(path, exist_ok=True)
+        self._current_file = os.path.join(path, CURRENT_FILE)
+        self._lock = threading.RLock()
+        self._reset()
+        self._refresh()
+
+    def _reset(self, generation: Optional[str] = None):
+        self._generation = generation
+        self._log_offset = 0
+        self._dim = 0
+        self.codes = np.empty((0, 0), dtype=np.int8)
+        self.scales = np.empty(0, dtype=np.float32)
+        self.assign = np.empty(0, dtype=np.int32)
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_size = 0
+        self._rows: Dict[str, int] = {}  # live id -> row
+        self._row_ids: List[Optional[str]] = []  # row -> id (None: dead)
+        self._live = np.empty(0, dtype=bool)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._rows)
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self._dim or None
+
+    def _file(self, name: str, generation: Optional[str] = None) -> str:
+        return os.path.join(self.path, generation or self._generation, name)
+
+    def _refresh(self):
+        """Catches up with the files: appended rows of the current generation, or a new generation."""
+        for attempt in range(2):
+            try:
+                with open(self._current_file, "r", encoding="utf-8") as f:
+                    generation = f.read().strip()
+            except FileNotFoundError:
+                # Nothing written yet
+                return
+            try:
+                if generation != self._generation:
+                    self._reset(generation)
+                    with np.load(self._file("ivf.npz"), allow_pickle=False) as data:
+                        self._dim = int(data["dim"])
+                        self.centroids = data["centroids"] if data["centroids"].size else None
+                        self.trained_size = int(data["trained_size"])
+                self._replay_log()
+                return
+            except FileNotFoundError:
+                # Replaced by a newer generation while we read it
+                if attempt:
+                    raise
+                self._generation = None
+
+    def _replay_log(self):
+        with open(self._file("ids.log"), "rb") as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        # Only complete lines: a line is written after the rows it points at
+        end = data.rfind(b"\n") + 1
+        if not end:
+            return
+        self._log_offset += end
+        n_rows = len(self._row_ids)
+        for line in data[:end].decode("utf-8").splitlines():
+            op, resume_id, row = json.loads(line)
+            old_row = self._rows.pop(resume_id, None)
+            if old_row is not None:
+                self._row_ids[old_row] = None
+            if op == "+":
+                if row >= len(self._row_ids):
+                    self._row_ids.extend([None] * (row + 1 - len(self._row_ids)))
+                self._row_ids[row] = resume_id
+                self._rows[resume_id] = row
+        if len(self._row_ids) != n_rows:
+            self._map_rows()
+        self._live = np.fromiter((resume_id is not None for resume_id in self._row_ids), dtype=bool,
+                                 count=len(self._row_ids))
+
+    def _map_rows(self):
+        n_rows = len(self._row_ids)
+        self.codes = np.memmap(self._file("codes.i8"), dtype=np.int8, mode="r", shape=(n_rows, self._dim))
+        self.scales = np.memmap(self._file("scales.f32"), dtype=np.float32, mode="r", shape=(n_rows,))
+        self.assign = np.memmap(self._file("assign.i32"), dtype=np.int32, mode="r", shape=(n_rows,))
+
+    @contextlib.contextmanager
+    def _writing(self) -> Iterator[None]:
+        with self._lock, open(os.path.join(self.path, ".lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._refresh()
+            if self._generation is None:
+                self._write_generation(np.flatnonzero(self._live))
+            yield
+
+    def _write_generation(self, rows: np.ndarray, assign: Optional[np.ndarray] = None):
+        """Writes `rows` (with new cell assignments, if given) as a new generation and switches to it."""
+        old = self._generation
+        number = int(old.split("-")[1]) + 1 if old else 1
+        generation = f"gen-{number}"
+        os.makedirs(os.path.join(self.path, generation), exist_ok=True)
+        np.ascontiguousarray(self.codes[rows] if len(rows) else np.empty((0, self._dim), np.int8)).tofile(
+            self._file("codes.i8", generation))
+        np.asarray(self.scales[rows], dtype=np.float32).tofile(self._file("scales.f32", generation))
+        np.asarray(self.assign[rows] if assign is None else assign, dtype=np.int32).tofile(
+            self._file("assign.i32", generation))
+        with open(self._file("ids.log", generation), "w", encoding="utf-8") as f:
+            for new_row, row in enumerate(rows):
+                f.write(json.dumps(["+", self._row_ids[row], new_row]) + "\n")
+        self._save_ivf(generation)
+
+        tmp_path = f"{self._current_file}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(generation)
+        os.replace(tmp_path, self._current_file)
+        if old:
+            shutil.rmtree(os.path.join(self.path, old), ignore_errors=True)
+        self._generation = None
+        self._refresh()
+
+    def _save_ivf(self, generation: Optional[str] = None):
+        tmp_path = self._file("ivf.tmp.npz", generation)
+        np.savez(
+            tmp_path,
+            dim=np.int64(self._dim),
+            centroids=self.centroids if self.centroids is not None else np.empty((0, 0), dtype=np.float32),
+            trained_size=np.int64(self.trained_size),
+        )
+        os.replace(tmp_path, self._file("ivf.npz", generation))
+
+    def _append(self, ids: Sequence[str], codes: np.ndarray, scales: np.ndarray, assign: np.ndarray):
+        """Appends rows, then the log lines pointing ids at them."""
+        paths = [self._file("codes.i8"), self._file("scales.f32"), self._file("assign.i32")]
+        row_bytes = [self._dim, 4, 4]
+        # Rows on disk that no log line points at (a writer died mid-append) are overwritten
+        start = min(os.path.getsize(path) // size for path, size in zip(paths, row_bytes))
+        start = max(start, len(self._row_ids))
+        for path, size, array in zip(paths, row_bytes, (codes, scales, assign)):
+            with open(path, "r+b") as f:
+                f.truncate(start * size)
+                f.seek(start * size)
+                np.ascontiguousarray(array).tofile(f)
+        with open(self._file("ids.log"), "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(["+", resume_id, start + i]) + "\n" for i, resume_id in enumerate(ids)))
+        self._replay_log()
+
+    def _maybe_compact(self):
+        dead = len(self._row_ids) - len(self._rows)
+        if dead > max(len(self._rows), self.min_compact):
+            self._write_generation(np.flatnonzero(self._live))
+
+    def add(self, ids: Sequence[str], vectors: Sequence[np.ndarray]):
+        """Inserts or replaces the vectors of ids (vectors are L2-normalized here)."""
+        if not len(ids):
+            return
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms > 0, norms, 1.0)
+        with self._writing():
+            if self._dim and matrix.shape[1] != self._dim:
+                raise ValueError(f"Vector index {self.path} holds dim {self._dim}, got {matrix.shape[1]}")
+            if not self._dim:
+                self._dim = matrix.shape[1]
+                self._save_ivf()
+            # Last vector wins for ids repeated in this batch
+            latest = list({resume_id: i for i, resume_id in enumerate(ids)}.items())
+            rows = [i for _, i in latest]
+            codes, scales = quantize(matrix[rows])
+            self._append([resume_id for resume_id, _ in latest], codes, scales, self._nearest_cells(matrix[rows]))
+            if len(self) >= self.min_train and len(self) >= 2 * self.trained_size:
+                self._train()
+            else:
+                self._maybe_compact()
+
+    def remove(self, ids: Sequence[str]):
+        """Drops ids (unknown ids are ignored)."""
+        with self._writing():
+            drop = [resume_id for resume_id in dict.fromkeys(ids) if resume_id in self._rows]
+            if not drop:
+                return
+            with open(self._file("ids.log"), "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(["-", resume_id, None]) + "\n" for resume_id in drop))
+            self._replay_log()
+            self._maybe_compact()
+
+    def _nearest_cells(self, matrix: np.ndarray) -> np.ndarray:
+        if self.centroids is None:
+            return np.zeros(len(matrix), dtype=np.int32)
+        return np.argmax(matrix @ self.centroids.T, axis=1).astype(np.int32)
+
+    def _vectors(self, rows: np.ndarray) -> np.ndarray:
+        return self.codes[rows].astype(np.float32) * self.scales[rows][:, None]
+
+    def _train(self):
+        """Partitions the live rows into cells and writes them as a new (compacted) generation."""
+        live = np.flatnonzero(self._live)
+        n = len(live)
+        n_cells = int(np.clip(np.sqrt(n), 16, 4096))
+        rng = np.random.default_rng(0)
+        # k-means on a sample is enough to place the cells
+        sample = rng.choice(n, size=min(n, 64 * n_cells), replace=False)
+        self.centroids = spherical_kmeans(self._unit(self._vectors(live[np.sort(sample)])), n_cells)
+        self.trained_size = n
+        self._write_generation(live, assign=self._nearest_cells(self._unit(self._vectors(live))))
+        logger.info(f"Vector index {self.path}: {n} vectors partitioned into {n_cells} cells.")
+
+    @staticmethod
+    def _unit(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms > 0, norms, 1.0)
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Top-k (id, cosine similarity) for query, best first."""
+        with self._lock:
+            self._refresh()
+            if not len(self._rows) or k <= 0:
+                return []
+            query = np.asarray(query, dtype=np.float32)
+            query = query / (np.linalg.norm(query) or 1.0)
+            if self.centroids is None:
+                rows = np.flatnonzero(self._live)
+            else:
+                n_probe = min(nprobe or self.nprobe, len(self.centroids))
+                cells = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+                rows = np.flatnonzero(self._live & np.isin(self.assign, cells))
+            scores = (self.codes[rows].astype(np.float32) @ query) * self.scales[rows]
+            if len(rows) > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top = np.arange(len(rows))
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(self._row_ids[rows[i]], float(scores[i])) for i in top]
+
+
+_indexes: "OrderedDict[str, VectorIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def _safe(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', name)
+
+
+def get_vector_index(root: str, model_id: str, tenant_id: str, nprobe: int = 16,
+                     max_open: int = 32) -> VectorIndex:
+    """Index of one tenant's vectors for one embedding model (the max_open most recently used stay loaded)."""
+    path = os.path.join(root, _safe(model_id), _safe(tenant_id))
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = VectorIndex(path, nprobe=nprobe)
+            _indexes[path] = index
+            while len(_indexes) > max_open:
+                _indexes.popitem(last=False)
+        _indexes.move_to_end(path)
+        return index
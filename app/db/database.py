@@ -1,14 +1,20 @@
 
+import asyncio
 import logging
+import weakref
 from datetime import datetime, timedelta
+from collections import Counter
 from typing import List, Optional, Dict, Any
 
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import delete
+from sqlalchemy import and_, delete, or_, update
+from sqlalchemy.exc import IntegrityError
 
 from app.config import settings
-from app.db.models import Base, JobDescription, Resume, RankingResult, User
+from app.core.corpus_idf import prune_terms
+from app.db.migrations import ensure_columns
+from app.db.models import Base, CorpusStats, JobDescription, JobResume, Resume, RankingResult, ScreeningJob, User
 
 # Initializing Engine
 # Note: config.DATABASE_URL is "sqlite:///./sql_app.db", for async we need "sqlite+aiosqlite:///..."
@@ -26,9 +32,10 @@ AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=As
 logger = logging.getLogger(__name__)
 
 async def init_db():
-    """Initializes the database by creating tables."""
+    """Initializes the database by creating tables (and columns/indexes added to existing tables)."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(ensure_columns, Base.metadata)
     logger.info("Database initialized.")
 
 # --- CRUD Functions ---
@@ -48,6 +55,42 @@ async def save_resume(resume_data: Dict[str, Any]):
             resume = Resume(**resume_data)
             session.add(resume)
 
+async def get_or_create_resume(resume_data: Dict[str, Any]) -> tuple:
+    """
+    The user's stored resume with resume_data's content_hash, saving resume_data if
+    there is none yet. Returns (resume, created).
+    """
+    stmt = select(Resume).where(Resume.user_id == resume_data["user_id"],
+                                Resume.content_hash == resume_data["content_hash"])
+    try:
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                existing = (await session.execute(stmt)).scalars().first()
+                if existing:
+                    return existing, False
+                resume = Resume(**resume_data)
+                session.add(resume)
+            return resume, True
+    except IntegrityError:
+        # The same file was stored by a concurrent upload
+        async with AsyncSessionLocal() as session:
+            return (await session.execute(stmt)).scalars().one(), False
+
+async def link_job_resumes(jd_id: str, resumes: List[tuple]):
+    """Links (resume_id, filename) pairs to a Job Description (already linked resumes are kept)."""
+    if not resumes:
+        return
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            result = await session.execute(select(JobResume.resume_id).where(
+                JobResume.job_description_id == jd_id, JobResume.resume_id.in_([r for r, _ in resumes])
+            ))
+            linked = set(result.scalars().all())
+            for resume_id, filename in resumes:
+                if resume_id not in linked:
+                    linked.add(resume_id)
+                    session.add(JobResume(job_description_id=jd_id, resume_id=resume_id, filename=filename))
+
 async def save_ranking_result(ranking_data: Dict[str, Any]):
     """Saves a Ranking Result."""
     async with AsyncSessionLocal() as session:
@@ -85,14 +128,79 @@ async def get_resume(resume_id: str, user_id: str) -> Optional[Resume]:
         result = await session.execute(select(Resume).where(Resume.id == resume_id, Resume.user_id == user_id))
         return result.scalars().first()
 
-async def update_resume_text(resume_id: str, text: str):
-    """Updates the extracted text of a resume."""
+async def get_resumes(resume_ids: List[str], user_id: str) -> List[Resume]:
+    """Retrieves several Resumes of a specific user in one query (missing ids are skipped)."""
+    if not resume_ids:
+        return []
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(Resume).where(Resume.id.in_(resume_ids), Resume.user_id == user_id))
+        return result.scalars().all()
+
+async def get_resume_texts_page(user_id: str, after_id: Optional[str] = None, limit: int = 500) -> List[tuple]:
+    """(id, extracted_text) of a user's resumes with text, in id order after `after_id` (keyset paging)."""
+    async with AsyncSessionLocal() as session:
+        stmt = select(Resume.id, Resume.extracted_text).where(
+            Resume.user_id == user_id, Resume.extracted_text.is_not(None), Resume.extracted_text != ""
+        )
+        if after_id is not None:
+            stmt = stmt.where(Resume.id > after_id)
+        result = await session.execute(stmt.order_by(Resume.id).limit(limit))
+        return [tuple(row) for row in result.all()]
+
+async def update_resume_text(resume_id: str, text: str, parsed_data: Optional[Dict[str, Any]] = None):
+    """Updates the extracted text of a resume (and its feature record, if given)."""
     async with AsyncSessionLocal() as session:
         async with session.begin():
             result = await session.execute(select(Resume).where(Resume.id == resume_id))
             resume = result.scalars().first()
             if resume:
                 resume.extracted_text = text
+                if parsed_data is not None:
+                    resume.parsed_data = parsed_data
+
+async def update_resume_features(records: Dict[str, Dict[str, Any]]):
+    """Stores rebuilt feature records (resume_id -> parsed_data) in one transaction."""
+    if not records:
+        return
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            for resume_id, parsed_data in records.items():
+                await session.execute(update(Resume).where(Resume.id == resume_id).values(parsed_data=parsed_data))
+
+async def get_corpus_stats(user_id: str) -> Optional[CorpusStats]:
+    """Retrieves the corpus IDF statistics of a user's resumes."""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(CorpusStats).where(CorpusStats.user_id == user_id))
+        return result.scalars().first()
+
+# Per-user lock around the corpus statistics read-modify-write. SELECT ... FOR UPDATE
+# serializes it on PostgreSQL only (SQLite ignores it), so concurrent batches of one
+# user in this process are serialized here; on SQLite several processes can still
+# lose an update (the statistics are an IDF approximation, the next batch adds on).
+_corpus_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+def _corpus_lock(user_id: str) -> asyncio.Lock:
+    lock = _corpus_locks.get(user_id)
+    if lock is None:
+        lock = _corpus_locks[user_id] = asyncio.Lock()
+    return lock
+
+async def add_corpus_documents(user_id: str, doc_count: int, document_frequencies: Counter,
+                               max_terms: int) -> CorpusStats:
+    """Adds newly extracted resumes to a user's corpus IDF statistics (one read-modify-write, serialized per user)."""
+    async with _corpus_lock(user_id), AsyncSessionLocal() as session:
+        async with session.begin():
+            stmt = select(CorpusStats).where(CorpusStats.user_id == user_id).with_for_update()
+            stats = (await session.execute(stmt)).scalars().first()
+            if stats is None:
+                stats = CorpusStats(user_id=user_id, doc_count=0, document_frequencies={})
+                session.add(stats)
+            merged = Counter(stats.document_frequencies or {})
+            merged.update(document_frequencies)
+            stats.doc_count = (stats.doc_count or 0) + doc_count
+            # Reassign (not mutate) so the JSON column is flagged dirty
+            stats.document_frequencies = prune_terms(dict(merged), max_terms)
+        return stats
 
 async def get_rankings_for_job(jd_id: str) -> List[RankingResult]:
     """Retrieves all rankings for a specific Job Description."""
@@ -102,19 +210,175 @@ async def get_rankings_for_job(jd_id: str) -> List[RankingResult]:
         result = await session.execute(stmt)
         return result.scalars().all()
 
+async def get_ranking_components(jd_id: str, user_id: str) -> List[tuple]:
+    """
+    (resume_id, details, filename) of a job's ranking results in one query, oldest first
+    (a resume screened again for the same job appears once per run).
+    """
+    async with AsyncSessionLocal() as session:
+        stmt = (
+            select(RankingResult.resume_id, RankingResult.details, Resume.filename)
+            .join(Resume, Resume.id == RankingResult.resume_id)
+            .where(RankingResult.job_description_id == jd_id, Resume.user_id == user_id)
+            .order_by(RankingResult.id)
+        )
+        result = await session.execute(stmt)
+        return [tuple(row) for row in result.all()]
+
+# --- Screening job queue ---
+# Workers claim a job by taking a time-limited lease (compare-and-set on the row, so it
+# works without SELECT ... SKIP LOCKED). Chunk results are written together with the
+# job's progress, and every write checks the lease, so a worker that lost its job can't
+# record anything; a crashed worker's job is claimed again once its lease expires.
+
+def _expired(now: datetime):
+    return and_(ScreeningJob.status == "running", ScreeningJob.lease_expires_at < now)
+
+def _claimable(now: datetime):
+    return or_(ScreeningJob.status == "queued", _expired(now))
+
+def _leased(job_id: str, worker_id: str, now: datetime):
+    return and_(
+        ScreeningJob.id == job_id,
+        ScreeningJob.status == "running",
+        ScreeningJob.lease_owner == worker_id,
+        ScreeningJob.lease_expires_at >= now,
+    )
+
+async def create_screening_job(job_data: Dict[str, Any]) -> ScreeningJob:
+    """Queues a screening job."""
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            job = ScreeningJob(**job_data)
+            session.add(job)
+        return job
+
+async def get_screening_job(job_id: str, user_id: str) -> Optional[ScreeningJob]:
+    """Retrieves a Screening Job by ID for a specific user."""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(ScreeningJob).where(ScreeningJob.id == job_id, ScreeningJob.user_id == user_id)
+        )
+        return result.scalars().first()
+
+async def claim_screening_job(worker_id: str, lease_seconds: float, max_attempts: int) -> Optional[ScreeningJob]:
+    """
+    Leases the oldest queued job (or running job whose lease expired) to worker_id.
+    Expired running jobs that already used max_attempts (their worker died on every
+    attempt) are failed instead; queued jobs are always claimable.
+    """
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            await session.execute(
+                update(ScreeningJob)
+                .where(_expired(now), ScreeningJob.attempts >= max_attempts)
+                .values(status="failed", error="Lease expired on the last attempt.",
+                        lease_owner=None, lease_expires_at=None, finished_at=now)
+            )
+            result = await session.execute(
+                select(ScreeningJob.id).where(_claimable(now)).order_by(ScreeningJob.created_at).limit(5)
+            )
+            job_ids = result.scalars().all()
+
+        # Several workers may race for the same job: the conditional update picks one
+        for job_id in job_ids:
+            async with session.begin():
+                claimed = await session.execute(
+                    update(ScreeningJob)
+                    .where(ScreeningJob.id == job_id, _claimable(now))
+                    .values(status="running", lease_owner=worker_id,
+                            lease_expires_at=now + timedelta(seconds=lease_seconds),
+                            attempts=ScreeningJob.attempts + 1)
+                )
+            if claimed.rowcount == 1:
+                return await session.get(ScreeningJob, job_id, populate_existing=True)
+    return None
+
+async def renew_screening_job_lease(job_id: str, worker_id: str, lease_seconds: float) -> bool:
+    """Extends worker_id's lease on a job. False if the lease was lost."""
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            result = await session.execute(
+                update(ScreeningJob).where(_leased(job_id, worker_id, now))
+                .values(lease_expires_at=now + timedelta(seconds=lease_seconds))
+            )
+            return result.rowcount == 1
+
+async def complete_screening_chunk(job_id: str, worker_id: str, ranking_records: List[Dict[str, Any]],
+                                   processed: int, lease_seconds: float) -> bool:
+    """
+    Saves a chunk's ranking results and advances the job to `processed` resumes, in one
+    transaction (and renews the lease). False, with nothing saved, if the lease was lost.
+    """
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            result = await session.execute(
+                update(ScreeningJob).where(_leased(job_id, worker_id, now))
+                .values(processed=processed, lease_expires_at=now + timedelta(seconds=lease_seconds))
+            )
+            if result.rowcount != 1:
+                return False
+            session.add_all([RankingResult(**record) for record in ranking_records])
+        return True
+
+async def finish_screening_job(job_id: str, worker_id: str, status: str, error: Optional[str] = None) -> bool:
+    """Marks a leased job completed or failed."""
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            result = await session.execute(
+                update(ScreeningJob).where(_leased(job_id, worker_id, now))
+                .values(status=status, error=error, lease_owner=None, lease_expires_at=None, finished_at=now)
+            )
+            return result.rowcount == 1
+
+async def release_screening_job(job_id: str, worker_id: str, error: Optional[str] = None,
+                                count_attempt: bool = True) -> bool:
+    """
+    Gives a leased job back to the queue (it resumes from its last completed chunk).
+    With count_attempt=False (worker shutdown, not a failure) the claim's attempt is
+    taken back.
+    """
+    now = datetime.utcnow()
+    values = {"status": "queued", "error": error, "lease_owner": None, "lease_expires_at": None}
+    if not count_attempt:
+        values["attempts"] = ScreeningJob.attempts - 1
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            result = await session.execute(
+                update(ScreeningJob).where(_leased(job_id, worker_id, now)).values(**values)
+            )
+            return result.rowcount == 1
+
+async def _unlinked_resume_ids(session: AsyncSession, resume_ids) -> List[str]:
+    """The resumes of resume_ids that no Job Description uses any more (no link, no ranking)."""
+    resume_ids = set(resume_ids)
+    if not resume_ids:
+        return []
+    linked = await session.execute(select(JobResume.resume_id).where(JobResume.resume_id.in_(resume_ids)))
+    ranked = await session.execute(select(RankingResult.resume_id).where(RankingResult.resume_id.in_(resume_ids)))
+    return list(resume_ids - set(linked.scalars().all()) - set(ranked.scalars().all()))
+
 async def delete_job_description(jd_id: str, user_id: str):
-    """Deletes a job description, its associated ranking results, and its resumes."""
+    """Deletes a job description, its associated ranking results, and its resumes (unless another job description uses them)."""
     async with AsyncSessionLocal() as session:
         async with session.begin():
             # Get resume ids first
-            stmt = select(RankingResult.resume_id).where(RankingResult.job_description_id == jd_id)
-            res = await session.execute(stmt)
-            resume_ids = res.scalars().all()
+            res = await session.execute(select(RankingResult.resume_id).where(RankingResult.job_description_id == jd_id))
+            resume_ids = set(res.scalars().all())
+            res = await session.execute(select(JobResume.resume_id).where(JobResume.job_description_id == jd_id))
+            resume_ids.update(res.scalars().all())
             
-            # Delete rankings
+            # Delete rankings, resume links and screening jobs
             await session.execute(delete(RankingResult).where(RankingResult.job_description_id == jd_id))
+            await session.execute(delete(JobResume).where(JobResume.job_description_id == jd_id))
+            await session.execute(delete(ScreeningJob).where(ScreeningJob.job_description_id == jd_id))
             
-            # Delete resumes
+            # Delete resumes no other job description uses
+            resume_ids = await _unlinked_resume_ids(session, resume_ids)
             if resume_ids:
                 await session.execute(delete(Resume).where(Resume.id.in_(resume_ids), Resume.user_id == user_id))
                 
@@ -122,12 +386,19 @@ async def delete_job_description(jd_id: str, user_id: str):
             await session.execute(delete(JobDescription).where(JobDescription.id == jd_id, JobDescription.user_id == user_id))
 
 async def delete_old_records(days: int = 30):
-    """Deletes records older than X days."""
+    """Deletes records older than X days (an old resume still linked to a newer job description is kept)."""
     cutoff = datetime.utcnow() - timedelta(days=days)
     async with AsyncSessionLocal() as session:
         async with session.begin():
             # Delete old rankings first (FK constraint usually requires this or cascade)
             await session.execute(delete(RankingResult).where(RankingResult.created_at < cutoff))
+            await session.execute(delete(ScreeningJob).where(ScreeningJob.created_at < cutoff))
+            old_jds = select(JobDescription.id).where(JobDescription.created_at < cutoff)
+            await session.execute(delete(JobResume).where(or_(JobResume.created_at < cutoff,
+                                                              JobResume.job_description_id.in_(old_jds))))
             await session.execute(delete(JobDescription).where(JobDescription.created_at < cutoff))
-            await session.execute(delete(Resume).where(Resume.created_at < cutoff))
+            res = await session.execute(select(Resume.id).where(Resume.created_at < cutoff))
+            resume_ids = await _unlinked_resume_ids(session, res.scalars().all())
+            if resume_ids:
+                await session.execute(delete(Resume).where(Resume.id.in_(resume_ids)))
             logger.info(f"Deleted records older than {days} days.")
@@ -0,0 +1,44 @@
+import logging
+from typing import List
+
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+
+def ensure_columns(conn: Connection, metadata: MetaData) -> List[str]:
+    """
+    Brings existing tables up to the models: adds missing columns and indexes.
+
+    create_all only creates missing tables, so a column or index added to a model
+    later never reaches a database created before it. Only additive, nullable changes
+    are made here (nothing is altered or dropped); a missing NOT NULL column without a
+    server default is reported and skipped. Returns what was added, e.g.
+    ["resumes.content_hash", "ix_resumes_user_content_hash"].
+    """
+    inspector = inspect(conn)
+    quote = conn.dialect.identifier_preparer.quote
+    added = []
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable and column.server_default is None:
+                logger.warning(f"Cannot add NOT NULL column {table.name}.{column.name} to existing rows, skipping.")
+                continue
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}"))
+            added.append(f"{table.name}.{column.name}")
+
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(conn)
+                added.append(index.name)
+    if added:
+        logger.info(f"Database schema updated: added {', '.join(added)}.")
+    return added
@@ -1,6 +1,6 @@
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Index, JSON
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -29,7 +29,21 @@ class Resume(Base):
     filename = Column(String, nullable=False)
     file_path = Column(String, nullable=True) # Local path if saved
     extracted_text = Column(Text, nullable=True)
-    parsed_data = Column(JSON, nullable=True) # Skills, Exp, Emails etc
+    parsed_data = Column(JSON, nullable=True) # Versioned feature record: skills, exp, emails etc (app/core/feature_record.py)
+    content_hash = Column(String(64), nullable=True) # SHA-256 of the file: one stored resume per tenant and content
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_resumes_user_content_hash", "user_id", "content_hash", unique=True),
+    )
+
+class JobResume(Base):
+    """A stored resume submitted for a job description (a resume can serve many JDs)."""
+    __tablename__ = "job_resumes"
+
+    job_description_id = Column(String, ForeignKey("job_descriptions.id"), primary_key=True)
+    resume_id = Column(String, ForeignKey("resumes.id"), primary_key=True, index=True)
+    filename = Column(String, nullable=True) # Name of the file as uploaded for this JD
     created_at = Column(DateTime, default=datetime.utcnow)
 
 class RankingResult(Base):
@@ -41,3 +55,29 @@ class RankingResult(Base):
     total_score = Column(Float, nullable=False)
     details = Column(JSON, nullable=True) # Breakdown, matched skills, etc.
     created_at = Column(DateTime, default=datetime.utcnow)
+
+class CorpusStats(Base):
+    __tablename__ = "corpus_stats"
+
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    doc_count = Column(Integer, nullable=False, default=0)
+    document_frequencies = Column(JSON, nullable=False, default=dict) # term -> number of resumes containing it
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ScreeningJob(Base):
+    __tablename__ = "screening_jobs"
+
+    id = Column(String, primary_key=True, index=True) # UUID
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    job_description_id = Column(String, ForeignKey("job_descriptions.id"), nullable=False)
+    resume_ids = Column(JSON, nullable=False) # In request order
+    top_k = Column(Integer, nullable=True)
+    status = Column(String, nullable=False, default="queued", index=True) # queued, running, completed, failed
+    processed = Column(Integer, nullable=False, default=0) # Resumes done; the job resumes from here
+    attempts = Column(Integer, nullable=False, default=0)
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
@@ -6,8 +6,13 @@ from fastapi.responses import RedirectResponse
 from app.config import settings
 from app.api.endpoints import router as api_router
 from app.api.auth import router as auth_router
+from app.api.screening_jobs import router as screening_jobs_router, start_screening_workers, stop_screening_workers
 from contextlib import asynccontextmanager
 from app.db.database import init_db
+from app.core.embedding_cache import cache_stats
+from app.core.embedding_client import close_embedding_clients
+from app.core.analysis_pool import shutdown_analysis_pool
+from app.core.embedding_providers import hf_circuit_breaker
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -16,8 +21,13 @@ async def lifespan(app: FastAPI):
         await init_db()
     except Exception as e:
         print(f"Warning: Database initialization skipped or failed: {e}")
+    # Background screening jobs (queued in the database, resumed after a restart)
+    start_screening_workers()
     yield
     # Cleanup on shutdown can go here
+    await stop_screening_workers()
+    await close_embedding_clients()
+    shutdown_analysis_pool()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -43,6 +53,7 @@ if settings.BACKEND_CORS_ORIGINS:
 # Include API Router
 app.include_router(auth_router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
 app.include_router(api_router, prefix=settings.API_V1_STR)
+app.include_router(screening_jobs_router, prefix=settings.API_V1_STR, tags=["jobs"])
 
 @app.get("/", include_in_schema=False)
 async def root():
@@ -50,4 +61,8 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "embedding_cache": cache_stats(),
+        "embedding_circuit": hf_circuit_breaker.snapshot(),
+    }
@@ -1,4 +1,5 @@
 
+from datetime import datetime
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 
@@ -19,6 +20,9 @@ class ResumeAnalysisResponse(BaseModel):
     
     # Matching Scores
     tfidf_similarity: float
+    # Scorer behind tfidf_similarity: the embedding provider's name ("hf_embedding" for
+    # HuggingFaceProvider, "hashed_ngram" for HashedNgramProvider) or "tfidf" (fallback)
+    semantic_scorer: Optional[str] = None
     skill_match_details: SkillMatchDetails
     
     # Final Ranking Score (if we were ranking relative to something, but here it's per resume)
@@ -34,12 +38,16 @@ class UploadResponse(BaseModel):
 class BatchAnalysisRequest(BaseModel):
     job_description_id: str
     resume_ids: List[str]
+    # Only return the best top_k candidates (every candidate is still saved)
+    top_k: Optional[int] = None
 
 class RankedCandidate(BaseModel):
     resume_id: str
     name: str = "Unknown"
     final_score: float
     tfidf_score: float
+    # Scorer behind tfidf_score: "hf_embedding", "hashed_ngram" or "tfidf" (see ResumeAnalysisResponse)
+    semantic_scorer: Optional[str] = None
     skill_match_percentage: float
     experience_years: float
     matched_skills: List[str]
@@ -53,6 +61,55 @@ class BatchAnalysisResponse(BaseModel):
     job_description_content: Optional[str] = None
     job_description_id: Optional[str] = None
 
+class ScreeningJobResponse(BaseModel):
+    job_id: str
+    job_description_id: str
+    status: str # queued, running, completed, failed
+    total_resumes: int
+    processed_resumes: int
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class ResumeSearchRequest(BaseModel):
+    # A stored Job Description, or the JD text itself
+    job_description_id: Optional[str] = None
+    job_description: Optional[str] = None
+    top_k: int = 20
+    # Also score the hits with the full pipeline and rank them
+    rescore: bool = False
+
+class ResumeSearchHit(BaseModel):
+    resume_id: str
+    filename: str
+    similarity: float
+
+class ResumeSearchResponse(BaseModel):
+    results: List[ResumeSearchHit]
+    ranked_candidates: Optional[List[RankedCandidate]] = None
+    search_time_ms: float
+    indexed_resumes: int
+
+class RerankRequest(BaseModel):
+    # bert / skills / experience; missing components keep their default, scaled to sum to 1
+    weights: Optional[Dict[str, float]] = None
+    # Defaults to the years extracted from the JD at analysis time
+    required_experience: Optional[float] = None
+    min_final_score: Optional[float] = None
+    min_skill_match: Optional[float] = None
+    top_k: Optional[int] = None
+
+class RerankResponse(BaseModel):
+    ranked_candidates: List[RankedCandidate]
+    weights: Dict[str, float]
+    required_experience: float
+    total_candidates: int
+    # Results saved before component scores were stored (analyze again to include them)
+    skipped_candidates: int = 0
+    processing_time: str
+
 class ErrorResponse(BaseModel):
     detail: str
 
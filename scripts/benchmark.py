@@ -0,0 +1,429 @@
+"""
+Micro-benchmarks for the screening pipeline.
+
+Usage:
+    python scripts/benchmark.py skills-exact [--skills 10000]
+    python scripts/benchmark.py skills-fuzzy [--skills 10000]
+    python scripts/benchmark.py taxonomy-load [--skills 30000]
+    python scripts/benchmark.py skills-batch [--candidates 20000]
+    python scripts/benchmark.py parse-once [--resumes 200]
+    python scripts/benchmark.py tfidf-batch [--sizes 10 1000 10000]
+    python scripts/benchmark.py embed-local [--sizes 100 1000 10000]
+    python scripts/benchmark.py index-search [--vectors 50000]
+    python scripts/benchmark.py rank [--candidates 1000000] [--top-k 100]
+    python scripts/benchmark.py analysis-pool [--resumes 2000] [--workers 0 1 2 4]
+"""
+import argparse
+import json
+import os
+import random
+import string
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add the parent directory to sys.path to allow importing app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.skill_extractor import SkillExtractor
+from app.core.taxonomy import build_artifact
+from app.core.skill_index import SkillTrie, FuzzySkillIndex, naive_exact_match, naive_fuzzy_match
+
+SAMPLE_RESUME = """
+Jane Doe | jane.doe@example.com | (555) 123-4567
+Senior Software Engineer with 7 years of experience building data platforms.
+Skills: Python, Java, Go, SQL, PostgreSQL, Docker, Kubernetes (K8s), AWS (EC2, S3, Lambda).
+Frameworks: Django, FastAPI, React.js, Node.js, Apache Spark, Pandas, NumPy, Scikit-Learn.
+Jan 2019 - Present: Staff Engineer, Acme Corp. Led a team of 6, mentoring and code reviews.
+Jun 2016 - Dec 2018: Backend Engineer, Initech. Built REST APIs, CI/CD with Jenkins and Terraform.
+Strong communication, problem solving and leadership. Agile/Scrum practitioner.
+"""
+
+
+def _timeit(fn, repeat: int) -> float:
+    """Returns the best wall time of `repeat` runs in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0
+
+
+def synthetic_variations(n_skills: int, seed: int = 42):
+    """Generates (variation, skill_id) pairs for a taxonomy of n_skills pseudo-skills."""
+    rng = random.Random(seed)
+    variations = []
+    for skill_id in range(n_skills):
+        name = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 12)))
+        variations.append((name.title(), skill_id))
+        for _ in range(rng.randint(0, 2)):
+            variations.append((f"{name} {rng.choice(['js', 'pro', 'core', 'cloud'])}", skill_id))
+    return variations
+
+
+def synthetic_taxonomy(n_skills: int, seed: int = 42):
+    """Builds a skills_database.json-shaped dict with n_skills pseudo-skills."""
+    taxonomy = {}
+    for variation, skill_id in synthetic_variations(n_skills, seed):
+        category = taxonomy.setdefault(f"category_{skill_id % 25}", [])
+        if not category or category[-1]["_id"] != skill_id:
+            category.append({"_id": skill_id, "name": variation, "aliases": []})
+        else:
+            category[-1]["aliases"].append(variation)
+    for skills in taxonomy.values():
+        for entry in skills:
+            del entry["_id"]
+    return taxonomy
+
+
+# Run in a fresh interpreter so RSS reflects a cold worker start
+# (ru_maxrss is inherited from the parent across exec, so read VmRSS instead).
+_LOAD_PROBE = """
+import sys, time
+sys.path.insert(0, {root!r})
+from app.core.skill_extractor import SkillExtractor
+def rss_kb():
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+before = rss_kb()
+start = time.perf_counter()
+extractor = SkillExtractor({db!r}, artifact_path={artifact!r})
+elapsed = time.perf_counter() - start
+print(elapsed * 1000.0, before, rss_kb())
+"""
+
+
+def _probe_load(db_path: str, artifact_path: str):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = _LOAD_PROBE.format(root=root, db=db_path, artifact=artifact_path)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    elapsed_ms, before_kb, after_kb = out.split()
+    return float(elapsed_ms), int(before_kb) / 1024.0, int(after_kb) / 1024.0
+
+
+def bench_taxonomy_load(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "skills.json")
+        with open(db_path, "w") as f:
+            json.dump(synthetic_taxonomy(args.skills), f)
+        artifact_path = os.path.join(tmp, "skills.bin")
+        build_artifact(db_path, artifact_path)
+        missing_artifact = os.path.join(tmp, "missing.bin")
+
+        print(f"taxonomy: {args.skills} skills, JSON {os.path.getsize(db_path) / 1e6:.1f} MB, "
+              f"artifact {os.path.getsize(artifact_path) / 1e6:.1f} MB")
+        for label, artifact in [("json + compile", missing_artifact), ("artifact", artifact_path)]:
+            elapsed_ms, before_mb, after_mb = _probe_load(db_path, artifact)
+            print(f"{label:>15}: startup {elapsed_ms:8.1f} ms | RSS {after_mb:7.1f} MB "
+                  f"(+{after_mb - before_mb:.1f} MB for the taxonomy)")
+
+
+def bench_skills_exact(args):
+    extractor = SkillExtractor()
+    text = (SAMPLE_RESUME * args.pages).lower()
+    cases = [("taxonomy", extractor.taxonomy.variations)]
+    if args.skills:
+        cases.append((f"synthetic-{args.skills}", extractor.taxonomy.variations + synthetic_variations(args.skills)))
+
+    for label, variations in cases:
+        start = time.perf_counter()
+        trie = SkillTrie(variations)
+        build_ms = (time.perf_counter() - start) * 1000.0
+
+        assert trie.find(text) == naive_exact_match(variations, text)
+        naive_ms = _timeit(lambda: naive_exact_match(variations, text), args.repeat)
+        trie_ms = _timeit(lambda: trie.find(text), args.repeat)
+        print(
+            f"{label:>18}: {len(variations):>6} variations | regex {naive_ms:8.2f} ms | "
+            f"trie {trie_ms:6.2f} ms | speedup {naive_ms / trie_ms:6.1f}x | trie build {build_ms:.0f} ms"
+        )
+
+
+def bench_skills_fuzzy(args):
+    extractor = SkillExtractor()
+    tokens = set((SAMPLE_RESUME * args.pages).lower().split())
+    cases = [("taxonomy", extractor.taxonomy.variations)]
+    if args.skills:
+        cases.append((f"synthetic-{args.skills}", extractor.taxonomy.variations + synthetic_variations(args.skills)))
+
+    for label, variations in cases:
+        start = time.perf_counter()
+        index = FuzzySkillIndex(variations, threshold=args.threshold)
+        build_ms = (time.perf_counter() - start) * 1000.0
+
+        naive_ms = _timeit(lambda: naive_fuzzy_match(variations, tokens, args.threshold), 1)
+        index_ms = _timeit(lambda: index.match(tokens), args.repeat)
+        assert set(index.match(tokens)) == naive_fuzzy_match(variations, tokens, args.threshold)
+        print(
+            f"{label:>18}: {len(variations):>6} variations x {len(tokens)} tokens | extractOne {naive_ms:9.1f} ms | "
+            f"index {index_ms:6.2f} ms | speedup {naive_ms / index_ms:7.1f}x | index build {build_ms:.0f} ms"
+        )
+
+
+def bench_skills_batch(args):
+    from app.core.skill_matcher import SkillMatcher
+
+    taxonomy = SkillExtractor(reload_interval=-1).taxonomy
+    matcher = SkillMatcher(vocabulary=taxonomy.vocabulary, similarity=taxonomy.similarity)
+    ids = list(range(len(taxonomy.vocabulary)))
+    rng = random.Random(5)
+    jd_ids = rng.sample(ids, args.jd_skills)
+    candidates = [rng.sample(ids, rng.randint(5, 30)) for _ in range(args.candidates)]
+
+    start = time.perf_counter()
+    loop = [matcher.match_skill_ids(c, jd_ids)["match_percentage"] for c in candidates]
+    loop_ms = (time.perf_counter() - start) * 1000.0
+
+    batch_ms = _timeit(lambda: matcher.match_batch(candidates, jd_ids), args.repeat)
+    assert matcher.match_batch(candidates, jd_ids).percentages == loop
+    print(
+        f"{args.candidates} candidates x {args.jd_skills} JD skills | match_skill_ids loop {loop_ms:8.1f} ms | "
+        f"match_batch {batch_ms:7.1f} ms | speedup {loop_ms / batch_ms:5.1f}x"
+    )
+
+
+def bench_parse_once(args):
+    import logging
+    from app.core.experience_extractor import extract_experience
+    from app.core.parsed_document import ParsedDocument
+
+    logging.getLogger("app.core.skill_extractor").setLevel(logging.WARNING)
+    logging.getLogger("app.core.experience_extractor").setLevel(logging.WARNING)
+    extractor = SkillExtractor(reload_interval=-1)
+    stages = [extractor.extract_skills, extract_experience]
+    try:
+        from app.core.text_processor import TextProcessor
+        stages.insert(0, TextProcessor().preprocess)
+    except LookupError:
+        print("NLTK corpora unavailable, timing without TextProcessor.preprocess")
+
+    resumes = [SAMPLE_RESUME * args.pages + f"\nref {i}" for i in range(args.resumes)]
+
+    def per_stage_text():
+        for text in resumes:
+            for stage in stages:
+                stage(text)
+
+    def shared_document():
+        for text in resumes:
+            document = ParsedDocument(text)
+            for stage in stages:
+                stage(document)
+
+    text_ms = _timeit(per_stage_text, args.repeat)
+    doc_ms = _timeit(shared_document, args.repeat)
+    print(f"{args.resumes} resumes x {len(stages)} stages | raw text per stage {text_ms:8.1f} ms | "
+          f"shared ParsedDocument {doc_ms:8.1f} ms | speedup {text_ms / doc_ms:4.2f}x")
+
+
+def bench_tfidf_batch(args):
+    import logging
+    from app.core.tfidf_scorer import BatchTfidfScorer, tfidf_similarity
+
+    logging.getLogger("app.core.tfidf_scorer").setLevel(logging.ERROR)
+    rng = random.Random(9)
+    words = SAMPLE_RESUME.split()
+    jd = "Backend engineer: Python, Django, PostgreSQL, Docker, AWS, Kafka, leadership and mentoring."
+
+    def resume():
+        return " ".join(rng.choice(words) for _ in range(rng.randint(150, 400)))
+
+    for size in args.sizes:
+        resumes = [resume() for _ in range(size)]
+        cells = []
+        if size <= args.max_loop:
+            loop_ms = _timeit(lambda: [tfidf_similarity(r, jd) for r in resumes], 1)
+            cells.append(f"pairwise loop {loop_ms:9.1f} ms")
+        else:
+            loop_ms = None
+            cells.append("pairwise loop   (skipped)")
+        for mode in ("pairwise", "shared", "hashing"):
+            scorer = BatchTfidfScorer(mode)
+            ms = _timeit(lambda: scorer.score(resumes, jd), args.repeat)
+            speedup = f" ({loop_ms / ms:5.0f}x)" if loop_ms else ""
+            cells.append(f"{mode} {ms:8.1f} ms{speedup}")
+        print(f"{size:>6} resumes | " + " | ".join(cells))
+
+
+def bench_embed_local(args):
+    from app.core.embedding_providers import HashedNgramProvider
+
+    rng = random.Random(11)
+    words = SAMPLE_RESUME.split()
+    provider = HashedNgramProvider(dim=args.dim)
+    for size in args.sizes:
+        # Unique filler words, so distinct terms grow with the batch as they do with real resumes
+        resumes = [" ".join(rng.choice(words) for _ in range(rng.randint(150, 400)))
+                   + " " + " ".join(f"term{rng.randrange(50 * size)}" for _ in range(50))
+                   for _ in range(size)]
+        chars = sum(len(r) for r in resumes) / size
+        ms = _timeit(lambda: provider.embed_many(resumes), args.repeat)
+        print(f"{size:>6} resumes (~{chars:.0f} chars) | hashed n-gram dim {args.dim} {ms:8.1f} ms | "
+              f"{size / ms * 1000:8.0f} resumes/s")
+
+
+def bench_index_search(args):
+    import numpy as np
+    from app.core.vector_index import VectorIndex
+
+    rng = np.random.default_rng(5)
+    centers = rng.normal(size=(args.clusters, args.dim))
+
+    def sample(n):
+        vectors = centers[rng.integers(args.clusters, size=n)] + 0.5 * rng.normal(size=(n, args.dim))
+        return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+    vectors = sample(args.vectors)
+    ids = [f"resume-{i}" for i in range(args.vectors)]
+    queries = sample(args.queries)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = VectorIndex(tmp, nprobe=args.nprobe)
+        start = time.perf_counter()
+        for i in range(0, args.vectors, args.batch):
+            index.add(ids[i:i + args.batch], vectors[i:i + args.batch])
+        build_s = time.perf_counter() - start
+
+        exact_ms = _timeit(lambda: [np.argsort(-(vectors @ q))[:args.k] for q in queries], 1) / args.queries
+        ivf_ms = _timeit(lambda: [index.search(q, args.k) for q in queries], args.repeat) / args.queries
+        truth = [set(np.argsort(-(vectors @ q))[:args.k]) for q in queries]
+        found = [{int(resume_id.split("-")[1]) for resume_id, _ in index.search(q, args.k)} for q in queries]
+        recall = np.mean([len(t & f) / args.k for t, f in zip(truth, found)])
+        size_mb = os.path.getsize(os.path.join(tmp, "index.npz")) / 1e6
+    print(f"{args.vectors} x {args.dim} | build {build_s:6.2f}s in batches of {args.batch} ({size_mb:.1f} MB) | "
+          f"exact float32 scan {exact_ms:7.2f} ms/query | IVF int8 nprobe={args.nprobe} {ivf_ms:6.2f} ms/query | "
+          f"recall@{args.k} {recall:.3f}")
+
+
+def bench_rank(args):
+    import numpy as np
+    from app.core.ranker import Ranker
+
+    rng = np.random.default_rng(3)
+    n = args.candidates
+    bert, skills, years = rng.random(n), rng.random(n) * 100, rng.random(n) * 15
+    ranker = Ranker()
+    print(f"{n} candidates:")
+    if n <= args.max_dicts:
+        candidates = [{"name": f"c{i}", "resume_text": "x" * 2000, "bert_score": float(b),
+                       "skill_match_percentage": float(s), "years_of_experience": float(y)}
+                      for i, (b, s, y) in enumerate(zip(bert, skills, years))]
+        ms = _timeit(lambda: ranker.rank_candidates(candidates, args.required), args.repeat)
+        print(f"  rank_candidates (dicts, full list)   {ms:9.1f} ms")
+        ms = _timeit(lambda: ranker.rank_candidates(candidates, args.required, top_k=args.top_k), args.repeat)
+        print(f"  rank_candidates (dicts, top {args.top_k:<5})   {ms:9.1f} ms")
+    ms = _timeit(lambda: ranker.rank_arrays(bert, skills, years, args.required), args.repeat)
+    print(f"  rank_arrays (columns, full order)    {ms:9.1f} ms")
+    ms = _timeit(lambda: ranker.rank_arrays(bert, skills, years, args.required, top_k=args.top_k), args.repeat)
+    print(f"  rank_arrays (columns, top {args.top_k:<5})     {ms:9.1f} ms")
+
+
+def bench_analysis_pool(args):
+    import asyncio
+    from app.core.analysis_pool import AnalysisPool
+
+    rng = random.Random(13)
+    lines = SAMPLE_RESUME.strip().splitlines()
+    resumes = [(f"resume-{i:06d}", "\n".join(rng.sample(lines, len(lines))) * args.pages)
+               for i in range(args.resumes)]
+    jd = "Backend engineer: Python, Django, PostgreSQL, Docker, Kubernetes, AWS. 5+ years of experience."
+    jd_skills = SkillExtractor().extract_skills(jd)
+
+    async def run(pool):
+        return await pool.resume_features(resumes, jd_skills)
+
+    baseline = None
+    for workers in args.workers:
+        pool = AnalysisPool(workers=workers, task_size=args.task_size)
+        try:
+            # Start the workers (taxonomy + NLTK load) outside the timing
+            asyncio.run(pool.resume_features(resumes[:workers or 1], jd_skills))
+            ms = _timeit(lambda: asyncio.run(run(pool)), args.repeat)
+        finally:
+            pool.shutdown()
+        rate = args.resumes / ms * 1000
+        baseline = baseline or rate
+        label = "thread (in-process)" if workers == 0 else f"{workers} worker processes"
+        print(f"{args.resumes} resumes | {label:<22} {ms:9.1f} ms | {rate:8.0f} resumes/s | "
+              f"x{rate / baseline:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("skills-exact", help="Exact skill matching: per-variation regex vs SkillTrie")
+    p.add_argument("--skills", type=int, default=10000, help="Size of the synthetic taxonomy (0 to skip)")
+    p.add_argument("--pages", type=int, default=4, help="Resume length in copies of the sample text")
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_skills_exact)
+
+    p = sub.add_parser("skills-fuzzy", help="Typo-tolerant matching: extractOne per variation vs FuzzySkillIndex")
+    p.add_argument("--skills", type=int, default=10000, help="Size of the synthetic taxonomy (0 to skip)")
+    p.add_argument("--pages", type=int, default=4, help="Resume length in copies of the sample text")
+    p.add_argument("--threshold", type=int, default=90)
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_skills_fuzzy)
+
+    p = sub.add_parser("taxonomy-load", help="Startup time and RSS: JSON + compile vs compiled artifact")
+    p.add_argument("--skills", type=int, default=30000)
+    p.set_defaults(func=bench_taxonomy_load)
+
+    p = sub.add_parser("skills-batch", help="Skill match scoring: per-candidate loop vs one vectorized batch")
+    p.add_argument("--candidates", type=int, default=20000)
+    p.add_argument("--jd-skills", type=int, default=15)
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_skills_batch)
+
+    p = sub.add_parser("parse-once", help="Resume stages on raw text vs one shared ParsedDocument")
+    p.add_argument("--resumes", type=int, default=200)
+    p.add_argument("--pages", type=int, default=4)
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_parse_once)
+
+    p = sub.add_parser("tfidf-batch", help="TF-IDF fallback: one fit per pair vs batch scorer modes")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    p.add_argument("--max-loop", type=int, default=10000, help="Largest batch to time the per-pair loop on")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_tfidf_batch)
+
+    p = sub.add_parser("embed-local", help="In-process hashed n-gram embedding throughput (one core)")
+    p.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    p.add_argument("--dim", type=int, default=384)
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_embed_local)
+
+    p = sub.add_parser("index-search", help="Resume vector index: exact scan vs IVF int8 top-K")
+    p.add_argument("--vectors", type=int, default=50000)
+    p.add_argument("--dim", type=int, default=384)
+    p.add_argument("--clusters", type=int, default=200)
+    p.add_argument("--queries", type=int, default=50)
+    p.add_argument("--batch", type=int, default=1000, help="Vectors per index.add call")
+    p.add_argument("--nprobe", type=int, default=16)
+    p.add_argument("--k", type=int, default=10)
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_index_search)
+
+    p = sub.add_parser("rank", help="Final ranking: candidate dicts vs columnar arrays with top-K selection")
+    p.add_argument("--candidates", type=int, default=1000000)
+    p.add_argument("--top-k", type=int, default=100)
+    p.add_argument("--required", type=float, default=5.0, help="Required years of experience")
+    p.add_argument("--max-dicts", type=int, default=200000, help="Largest list to time the dict API on")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_rank)
+
+    p = sub.add_parser("analysis-pool", help="Per-resume pipeline throughput by analysis pool size")
+    p.add_argument("--resumes", type=int, default=2000)
+    p.add_argument("--pages", type=int, default=2)
+    p.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4], help="Pool sizes (0: thread)")
+    p.add_argument("--task-size", type=int, default=8)
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_analysis_pool)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
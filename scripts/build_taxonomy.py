@@ -0,0 +1,28 @@
+"""
+Compiles the skills taxonomy into a versioned binary artifact.
+
+Usage:
+    python scripts/build_taxonomy.py [--db data/skills_database.json] [--out data/skills_database.bin]
+
+Running workers pick up the new artifact on their next taxonomy check (no restart needed).
+"""
+import argparse
+import os
+import sys
+
+# Add the parent directory to sys.path to allow importing app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.taxonomy import build_artifact
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="data/skills_database.json", help="JSON taxonomy source")
+    parser.add_argument("--out", default=None, help="Artifact path (defaults to the JSON path with .bin)")
+    args = parser.parse_args()
+
+    taxonomy = build_artifact(args.db, args.out)
+    print(f"Compiled taxonomy v{taxonomy.version}: {len(taxonomy.skills)} skills, {len(taxonomy.variations)} variations")
+
+if __name__ == "__main__":
+    main()
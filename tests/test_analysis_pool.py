@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+from app.core.analysis_pool import AnalysisPool, extract_resume_text
+
+def test_extract_resume_text_by_extension(tmp_path):
+    txt = tmp_path / "resume.txt"
+    txt.write_text("Python developer", encoding="utf-8")
+    other = tmp_path / "resume.rtf"
+    other.write_text("ignored", encoding="utf-8")
+
+    assert extract_resume_text(str(txt)) == "Python developer"
+    assert extract_resume_text(str(other)) == ""
+
+def test_extract_texts_keeps_order_across_tasks(tmp_path):
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"r{i}.txt"
+        path.write_text(f"resume {i}", encoding="utf-8")
+        paths.append(str(path))
+    paths.insert(2, str(tmp_path / "missing.txt"))
+
+    pool = AnalysisPool(workers=0, task_size=2)
+    texts = asyncio.run(pool.extract_texts(paths))
+
+    # A failed file is None, the others keep their position
+    assert texts == ["resume 0", "resume 1", None, "resume 2", "resume 3", "resume 4"]
+
+def test_extract_text_raises_for_missing_file(tmp_path):
+    pool = AnalysisPool(workers=0)
+    with pytest.raises(OSError):
+        asyncio.run(pool.extract_text(str(tmp_path / "missing.txt")))
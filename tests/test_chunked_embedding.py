@@ -0,0 +1,77 @@
+import asyncio
+
+import numpy as np
+import pytest
+from app.core.chunked_embedding import ChunkedEmbedder, iter_chunks
+from app.core.embedding_providers import EmbeddingProvider
+
+class KeywordProvider(EmbeddingProvider):
+    """2-d stand-in: [1, 0] for chunks mentioning python, [0, 1] otherwise; None for 'fail'."""
+
+    name = "keyword"
+    max_input_chars = 100
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = []
+
+    def embed_many(self, texts):
+        self.calls.append(list(texts))
+        return [None if "fail" in t else np.array([1.0, 0.0] if "python" in t else [0.0, 1.0]) for t in texts]
+
+    async def aembed_many(self, texts, budget=None):
+        await asyncio.sleep(self.latency)
+        return self.embed_many(texts)
+
+def filler(n_words: int, start: int = 0) -> str:
+    return " ".join(f"word{i}" for i in range(start, start + n_words))
+
+def test_chunks_cover_text_with_overlap():
+    text = filler(200)
+    chunks = list(iter_chunks(text, 100, 20))
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert set(text.split()) == set(" ".join(chunks).split())
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.split()[0] in previous.split()
+    assert list(iter_chunks("short text", 100, 20)) == ["short text"]
+    assert list(iter_chunks("  \n", 100, 20)) == []
+    assert "".join(iter_chunks("x" * 250, 100, 0)) == "x" * 250
+
+def test_max_pooling_sees_past_the_first_window():
+    provider = KeywordProvider()
+    embedder = ChunkedEmbedder(provider, window=1000, overlap=20, batch_size=4)
+    assert embedder.window == 100
+    late_python = filler(60) + " python " + filler(10, 60)
+    ok, scores = embedder.score([late_python, filler(60), ""], "python")
+    assert ok
+    assert scores == [pytest.approx(1.0), pytest.approx(0.0), None]
+    # Streamed in fixed-size batches
+    assert max(len(call) for call in provider.calls) == 4 and len(provider.calls) > 2
+
+def test_mean_pooling_and_failures():
+    provider = KeywordProvider()
+    embedder = ChunkedEmbedder(provider, window=100, overlap=0, pooling="mean")
+    half = "python " + filler(10) + " " + filler(12, 10)
+    chunks = list(iter_chunks(half, 100, 0))
+    ok, scores = embedder.score([half, "please fail", filler(5)], "python")
+    expected = sum("python" in c for c in chunks) / np.sqrt(sum("python" in c for c in chunks) ** 2
+                                                             + sum("python" not in c for c in chunks) ** 2)
+    assert ok and scores[0] == pytest.approx(expected) and scores[1] is None and scores[2] == 0.0
+
+    # No JD embedding: streaming stops after the JD's batch
+    provider.calls.clear()
+    ok, scores = ChunkedEmbedder(provider, batch_size=1).score(["python", "java"], "fail")
+    assert not ok and scores == [None, None] and len(provider.calls) == 1
+    with pytest.raises(ValueError):
+        ChunkedEmbedder(provider, pooling="sum")
+
+def test_budget_cuts_off_later_resumes():
+    provider = KeywordProvider(latency=0.1)
+    embedder = ChunkedEmbedder(provider, batch_size=2)
+    resumes = [f"python resume {i}" for i in range(9)]
+    ok, scores = asyncio.run(embedder.ascore(resumes, "python", budget=0.25))
+    assert ok
+    # Batches: [JD, r0] [r1, r2] [r3, r4] then the budget is spent
+    assert scores[:5] == [pytest.approx(1.0)] * 5
+    assert scores[5:] == [None] * 4
@@ -0,0 +1,45 @@
+import pytest
+from app.core.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+def test_trips_after_consecutive_failures_and_probes(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30.0, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success(0.1)  # resets the streak
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+    clock.now = 31.0
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()      # the probe
+    assert not breaker.allow_request()  # only one at a time
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    clock.now = 62.0
+    assert breaker.allow_request()
+    breaker.record_success(0.2)
+    assert breaker.state == CLOSED
+    assert breaker.allow_request()
+
+def test_trips_on_p95_latency(clock):
+    breaker = CircuitBreaker("test", latency_threshold=2.0, window=10, min_samples=5, clock=clock)
+    for latency in [0.5, 0.5, 0.5, 0.5]:
+        breaker.record_success(latency)
+    breaker.record_success(9.0)  # 5 samples, p95 well above 2s
+    assert breaker.state == OPEN
+    assert breaker.snapshot()["state"] == OPEN
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+from app.core.corpus_idf import CorpusIdf, document_frequency_delta, prune_terms
+from app.core.tfidf_scorer import BatchTfidfScorer
+
+WORDS = ("python java docker kubernetes aws react node sql spark pipeline senior engineer "
+         "team lead data the and of a is with").split()
+
+@pytest.fixture(scope="module")
+def batch():
+    rng = random.Random(5)
+    jd = " ".join(rng.choice(WORDS) for _ in range(40))
+    resumes = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 80))) for _ in range(100)]
+    return resumes + ["", "the and of", "Kotlin Swift"], jd
+
+def test_corpus_of_the_batch_matches_shared_fit(batch):
+    resumes, jd = batch
+    corpus = CorpusIdf().add_documents([jd, *resumes])
+    expected = BatchTfidfScorer("shared").score(resumes, jd)
+    assert corpus.score(resumes, jd) == pytest.approx(expected, abs=1e-12)
+
+def test_incremental_updates_match_one_pass(batch):
+    resumes, _ = batch
+    one_pass = CorpusIdf().add_documents(resumes)
+    incremental = CorpusIdf()
+    for i in range(0, len(resumes), 7):
+        doc_count, df = document_frequency_delta(resumes[i:i + 7])
+        incremental = CorpusIdf(incremental.doc_count + doc_count,
+                                {t: incremental.document_frequencies.get(t, 0) + df.get(t, 0)
+                                 for t in set(incremental.document_frequencies) | set(df)})
+    assert incremental.doc_count == one_pass.doc_count == len(resumes)
+    assert incremental.document_frequencies == one_pass.document_frequencies
+
+def test_unseen_and_common_terms():
+    corpus = CorpusIdf().add_documents(["python developer"] * 9 + ["rust developer"])
+    # A term every resume has carries no weight beyond tf, a rare one is weighted up
+    developer, rust, cobol = corpus.idf(["developer", "rust", "cobol"])
+    assert developer == pytest.approx(1.0)
+    assert developer < rust < cobol
+    assert corpus.score(["rust developer", "python developer"], "rust")[1] == 0.0
+    assert corpus.score(["the and of"], "a is with") == [0.0]
+    assert corpus.score([], "rust") == []
+
+def test_prune_terms_keeps_most_frequent():
+    assert prune_terms({"a": 1, "b": 3, "c": 2}, 2) == {"b": 3, "c": 2}
+    assert prune_terms({"a": 1}, 2) == {"a": 1}
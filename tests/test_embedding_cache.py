@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from app.config import settings
+from app.core.chunked_embedding import iter_chunks
+from app.core.embedding_cache import EmbeddingCache
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "embeddings")
+
+def test_round_trip_and_counters(cache_dir):
+    cache = EmbeddingCache(cache_dir, "model-a")
+    assert cache.get("hello") is None
+    cache.put("hello", [0.1, 0.2, 0.3])
+    assert np.allclose(cache.get("hello"), [0.1, 0.2, 0.3])
+    assert cache.stats == {"hits": 1, "misses": 1, "entries": 1, "evictions": 0}
+    cache.close()
+
+    reopened = EmbeddingCache(cache_dir, "model-a")
+    assert np.allclose(reopened.get("hello"), [0.1, 0.2, 0.3])
+    assert EmbeddingCache(cache_dir, "model-b").get("hello") is None
+    reopened.close()
+
+def test_lru_eviction_survives_reopen(cache_dir):
+    cache = EmbeddingCache(cache_dir, "model-a", max_entries=3)
+    for i in range(3):
+        cache.put(f"text {i}", [float(i), 1.0])
+    cache.get("text 0")  # most recently used now
+    cache.put("text 3", [3.0, 1.0])
+
+    assert cache.get("text 1") is None
+    assert cache.stats["evictions"] == 1
+    cache._log.flush()
+    del cache  # no close(): replay the raw log
+
+    reopened = EmbeddingCache(cache_dir, "model-a", max_entries=3)
+    for i in (0, 2, 3):
+        assert np.allclose(reopened.get(f"text {i}"), [float(i), 1.0])
+    assert reopened.get("text 1") is None
+
+def test_reader_never_gets_a_reused_rows_vector(cache_dir):
+    writer = EmbeddingCache(cache_dir, "model-a", max_entries=2)
+    writer.put_many(["text 0", "text 1"], [[0.0, 1.0], [1.0, 1.0]])
+    reader = EmbeddingCache(cache_dir, "model-a")
+    assert not reader.writable
+    assert np.allclose(reader.get("text 0"), [0.0, 1.0])
+
+    # Evicts "text 0" and writes "text 2" into its row
+    writer.put("text 2", [2.0, 1.0])
+    assert reader.get("text 0") is None
+    assert np.allclose(reader.get("text 2"), [2.0, 1.0])  # the reader follows the log
+
+    writer.close()  # compacts: the reader reads the new log
+    assert np.allclose(reader.get("text 1"), [1.0, 1.0])
+    assert reader.get("text 0") is None
+    reader.close()
+
+def test_repeat_screening_makes_no_remote_calls(cache_dir, monkeypatch):
+    from app.core import advanced_matcher, embedding_providers
+
+    calls = []
+    def fake_embedding(text, token):
+        calls.append(text)
+        return [float(len(text)), 1.0, 0.5]
+
+    monkeypatch.setenv("HF_API_TOKEN", "test-token")
+    monkeypatch.setattr(embedding_providers, "_get_hf_embedding", fake_embedding)
+    cache = EmbeddingCache(cache_dir, embedding_providers.HF_MODEL_ID)
+    resumes = ["resume one", " ".join(f"resume two, line {i}." for i in range(300))]
+    # The long resume is embedded chunk by chunk, not truncated
+    n_chunks = len(list(iter_chunks(resumes[1], embedding_providers.MAX_INPUT_CHARS, settings.EMBEDDING_CHUNK_OVERLAP)))
+    assert n_chunks > 1
+
+    first = advanced_matcher.AdvancedMatcher(cache=cache).batch_compare(resumes, "the JD")
+    assert len(calls) == 2 + n_chunks
+    second = advanced_matcher.AdvancedMatcher(cache=cache).batch_compare(resumes, "the JD")
+    assert len(calls) == 2 + n_chunks
+    assert first == second
+    assert cache.stats["hits"] == 2 + n_chunks
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from app.config import settings
+from app.core.embedding_client import AsyncEmbeddingClient
+
+@pytest.fixture(autouse=True)
+def no_default_cache(monkeypatch):
+    # Matchers built without an explicit cache must not touch the real cache directory
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_ENABLED", False)
+
+class StandInServer:
+    """Minimal ASGI stand-in for the HF feature-extraction API, with injected latency."""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        inputs = json.loads(body)["inputs"]
+        self.requests.append(inputs)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+
+        if any("fail" in text for text in inputs):
+            status, payload = 503, {"error": "Model is overloaded"}
+        else:
+            status, payload = 200, [[float(len(text)), 1.0] for text in inputs]
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": json.dumps(payload).encode()})
+
+def _client(server, **kwargs):
+    return AsyncEmbeddingClient("token", "test/model", base_url="http://stand-in",
+                                transport=httpx.ASGITransport(app=server), **kwargs)
+
+def test_batches_with_bounded_concurrency():
+    server = StandInServer(latency=0.05)
+
+    async def run():
+        async with _client(server, batch_size=8, max_concurrency=3) as client:
+            start = time.perf_counter()
+            vectors = await client.embed_many([f"text {i}" for i in range(50)] + ["text 0"])
+            return vectors, time.perf_counter() - start
+
+    vectors, elapsed = asyncio.run(run())
+    assert len(server.requests) == 7  # 50 unique texts / 8 per request
+    assert server.max_in_flight == 3
+    assert [v[0] for v in vectors[:3]] == [6.0, 6.0, 6.0]
+    assert vectors[-1].tolist() == vectors[0].tolist()
+    # 7 requests, 3 at a time: 3 rounds of latency instead of 7 serial round trips
+    assert elapsed < 7 * 0.05
+
+def test_failed_batch_returns_none():
+    server = StandInServer(latency=0)
+
+    async def run():
+        async with _client(server, batch_size=2) as client:
+            return await client.embed_many(["ok one", "ok two", "please fail", "ok three"])
+
+    vectors = asyncio.run(run())
+    assert vectors[0] is not None and vectors[1] is not None
+    assert vectors[2] is None and vectors[3] is None
+
+def test_abatch_compare_uses_cache_and_client(tmp_path, monkeypatch):
+    from app.core.advanced_matcher import AdvancedMatcher
+    from app.core.embedding_providers import HF_MODEL_ID
+    from app.core.embedding_cache import EmbeddingCache
+
+    monkeypatch.setenv("HF_API_TOKEN", "token")
+    server = StandInServer(latency=0.01)
+    cache = EmbeddingCache(str(tmp_path), HF_MODEL_ID)
+    resumes = ["python developer", "java developer", "please fail this one"]
+
+    async def run():
+        async with _client(server, batch_size=2) as client:
+            matcher = AdvancedMatcher(cache=cache, client=client)
+            first = await matcher.abatch_compare(resumes, "backend engineer")
+            n_requests = len(server.requests)
+            second = await matcher.abatch_compare(resumes, "backend engineer")
+            return first, second, n_requests
+
+    first, second, n_requests = asyncio.run(run())
+    assert len(first) == 3 and first == second
+    # [JD, python] was cached; only the failed [java, fail] batch is requested again
+    # (and falls back to TF-IDF both times)
+    assert server.requests[:n_requests] == [["backend engineer", "python developer"],
+                                            ["java developer", "please fail this one"]]
+    assert server.requests[n_requests:] == [["java developer", "please fail this one"]]
+
+def test_open_breaker_switches_batch_to_fallback(monkeypatch):
+    from app.core.advanced_matcher import AdvancedMatcher, SCORER_TFIDF
+    from app.core.circuit_breaker import CircuitBreaker
+
+    monkeypatch.setenv("HF_API_TOKEN", "token")
+    server = StandInServer(latency=0)
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=60.0)
+
+    async def run():
+        async with _client(server, batch_size=1, max_concurrency=1, breaker=breaker) as client:
+            matcher = AdvancedMatcher(client=client)
+            failed = await matcher.ascore_batch(["python developer"], "please fail")
+            n_requests = len(server.requests)
+            skipped = await matcher.ascore_batch(["python developer"], "backend engineer")
+            return failed, skipped, n_requests
+
+    failed, skipped, n_requests = asyncio.run(run())
+    assert breaker.state == "open"
+    assert [s.scorer for s in failed] == [SCORER_TFIDF]
+    assert [s.scorer for s in skipped] == [SCORER_TFIDF]
+    assert len(server.requests) == n_requests  # nothing sent while open
+
+def test_latency_budget_falls_back(monkeypatch):
+    from app.core.advanced_matcher import AdvancedMatcher, SCORER_EMBEDDING, SCORER_TFIDF
+
+    monkeypatch.setenv("HF_API_TOKEN", "token")
+    server = StandInServer(latency=0.1)
+
+    async def run():
+        async with _client(server, batch_size=2, max_concurrency=1) as client:
+            matcher = AdvancedMatcher(client=client)
+            start = time.perf_counter()
+            scores = await matcher.ascore_batch([f"resume {i}" for i in range(7)], "the JD", budget=0.25)
+            return scores, time.perf_counter() - start
+
+    scores, elapsed = asyncio.run(run())
+    # 4 serial requests of 100ms; only the first two fit in the budget
+    assert [s.scorer for s in scores] == [SCORER_EMBEDDING] * 3 + [SCORER_TFIDF] * 4
+    assert elapsed < 0.35
+
+def test_non_json_reply_to_probe_reopens_breaker():
+    from app.core.circuit_breaker import CircuitBreaker
+
+    async def html_page(scope, receive, send):
+        while (await receive()).get("more_body"):
+            pass
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/html")]})
+        await send({"type": "http.response.body", "body": b"<html>Service starting</html>"})
+
+    now = [0.0]
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30.0, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 31.0  # half-open: the next request is the probe
+
+    async def run():
+        client = AsyncEmbeddingClient("token", "test/model", base_url="http://stand-in",
+                                      transport=httpx.ASGITransport(app=html_page), breaker=breaker)
+        async with client:
+            return await client.embed_many(["python developer"])
+
+    assert asyncio.run(run()) == [None]
+    # The probe counted as a failure (not left in flight): probing resumes after the timeout
+    assert breaker.state == "open"
+    now[0] = 62.0
+    assert breaker.allow_request()
@@ -0,0 +1,63 @@
+import asyncio
+
+import numpy as np
+import pytest
+from app.config import settings
+from app.core.embedding_providers import HashedNgramProvider, HuggingFaceProvider, get_embedding_provider
+
+JD = "Senior Python developer with Django, REST APIs, PostgreSQL and AWS experience"
+
+@pytest.fixture(scope="module")
+def provider():
+    return HashedNgramProvider(dim=256)
+
+def test_vectors_do_not_depend_on_the_batch(provider):
+    texts = ["Python developer, Django and AWS", "Registered nurse, ICU", "Java and Spring Boot"]
+    together = provider.embed_many(texts)
+    for text, vector in zip(texts, together):
+        assert vector.shape == (256,) and vector.dtype == np.float32
+        assert np.allclose(provider.embed_many([text])[0], vector, atol=1e-6)
+    assert np.allclose(HashedNgramProvider(dim=256).embed_many(texts)[0], together[0])
+
+def test_related_text_scores_higher(provider):
+    jd, related, morphological, unrelated = provider.embed_many([
+        JD,
+        "Built Django REST services in Python on AWS with PostgreSQL",
+        "Backend development in python",
+        "Registered nurse with ICU experience and patient care",
+    ])
+    assert jd @ related > jd @ morphological > jd @ unrelated
+    assert provider.embed_many(["the and of", ""]) == [None, None]
+
+def test_matcher_scores_with_the_local_provider(provider):
+    from app.core.advanced_matcher import AdvancedMatcher, SCORER_TFIDF
+
+    matcher = AdvancedMatcher(provider=provider)
+    scores = asyncio.run(matcher.ascore_batch(["Django REST APIs in Python", "the and of"], JD))
+    assert [s.scorer for s in scores] == [HashedNgramProvider.name, SCORER_TFIDF]
+    assert matcher.batch_compare(["Django REST APIs in Python", "the and of"], JD) == pytest.approx([s.score for s in scores])
+
+def test_provider_selection(monkeypatch):
+    from app.core.advanced_matcher import AdvancedMatcher
+
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_ENABLED", False)
+    monkeypatch.delenv("HF_API_TOKEN", raising=False)
+    monkeypatch.delenv("HUGGINGFACE_API_TOKEN", raising=False)
+    assert get_embedding_provider("tfidf") is None
+    assert get_embedding_provider("local") is get_embedding_provider("local")
+    assert not get_embedding_provider("huggingface").available
+    assert isinstance(get_embedding_provider("huggingface"), HuggingFaceProvider)
+    with pytest.raises(ValueError):
+        get_embedding_provider("word2vec")
+
+    monkeypatch.setattr(settings, "EMBEDDING_PROVIDER", "tfidf")
+    assert AdvancedMatcher().provider is None
+
+def test_provider_without_embed_many_cannot_be_created():
+    from app.core.embedding_providers import EmbeddingProvider
+
+    class HalfProvider(EmbeddingProvider):
+        name = "half"
+
+    with pytest.raises(TypeError):
+        HalfProvider()
@@ -0,0 +1,47 @@
+import json
+from datetime import datetime
+
+from app.core.experience_extractor import experience_from_date_ranges, extract_date_ranges, extract_experience
+from app.core.feature_record import FEATURES_VERSION, build_feature_record, is_current, record_experience
+from app.core.skill_extractor import SkillExtractor
+
+RESUME = """Jane Doe
+jane.doe@example.com | 555-123-4567
+
+Work Experience:
+Jan 2020 - Jan 2023: Senior Dev, FastAPI and AWS
+Mar 2023 - Present: Lead, Pyton and Docker
+
+SKILLS
+Kubernetes, PostgreSQL
+"""
+
+def test_record_is_json_and_matches_the_extractors():
+    extractor = SkillExtractor(reload_interval=-1)
+    record = build_feature_record(RESUME, extractor.taxonomy)
+
+    assert json.loads(json.dumps(record)) == record
+    assert record["version"] == FEATURES_VERSION
+    assert record["name"] == "jane.doe"
+    assert record["phone_numbers"] == ["555-123-4567"]
+    assert record["skill_ids"] == extractor.extract_skill_ids(RESUME)
+    assert record["experience"]["date_ranges"] == [["2020-01", "2023-01"], ["2023-03", None]]
+    assert record_experience(record) == extract_experience(RESUME)
+    assert record["stats"]["sections"] == ["experience", "skills"]
+
+def test_is_current():
+    extractor = SkillExtractor(reload_interval=-1)
+    record = build_feature_record(RESUME, extractor.taxonomy)
+
+    assert is_current(record, extractor.version)
+    assert not is_current(record, "other-taxonomy")
+    assert not is_current({**record, "version": FEATURES_VERSION - 1}, extractor.version)
+    assert not is_current(None, extractor.version)
+
+def test_ongoing_ranges_keep_counting():
+    ranges = extract_date_ranges("Jan 2020 - Present, 05/2018 to 05/2018, Feb 2022 - Jan 2020")
+    assert ranges == [("2020-01", None), ("2022-02", "2020-01"), ("2018-05", "2018-05")]
+
+    # Same-month range counts one month; the reversed one is skipped
+    assert experience_from_date_ranges(ranges, now=datetime(2021, 1, 10)) == 13 / 12
+    assert experience_from_date_ranges(ranges, now=datetime(2022, 1, 10)) == 25 / 12
@@ -0,0 +1,31 @@
+from sqlalchemy import create_engine, inspect, text
+
+from app.db.migrations import ensure_columns
+from app.db.models import Base
+
+def test_ensure_columns_upgrades_an_old_resumes_table():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        # The resumes table as created before content hashes existed
+        conn.execute(text(
+            "CREATE TABLE resumes (id VARCHAR PRIMARY KEY, user_id VARCHAR NOT NULL, filename VARCHAR NOT NULL, "
+            "file_path VARCHAR, extracted_text TEXT, parsed_data JSON, created_at DATETIME)"
+        ))
+        conn.execute(text("INSERT INTO resumes (id, user_id, filename) VALUES ('r1', 'u1', 'cv.pdf')"))
+        Base.metadata.create_all(conn)
+
+        added = ensure_columns(conn, Base.metadata)
+
+        assert "resumes.content_hash" in added
+        assert "ix_resumes_user_content_hash" in added
+        columns = {column["name"] for column in inspect(conn).get_columns("resumes")}
+        assert "content_hash" in columns
+        assert conn.execute(text("SELECT filename, content_hash FROM resumes")).all() == [("cv.pdf", None)]
+        # Second run: nothing left to add
+        assert ensure_columns(conn, Base.metadata) == []
+
+def test_ensure_columns_on_fresh_schema_is_a_no_op():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        Base.metadata.create_all(conn)
+        assert ensure_columns(conn, Base.metadata) == []
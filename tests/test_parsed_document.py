@@ -0,0 +1,40 @@
+import pytest
+from app.core.parsed_document import ParsedDocument
+from app.core.experience_extractor import extract_experience
+from app.core.skill_extractor import SkillExtractor
+
+RESUME = """Jane Doe
+jane.doe@example.com
+
+Summary
+Backend engineer, Pyton and Docker.
+
+Work Experience:
+Jan 2020 - Jan 2023: Senior Dev, FastAPI and AWS
+
+SKILLS
+Kubernetes, PostgreSQL
+"""
+
+@pytest.fixture
+def document():
+    return ParsedDocument(RESUME)
+
+def test_sections(document):
+    assert [name for name, _, _ in document.sections] == ["summary", "experience", "skills"]
+    assert document.section_text("experience").startswith("Work Experience:\nJan 2020")
+    assert document.section_text("education") == ""
+    start, end = document.lines[1]
+    assert document.text[start:end] == "jane.doe@example.com"
+
+def test_stages_accept_document(document):
+    extractor = SkillExtractor(reload_interval=-1)
+    assert extractor.extract_skills(document) == extractor.extract_skills(RESUME)
+    assert extract_experience(document) == extract_experience(RESUME) == 3.0
+    assert document.emails == ["jane.doe@example.com"]
+
+def test_derived_fields_are_memoized(document):
+    calls = []
+    compute = lambda doc: calls.append(1) or len(doc.tokens)
+    assert document.derived("n_tokens", compute) == document.derived("n_tokens", compute)
+    assert len(calls) == 1
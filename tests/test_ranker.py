@@ -74,3 +74,64 @@ def test_explanation_generation(ranker):
     assert len(explanation) > 0
     # The explanation might contain some key phrases
     # (Ranker delegates to Explainer, so we test if Explainer was called/output present)
+
+def test_rank_arrays_matches_dict_api(ranker):
+    candidates = [
+        {"name": "A", "bert_score": 0.5, "skill_match_percentage": 50.0, "years_of_experience": 2},
+        {"name": "B", "bert_score": 0.9, "skill_match_percentage": 80.0, "years_of_experience": 6},
+        {"name": "C", "bert_score": 0.2, "skill_match_percentage": 100.0},
+    ]
+    ranked = ranker.rank_candidates(candidates, required_experience=4.0)
+    columns = ranker.rank_arrays([0.5, 0.9, 0.2], [50.0, 80.0, 100.0], [2, 6, 0], required_experience=4.0)
+
+    assert [r["name"] for r in ranked] == [candidates[i]["name"] for i in columns.indices]
+    assert [r["final_score"] for r in ranked] == [round(float(s), 2) for s in columns.final_scores]
+    assert ranked[0]["scoring_explanation"] == columns.explanation(0)
+
+def test_top_k_is_prefix_of_full_ranking_with_stable_ties(ranker):
+    # Pairs of identical candidates: ties must keep input order, as the full sort does
+    candidates = [
+        {"name": f"{i}", "bert_score": (i // 2) / 10, "skill_match_percentage": 50.0, "years_of_experience": 3}
+        for i in range(10)
+    ]
+    full = ranker.rank_candidates(candidates)
+    assert [r["name"] for r in full[:2]] == ["8", "9"]
+    for k in (0, 1, 3, 5, 10, 20):
+        top = ranker.rank_candidates(candidates, top_k=k)
+        assert [r["name"] for r in top] == [r["name"] for r in full[:k]]
+        assert [r["rank"] for r in top] == list(range(1, min(k, 10) + 1))
+
+def test_resolve_weights_scales_overrides():
+    from app.core.ranker import resolve_weights
+
+    assert resolve_weights() == pytest.approx({"bert": 0.4, "skills": 0.4, "experience": 0.2})
+    assert resolve_weights({"bert": 1.0, "skills": 1.0, "experience": 0.0}) == pytest.approx(
+        {"bert": 0.5, "skills": 0.5, "experience": 0.0})
+    for bad in ({"salary": 1.0}, {"bert": -1.0}, {"bert": 0, "skills": 0, "experience": 0}):
+        with pytest.raises(ValueError):
+            resolve_weights(bad)
+
+def test_rank_arrays_min_score_and_custom_weights():
+    skills_only = Ranker({"bert": 0.0, "skills": 1.0, "experience": 0.0})
+    ranked = skills_only.rank_arrays([0.9, 0.1, 0.5], [20.0, 90.0, 60.0], [10, 0, 3], min_score=50.0)
+
+    assert ranked.indices.tolist() == [1, 2]
+    assert ranked.final_scores.tolist() == pytest.approx([90.0, 60.0])
+
+def test_incremental_ranker_matches_batch_top_k(ranker):
+    from app.core.ranker import IncrementalRanker
+
+    candidates = [
+        {"name": f"{i}", "bert_score": (i % 7) / 10, "skill_match_percentage": (i * 37) % 100,
+         "years_of_experience": i % 9}
+        for i in range(200)
+    ]
+    shortlist = IncrementalRanker(top_k=10, required_experience=4.0)
+    for candidate in candidates[:100]:
+        shortlist.add(candidate)
+    provisional = shortlist.snapshot()
+    shortlist.extend(candidates[100:])
+
+    assert len(shortlist) == 10 and shortlist.seen == 200
+    assert provisional == ranker.rank_candidates(candidates[:100], required_experience=4.0, top_k=10)
+    assert shortlist.snapshot() == ranker.rank_candidates(candidates, required_experience=4.0, top_k=10)
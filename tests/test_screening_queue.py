@@ -0,0 +1,61 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db import database
+from app.db.models import Base, ScreeningJob
+
+@pytest.fixture
+def queue_db(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'queue.db'}")
+
+    async def create():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await database.create_screening_job({"id": "job-1", "user_id": "u1", "job_description_id": "jd1",
+                                             "resume_ids": ["r1", "r2"], "status": "queued"})
+
+    monkeypatch.setattr(database, "AsyncSessionLocal",
+                        async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession))
+    asyncio.run(create())
+    yield
+    asyncio.run(engine.dispose())
+
+def test_shutdown_release_does_not_use_up_the_last_attempt(queue_db):
+    async def scenario():
+        job = await database.claim_screening_job("w1", 60, max_attempts=1)
+        assert job.attempts == 1
+        assert await database.release_screening_job("job-1", "w1", count_attempt=False)
+
+        job = await database.claim_screening_job("w2", 60, max_attempts=1)
+        assert (job.id, job.status, job.attempts, job.error) == ("job-1", "running", 1, None)
+
+    asyncio.run(scenario())
+
+def test_expired_lease_on_last_attempt_fails_the_job(queue_db):
+    async def scenario():
+        await database.claim_screening_job("w1", 60, max_attempts=1)
+        async with database.AsyncSessionLocal() as session:
+            async with session.begin():
+                await session.execute(update(ScreeningJob).values(
+                    lease_expires_at=datetime.utcnow() - timedelta(seconds=1)))
+
+        assert await database.claim_screening_job("w2", 60, max_attempts=1) is None
+        job = await database.get_screening_job("job-1", "u1")
+        assert job.status == "failed" and job.error
+
+    asyncio.run(scenario())
+
+def test_concurrent_corpus_updates_of_a_user_are_not_lost(queue_db):
+    async def scenario():
+        await asyncio.gather(*(database.add_corpus_documents("u1", 1, Counter({"python": 1, f"t{i}": 1}), 100)
+                               for i in range(10)))
+        stats = await database.get_corpus_stats("u1")
+        assert stats.doc_count == 10
+        assert stats.document_frequencies["python"] == 10
+
+    asyncio.run(scenario())
@@ -0,0 +1,140 @@
+import random
+
+import pytest
+from app.core.skill_extractor import SkillExtractor
+from app.core.skill_index import SkillTrie, FuzzySkillIndex, naive_exact_match, naive_fuzzy_match
+
+@pytest.fixture(scope="module")
+def skill_extractor():
+    return SkillExtractor()
+
+def test_trie_matches_regex_on_tricky_boundaries(skill_extractor):
+    variations = skill_extractor.taxonomy.variations
+    trie = SkillTrie(variations)
+    texts = [
+        "",
+        "python",
+        "C++, C#; .NET Core (ASP.NET) and node.js.",
+        "[react native] reactjs(react.js) vue.jsx",
+        "knows c plus plus\tand\nmachine learning; golang,",
+        "python3 pythonic go-lang s3:bucket (s3)",
+    ]
+    for text in texts:
+        normalized = text.lower()
+        assert trie.find(normalized) == naive_exact_match(variations, normalized), text
+
+def test_trie_matches_regex_on_random_text(skill_extractor):
+    variations = skill_extractor.taxonomy.variations
+    trie = SkillTrie(variations)
+    words = [v.lower() for v, _ in variations] + ["and", "with", "x", "", " "]
+    separators = [" ", ",", ".", ";", "(", ")", "[", "]", "\n", "-", "/", "+", ""]
+    rng = random.Random(7)
+    for _ in range(300):
+        parts = []
+        for _ in range(rng.randint(1, 12)):
+            parts.append(rng.choice(words))
+            parts.append(rng.choice(separators))
+        normalized = "".join(parts)
+        assert trie.find(normalized) == naive_exact_match(variations, normalized), normalized
+
+def _typo(rng, word):
+    """Applies a random insert/delete/substitute/transpose to a word."""
+    if not word:
+        return word
+    i = rng.randrange(len(word))
+    op = rng.choice(["insert", "delete", "substitute", "transpose", "keep"])
+    if op == "insert":
+        return word[:i] + rng.choice("abcdefgnoprst.-") + word[i:]
+    if op == "delete":
+        return word[:i] + word[i + 1:]
+    if op == "substitute":
+        return word[:i] + rng.choice("abcdefgnoprst") + word[i + 1:]
+    if op == "transpose" and i + 1 < len(word):
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word
+
+@pytest.mark.parametrize("threshold", [100, 95, 90, 85, 75, 60, 40, 0])
+def test_fuzzy_index_matches_extract_one(skill_extractor, threshold):
+    variations = skill_extractor.taxonomy.variations
+    index = FuzzySkillIndex(variations, threshold=threshold)
+    words = [w for v, _ in variations for w in v.split()]
+    rng = random.Random(threshold)
+    for _ in range(40):
+        tokens = {_typo(rng, rng.choice(words)).lower() for _ in range(rng.randint(1, 15))}
+        tokens.add(rng.choice(["", "-", "c++,", "(golang)", "https://github.com/jane-doe/repo"]))
+        expected = naive_fuzzy_match(variations, tokens, threshold)
+        assert set(index.match(tokens)) == expected, (threshold, tokens)
+
+def test_fuzzy_index_skips_known_skills(skill_extractor):
+    variations = skill_extractor.taxonomy.variations
+    index = FuzzySkillIndex(variations, threshold=90)
+    tokens = {"pyton", "kubernets"}
+    found = index.match(tokens)
+    assert len(found) == 2
+    python_id = next(i for i, (_, name) in enumerate(skill_extractor.taxonomy.skills) if name == "Python")
+    assert python_id in found
+    assert python_id not in index.match(tokens, skip={python_id})
+
+def test_extract_skills_categories(skill_extractor):
+    text = "Expertise in Python, ReactJS and Docker. Strong communication skills."
+    skills = skill_extractor.extract_skills(text)
+
+    assert "Python" in skills["programming_languages"]
+    assert "React" in skills["frameworks"]
+    assert "Docker" in skills["tools"]
+    assert "Communication" in skills["soft_skills"]
+
+def test_extract_skills_typo_tolerance(skill_extractor):
+    skills = skill_extractor.extract_skills("Expertise in Pyton and Dockr, plus Kubernets.")
+
+    assert "Python" in skills["programming_languages"]
+    assert "Kubernetes" in skills["tools"]
+    # 'Dockr' vs 'Docker' scores 91
+    assert "Docker" in skills["tools"]
+
+def _write_taxonomy(path, skills):
+    import json
+    with open(path, "w") as f:
+        json.dump({"tools": [{"name": name, "aliases": []} for name in skills]}, f)
+
+def test_taxonomy_artifact_round_trip(tmp_path):
+    from app.core.taxonomy import build_artifact, CompiledTaxonomy
+
+    db_path = str(tmp_path / "skills.json")
+    _write_taxonomy(db_path, ["Docker", "Terraform"])
+    compiled = build_artifact(db_path)
+    loaded = CompiledTaxonomy.load(str(tmp_path / "skills.bin"), expected_version=compiled.version)
+
+    assert loaded is not None
+    assert loaded.version == compiled.version
+    assert loaded.skills == compiled.skills
+    assert CompiledTaxonomy.load(str(tmp_path / "skills.bin"), expected_version="stale") is None
+
+def test_hot_reload_picks_up_changed_taxonomy(tmp_path):
+    import os
+
+    db_path = str(tmp_path / "skills.json")
+    _write_taxonomy(db_path, ["Docker"])
+    extractor = SkillExtractor(db_path, reload_interval=0)
+    old_version = extractor.version
+    assert extractor.extract_skills("docker and terraform")["tools"] == ["Docker"]
+
+    _write_taxonomy(db_path, ["Docker", "Terraform"])
+    # Make sure the mtime moves even on coarse-grained filesystems
+    stat = os.stat(db_path)
+    os.utime(db_path, (stat.st_atime, stat.st_mtime + 10))
+
+    assert extractor.extract_skills("docker and terraform")["tools"] == ["Docker", "Terraform"]
+    assert extractor.version != old_version
+    assert extractor.reload_if_changed() is False
+
+
+def test_canonical_ids_leave_shared_vocabulary_unchanged(skill_extractor):
+    from app.core.skill_extractor import canonical_skill_ids
+
+    taxonomy = skill_extractor.taxonomy
+    size = len(taxonomy.vocabulary)
+    # JD skills from another taxonomy version: a recategorized skill and an unknown one
+    ids = canonical_skill_ids(taxonomy, {"tools": ["python"], "retired": ["Fortran IV"]})
+    assert ids == [taxonomy.vocabulary.get("Python")]
+    assert len(taxonomy.vocabulary) == size
@@ -0,0 +1,108 @@
+import pytest
+from app.core.skill_matcher import SkillMatcher
+from app.core.skill_index import SkillVocabulary
+
+@pytest.fixture
+def skill_matcher():
+    return SkillMatcher()
+
+def test_match_skills_weights(skill_matcher):
+    jd = ["Python", "React", "AWS", "Docker", "Communication"]
+    resume = ["Python", "ReactJS", "aws", "Photoshop", "Teamwork"]
+
+    result = skill_matcher.match_skills(resume, jd)
+
+    # Python, AWS exact (1.0 each), React ~ ReactJS partial (0.7)
+    assert result["matched_skills"] == ["Python", "AWS"]
+    assert result["partial_matches"] == [{"jd_skill": "React", "resume_skill": "ReactJS", "score": 83}]
+    assert result["missing_skills"] == ["Docker", "Communication"]
+    assert result["extra_skills"] == ["Photoshop", "Teamwork"]
+    assert result["match_percentage"] == 54.0
+
+def test_match_skills_empty_jd(skill_matcher):
+    result = skill_matcher.match_skills(["Python"], [])
+    assert result["match_percentage"] == 0.0
+    assert result["extra_skills"] == ["Python"]
+
+def test_duplicate_resume_skill_counts_once(skill_matcher):
+    result = skill_matcher.match_skills(["Git", "git"], ["Git"])
+    assert result["matched_skills"] == ["Git"]
+    assert result["extra_skills"] == ["git"]
+
+def test_match_skill_ids_decodes_names():
+    vocabulary = SkillVocabulary(["Python", "React", "ReactJS", "Docker"])
+    matcher = SkillMatcher(vocabulary=vocabulary)
+    resume_ids = [vocabulary.get("python"), vocabulary.get("reactjs")]
+    jd_ids = [vocabulary.get("Python"), vocabulary.get("React"), vocabulary.get("Docker")]
+
+    by_id = matcher.match_skill_ids(resume_ids, jd_ids)
+    by_name = matcher.match_skills(["Python", "ReactJS"], ["Python", "React", "Docker"])
+
+    assert by_id == by_name
+
+def test_match_skills_leaves_shared_vocabulary_unchanged():
+    vocabulary = SkillVocabulary(["Python", "React"])
+    matcher = SkillMatcher(vocabulary=vocabulary)
+    result = matcher.match_skills(["python", "ReactJS", "Photoshop"], ["Python", "React", "Kubernetes"])
+
+    assert result["matched_skills"] == ["Python"]
+    assert result["partial_matches"][0]["resume_skill"] == "ReactJS"
+    assert result["missing_skills"] == ["Kubernetes"]
+    assert vocabulary.names == ["Python", "React"]
+
+def test_similarity_matrix_matches_fuzz_ratio():
+    from fuzzywuzzy import fuzz
+    from app.core.skill_index import SkillSimilarity
+
+    names = ["python", "react", "reactjs", "react native", "node.js", "next.js", "aws", "", "c++"]
+    similarity = SkillSimilarity(names, floor=50)
+    for i, name in enumerate(names):
+        expected = [score if score >= 50 else 0 for score in (fuzz.ratio(name, other) for other in names)]
+        assert similarity.scores(i, range(len(names))).tolist() == expected, name
+
+def test_similarity_matcher_uses_curated_relations():
+    from app.core.skill_index import SkillSimilarity
+
+    vocabulary = SkillVocabulary(["Python", "JavaScript", "TypeScript", "React", "ReactJS"])
+    relations = [(vocabulary.get("javascript"), vocabulary.get("typescript"), 80)]
+    similarity = SkillSimilarity(vocabulary.lower_names, floor=50, relations=relations)
+    jd = ["Python", "JavaScript", "React"]
+    resume = ["Python", "TypeScript", "ReactJS"]
+
+    plain = SkillMatcher(vocabulary=vocabulary).match_skills(resume, jd)
+    assert plain["missing_skills"] == ["JavaScript"]
+
+    result = SkillMatcher(vocabulary=vocabulary, similarity=similarity).match_skills(resume, jd)
+    assert result["partial_matches"] == [
+        {"jd_skill": "JavaScript", "resume_skill": "TypeScript", "score": 80},
+        {"jd_skill": "React", "resume_skill": "ReactJS", "score": 83},
+    ]
+    assert result["match_percentage"] == 80.0
+    # Names outside the matrix fall back to fuzz.ratio
+    assert SkillMatcher(vocabulary=vocabulary, similarity=similarity).match_skills(
+        ["Pythons"], ["Python"])["partial_matches"][0]["score"] == 92
+
+def test_match_batch_matches_per_candidate():
+    import random
+    from app.core.skill_extractor import SkillExtractor
+
+    taxonomy = SkillExtractor(reload_interval=-1).taxonomy
+    matcher = SkillMatcher(vocabulary=taxonomy.vocabulary, similarity=taxonomy.similarity)
+    ids = list(range(len(taxonomy.vocabulary)))
+    rng = random.Random(11)
+    jd_ids = rng.sample(ids, 8) + [ids[0], ids[0]]
+    candidates = [rng.sample(ids, rng.randint(0, 15)) for _ in range(200)] + [[], [ids[0], ids[0]]]
+
+    batch = matcher.match_batch(candidates, jd_ids)
+    assert len(batch) == len(candidates)
+    for i, candidate in enumerate(candidates):
+        expected = matcher.match_skill_ids(candidate, jd_ids)
+        assert batch.percentages[i] == expected["match_percentage"]
+        assert batch.matched_skills(i) == expected["matched_skills"]
+        assert batch.missing_skills(i) == expected["missing_skills"]
+        assert batch[i] == expected
+
+def test_match_batch_empty_jd(skill_matcher):
+    batch = skill_matcher.match_batch([[0], []], [])
+    assert batch.percentages == [0.0, 0.0]
+    assert batch.missing_skills(0) == []
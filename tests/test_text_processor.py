@@ -41,3 +41,26 @@ def test_extract_skills_fuzzy(text_processor):
     # If logic is in SkillExtractor, we should check that `skills` key exists.
     assert "skills" in result
     assert "python" in result["skills"] or "Python" in result["skills"]
+
+def test_preprocess_is_lazy_and_dict_like(text_processor):
+    result = text_processor.preprocess("Reach me at jane@example.com. I know Python.")
+    assert result["emails"] == ["jane@example.com"]
+    assert "lemmatized_text" in result
+    assert "lemmatized_text" in repr(result) and "<lazy>" in repr(result)
+    assert set(dict(result)) == {"original_text", "cleaned_text", "lemmatized_text", "emails", "phone_numbers", "skills"}
+
+def test_extract_contacts_only(text_processor):
+    result = text_processor.extract_contacts("Contact me at john.doe@example.com or 555-123-4567.")
+    assert result["emails"] == ["john.doe@example.com"]
+    assert "555-123-4567" in result["phone_numbers"]
+    assert "skills" not in result
+
+def test_preprocess_result_memoizes_fields():
+    from app.core.text_processor import PreprocessResult
+
+    calls = []
+    result = PreprocessResult({"emails": lambda: calls.append(1) or ["a@b.co"], "skills": lambda: 1 / 0})
+    assert result.get("emails") == result["emails"] == ["a@b.co"]
+    assert len(calls) == 1
+    assert "skills" in result and len(result) == 2
+    assert result.get("missing", []) == []
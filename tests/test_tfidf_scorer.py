@@ -0,0 +1,39 @@
+import random
+
+import pytest
+from app.core.tfidf_scorer import BatchTfidfScorer, tfidf_similarity
+
+WORDS = ("python java docker kubernetes aws react node sql spark pipeline senior engineer "
+         "team lead data the and of a is with").split()
+
+@pytest.fixture(scope="module")
+def batch():
+    rng = random.Random(3)
+    jd = " ".join(rng.choice(WORDS) for _ in range(40))
+    resumes = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 80))) for _ in range(200)]
+    return resumes + ["", "the and of", "Python!! PYTHON", "Kotlin Swift"], jd
+
+def test_pairwise_mode_matches_pairwise_fit(batch):
+    resumes, jd = batch
+    expected = [tfidf_similarity(r, jd) for r in resumes]
+    assert BatchTfidfScorer("pairwise").score(resumes, jd) == pytest.approx(expected, abs=1e-12)
+
+def test_pairwise_mode_refits_pairs_over_max_features(batch):
+    resumes, jd = batch
+    expected = [tfidf_similarity(r, jd, max_features=8) for r in resumes]
+    assert BatchTfidfScorer("pairwise", max_features=8).score(resumes, jd) == pytest.approx(expected, abs=1e-12)
+
+def test_shared_and_hashing_modes(batch):
+    resumes, jd = batch
+    # With one resume the shared fit is the pairwise fit
+    assert BatchTfidfScorer("shared").score(resumes[:1], jd) == pytest.approx([tfidf_similarity(resumes[0], jd)])
+    for mode in ("shared", "hashing"):
+        scores = BatchTfidfScorer(mode).score(resumes, jd)
+        assert len(scores) == len(resumes)
+        assert all(-1e-9 <= s <= 1 + 1e-9 for s in scores)
+        assert scores[resumes.index("")] == 0.0
+    assert BatchTfidfScorer("hashing").score(["the and of"], "a is with") == [0.0]
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        BatchTfidfScorer("bm25")
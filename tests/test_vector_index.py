@@ -0,0 +1,94 @@
+import asyncio
+
+import numpy as np
+import pytest
+from app.core.vector_index import VectorIndex, quantize
+
+def unit_rows(matrix):
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+def clustered(n, dim=64, n_clusters=40, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim))
+    return unit_rows(centers[rng.integers(n_clusters, size=n)] + 0.35 * rng.normal(size=(n, dim))).astype(np.float32)
+
+def test_quantization_round_trip():
+    vectors = clustered(50)
+    codes, scales = quantize(vectors)
+    assert codes.dtype == np.int8
+    assert np.abs(codes * scales[:, None] - vectors).max() <= scales.max() / 2 + 1e-7
+
+def test_exact_scan_upsert_remove_and_persistence(tmp_path):
+    vectors = clustered(200)
+    ids = [f"r{i}" for i in range(200)]
+    index = VectorIndex(str(tmp_path))
+    index.add(ids, vectors)
+    hits = index.search(vectors[7], k=5)
+    assert hits[0][0] == "r7" and hits[0][1] == pytest.approx(1.0, abs=0.01)
+    assert [h[1] for h in hits] == sorted((h[1] for h in hits), reverse=True)
+
+    index.add(["r7"], [-vectors[7]])
+    assert len(index) == 200
+    assert "r7" not in [resume_id for resume_id, _ in index.search(vectors[7], k=5)]
+    index.remove(["r8", "unknown"])
+    assert len(index) == 199
+
+    reopened = VectorIndex(str(tmp_path))
+    assert len(reopened) == 199
+    assert reopened.search(vectors[9], k=1)[0][0] == "r9"
+    # Writes through one instance are seen by another
+    index.add(["new"], [vectors[8]])
+    assert reopened.search(vectors[8], k=1)[0][0] == "new"
+    with pytest.raises(ValueError):
+        index.add(["bad"], [np.ones(3)])
+
+def test_writes_append_rows_and_compact_dead_ones(tmp_path):
+    vectors = clustered(100)
+    index = VectorIndex(str(tmp_path), min_compact=50)
+    index.add([f"r{i}" for i in range(100)], vectors)
+    codes_file = tmp_path / (tmp_path / "CURRENT").read_text() / "codes.i8"
+    assert codes_file.stat().st_size == 100 * 64
+
+    # A chunk writes only its own rows; the replaced vector's row is left dead
+    index.add(["r0", "new"], vectors[:2])
+    assert codes_file.stat().st_size == 102 * 64 and len(index) == 101
+
+    # Once dead rows outnumber live ones, the live rows move to a new generation
+    index.remove([f"r{i}" for i in range(1, 60)])
+    assert not codes_file.exists()
+    current = tmp_path / (tmp_path / "CURRENT").read_text()
+    assert (current / "codes.i8").stat().st_size == 42 * 64
+    assert VectorIndex(str(tmp_path)).search(vectors[70], k=1)[0][0] == "r70"
+
+def test_ivf_recall(tmp_path):
+    vectors = clustered(5000)
+    ids = [f"r{i}" for i in range(len(vectors))]
+    index = VectorIndex(str(tmp_path), nprobe=8, min_train=1000)
+    for start in range(0, len(vectors), 1000):
+        index.add(ids[start:start + 1000], vectors[start:start + 1000])
+    assert index.centroids is not None and index.trained_size == 4000
+
+    queries = clustered(50, seed=1)
+    exact = np.argsort(-(queries @ vectors.T), axis=1)[:, :10]
+    recall = np.mean([
+        len({f"r{i}" for i in truth} & {resume_id for resume_id, _ in index.search(query, k=10)}) / 10
+        for query, truth in zip(queries, exact)
+    ])
+    assert recall >= 0.9
+
+def test_resume_search_with_local_embeddings(tmp_path, monkeypatch):
+    from app.config import settings
+    from app.core.embedding_providers import HashedNgramProvider
+    from app.core.resume_search import ResumeSearch
+
+    monkeypatch.setattr(settings, "RESUME_INDEX_DIR", str(tmp_path))
+    search = ResumeSearch(HashedNgramProvider(dim=128))
+    resumes = [
+        ("py", "Python developer: Django, REST APIs, PostgreSQL, AWS"),
+        ("nurse", "Registered nurse, ICU, patient care"),
+        ("java", "Java engineer: Spring Boot, Kafka, microservices"),
+    ]
+    assert asyncio.run(search.add_resumes("user-1", resumes + [("blank", "  ")])) == 3
+    hits = asyncio.run(search.search("user-1", "Backend Python developer with Django", 2))
+    assert [resume_id for resume_id, _ in hits][0] == "py" and len(hits) == 2
+    assert asyncio.run(search.search("user-2", "Python developer", 2)) == []